@@ -1,63 +1,194 @@
-from selenium import webdriver
+import os
+import sys
+import argparse
 from bs4 import BeautifulSoup
-from selenium.webdriver.chrome.options import Options
+
+# 讓腳本可以直接執行時也能匯入專案根目錄的共用模組
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler_common.waits import wait_until
+from crawler_common.http_client import create_session
+from activity_parser import parse_activity_anchors
+from promotion_monitor import PromotionMonitor, PromotionStore, STATE_FILE, DEFAULT_TTL
+from activity_detail import ActivityEnricher, DetailCache, CACHE_FILE
 
 url = "https://shopping.pchome.com.tw/activity/collection.htm"
 
-chrome_options = Options()
-chrome_options.add_experimental_option("detach", True)  # 設置瀏覽器分離
-driver = webdriver.Chrome(options=chrome_options)
-driver.get(url)#打開登入網頁
-html = driver.page_source
-soup = BeautifulSoup(html,'html.parser')
-
-#print(soup.prettify())
-
-discount = soup.find_all('a',class_="slogan")
-
-print("PChome 即時優惠活動：")
-print("=" * 50)
-
-# 使用集合來去除重複，因為PChome網頁上有多個相同的活動連結。
-seen_activities = set()
-unique_activities = []
-
-for activity in discount:
-    # 提取活動文字內容
-    activity_text = activity.get_text(strip=True)
-    
-    # 提取連結
-    activity_str = str(activity)
-    if 'href=' in activity_str:
-        start = activity_str.find('href="') + 6   # 網址從 href=" 的下一個開始所以+6
-        end = activity_str.find('"', start)       # 根據start找到下一個 " 的結束位置
-        activity_link = activity_str[start:end] if start > 5 and end > start else '無連結'
-    else:
-        activity_link = '無連結'
-    
-    # 尋找日期資訊 - 在同一個父元素中尋找date class的span
-    date_info = '無日期資訊'
-    parent = activity.parent
-    if parent:
-        date_span = parent.find('span', class_='date')
-        if date_span:
-            date_info = date_span.get_text(strip=True)
-    
-    # 組合文字、日期和連結作為唯一識別
-    activity_key = f"{activity_text}|{date_info}|{activity_link}"
-    
-    # 如果這個活動還沒出現過，就加入列表
-    if activity_key not in seen_activities:
-        seen_activities.add(activity_key)
-        unique_activities.append((activity_text, date_info, activity_link))
-
-# 輸出去重後的活動
-for i, (activity_text, date_info, activity_link) in enumerate(unique_activities, 1):
-    print(f"{i}. {activity_text}")
-    print(f"   日期: {date_info}")
-    print(f"   連結: {activity_link}")
-    print("-" * 50)
-driver.quit()
+# HTTP 請求逾時秒數
+REQUEST_TIMEOUT = 15
+
+# 以 HTTP 連線池直接取得活動頁面，不啟動瀏覽器
+def fetch_page_http(url, session=None):
+    own_session = session is None
+    session = session or create_session(pool_size=1)
+    try:
+        response = session.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        return response.text
+    finally:
+        if own_session:
+            session.close()
+
+# 以無頭瀏覽器開啟活動頁面並取得渲染後的原始碼（只在活動連結由腳本產生時使用）
+def fetch_page_source(url, headless=True):
+    # 只有用到瀏覽器時才匯入 selenium
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument("--headless=new")
+    driver = webdriver.Chrome(options=chrome_options)
+    try:
+        driver.get(url)#打開登入網頁
+        # 等待活動連結渲染出來再讀取原始碼
+        wait_until(lambda: driver.find_elements(By.CSS_SELECTOR, "a.slogan"),
+                   timeout=30, description="PChome 活動連結 a.slogan 出現")
+        return driver.page_source
+    finally:
+        driver.quit()
+
+# 取得去重後的活動列表
+def fetch_activities(url, mode="auto", session=None, parser="stream"):
+    """
+    參數:
+        mode: "http" 只用 HTTP；"browser" 只用瀏覽器；
+              "auto" 先用 HTTP，頁面中沒有活動連結（由腳本渲染）或請求失敗時才改用無頭瀏覽器
+    """
+    if mode in ("auto", "http"):
+        try:
+            activities = parse_activities(fetch_page_http(url, session), parser)
+        except Exception as e:
+            if mode == "http":
+                raise
+            print(f"以 HTTP 取得活動頁面時出錯: {e}，改用瀏覽器")
+            activities = []
+        if activities or mode == "http":
+            return activities
+        print("頁面中沒有活動連結，可能由腳本渲染，改用瀏覽器")
+    return parse_activities(fetch_page_source(url), parser)
+
+# 以 BeautifulSoup 解析活動連結，返回 (活動文字, 日期, 連結) 列表（尚未去重）
+def parse_activity_anchors_bs4(html):
+    soup = BeautifulSoup(html,'html.parser')
+
+    #print(soup.prettify())
+
+    discount = soup.find_all('a',class_="slogan")
+
+    activities = []
+
+    for activity in discount:
+        # 提取活動文字內容
+        activity_text = activity.get_text(strip=True)
+
+        # 提取連結
+        activity_str = str(activity)
+        if 'href=' in activity_str:
+            start = activity_str.find('href="') + 6   # 網址從 href=" 的下一個開始所以+6
+            end = activity_str.find('"', start)       # 根據start找到下一個 " 的結束位置
+            activity_link = activity_str[start:end] if start > 5 and end > start else '無連結'
+        else:
+            activity_link = '無連結'
+
+        # 尋找日期資訊 - 在同一個父元素中尋找date class的span
+        date_info = '無日期資訊'
+        parent = activity.parent
+        if parent:
+            date_span = parent.find('span', class_='date')
+            if date_span:
+                date_info = date_span.get_text(strip=True)
 
+        activities.append((activity_text, date_info, activity_link))
+
+    return activities
+
+# 解析器：stream 為單次走訪的解析器（activity_parser.py），bs4 為原本的 BeautifulSoup 解析方式，兩者結果相同
+PARSERS = {
+    "stream": parse_activity_anchors,
+    "bs4": parse_activity_anchors_bs4,
+}
+
+# 解析活動連結，返回去重後的 (活動文字, 日期, 連結) 列表
+def parse_activities(html, parser="stream"):
+    # 使用集合來去除重複，因為PChome網頁上有多個相同的活動連結。
+    seen_activities = set()
+    unique_activities = []
+
+    for activity_text, date_info, activity_link in PARSERS[parser](html):
+        # 組合文字、日期和連結作為唯一識別
+        activity_key = f"{activity_text}|{date_info}|{activity_link}"
+
+        # 如果這個活動還沒出現過，就加入列表
+        if activity_key not in seen_activities:
+            seen_activities.add(activity_key)
+            unique_activities.append((activity_text, date_info, activity_link))
+
+    return unique_activities
+
+# 輸出去重後的活動（details 為 ActivityEnricher.enrich() 的結果時一併輸出內頁資訊）
+def print_activities(unique_activities, details=None):
+    print("PChome 即時優惠活動：")
+    print("=" * 50)
+
+    for i, (activity_text, date_info, activity_link) in enumerate(unique_activities, 1):
+        print(f"{i}. {activity_text}")
+        print(f"   日期: {date_info}")
+        print(f"   連結: {activity_link}")
+        detail = details[i - 1] if details else None
+        if detail and "error" in detail:
+            print(f"   內頁: 無法取得（{detail['error']}）")
+        elif detail:
+            product_count = detail["product_count"]
+            print(f"   商品數: {product_count if product_count is not None else '未知'}")
+            print(f"   折扣: {'、'.join(detail['discounts']) or '未知'}")
+            print(f"   結束時間: {detail['end_time'] or '未知'}")
+        print("-" * 50)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="PChome 即時優惠活動")
+    parser.add_argument("--fetch", choices=["auto", "http", "browser"], default="auto",
+                        help="取得頁面的方式：auto 先用 HTTP，失敗才開無頭瀏覽器（預設）")
+    parser.add_argument("--parser", choices=list(PARSERS), default="stream",
+                        help="解析器：stream 單次走訪（預設），bs4 為原本的 BeautifulSoup 解析")
+    parser.add_argument("--watch", action="store_true",
+                        help="監看模式：定期檢查頁面，只以 JSON Lines 輸出新出現或內容變動的活動")
+    parser.add_argument("--interval", type=float, default=300.0,
+                        help="監看模式的檢查間隔秒數（預設 300）")
+    parser.add_argument("--state", default=STATE_FILE,
+                        help=f"監看模式的活動紀錄檔（預設 {STATE_FILE}）")
+    parser.add_argument("--ttl", type=float, default=DEFAULT_TTL / 86400,
+                        help="活動超過幾天沒有再出現就從紀錄中移除（預設 7）")
+    parser.add_argument("--enrich", action="store_true",
+                        help="並行下載各活動內頁，補上商品數、折扣條件與結束時間")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="同時下載的活動內頁數（預設 8）")
+    parser.add_argument("--host-interval", type=float, default=0.5,
+                        help="對同一主機兩次請求的最小間隔秒數（預設 0.5）")
+    parser.add_argument("--cache", default=CACHE_FILE,
+                        help=f"活動內頁快取檔（預設 {CACHE_FILE}）")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.watch:
+        # 監看模式只用 HTTP，才能使用條件式請求
+        session = create_session(pool_size=1)
+        store = PromotionStore(args.state, ttl=args.ttl * 86400)
+        parse = lambda html: parse_activities(html, args.parser)
+        PromotionMonitor(url, session, parse, store, interval=args.interval).run()
+    else:
+        session = create_session(pool_size=max(1, args.workers))
+        activities = fetch_activities(url, args.fetch, session=session, parser=args.parser)
+        details = None
+        if args.enrich:
+            enricher = ActivityEnricher(session, DetailCache(args.cache), workers=args.workers,
+                                        host_interval=args.host_interval)
+            details = enricher.enrich(activities, url)
+        print_activities(activities, details)
 
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+import os
+import re
+import sys
+import json
+import time
+import html
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from crawler_common.throttle import HostRateLimiter
+
+# 活動內頁的快取（網址 → ETag / Last-Modified 與解析結果）
+CACHE_FILE = "pchome_details.json"
+# 快取在此秒數內直接使用，不再發出請求；超過後以條件式請求確認頁面是否變動
+DEFAULT_MAX_AGE = 3600
+# 超過此秒數沒有再取得的內頁從快取中移除（活動多半已結束），避免快取檔無限增長
+CACHE_RETENTION = 7 * 24 * 3600
+
+NO_LINK = '無連結'
+
+# 商品數量：「共 120 件商品」等明確寫出的數字
+PRODUCT_COUNT_PATTERN = re.compile(r"共\s*([\d,]+)\s*(?:件|項|個|款)\s*商品")
+# 商品頁連結，沒有寫出數量時以不重複的商品數代替
+PRODUCT_LINK_PATTERN = re.compile(r"/prod/([A-Za-z0-9-]+)")
+# 折扣條件：「9 折」「滿 999 折 100」「現折 50」「買 2 送 1」「20% off」
+DISCOUNT_PATTERNS = [
+    re.compile(r"滿\s*[\d,]+\s*元?\s*(?:現折|再折|折|送)\s*[\d,]+\s*元?"),
+    re.compile(r"買\s*\d+\s*送\s*\d+"),
+    re.compile(r"現折\s*[\d,]+\s*元?"),
+    re.compile(r"\d+(?:\.\d+)?\s*折起?"),
+    re.compile(r"\d+\s*%\s*off", re.IGNORECASE),
+]
+# 每個活動最多保留的折扣條件數
+MAX_DISCOUNTS = 10
+# 內頁中的完整日期時間，例如 2024/04/15 23:59
+DATETIME_PATTERN = re.compile(r"(\d{4})[/.-](\d{1,2})[/.-](\d{1,2})(?:\s*(\d{1,2}):(\d{2}))?")
+# 列表上的日期，例如 3/15 ~ 4/15
+DATE_RANGE_PATTERN = re.compile(r"(\d{1,2})/(\d{1,2})\s*[~～-]\s*(\d{1,2})/(\d{1,2})")
+# JSON-LD 中表示結束時間的欄位
+END_TIME_KEYS = ("priceValidUntil", "endDate", "validThrough")
+
+
+def detail_url(activity_link: str, base_url: str) -> Optional[str]:
+    """把列表上的連結轉成可請求的網址（還原 &amp;、補上協定與主機），沒有連結時返回 None"""
+    if not activity_link or activity_link == NO_LINK:
+        return None
+    url = urljoin(base_url, html.unescape(activity_link))
+    return url if urlparse(url).scheme in ("http", "https") else None
+
+
+def _parse_datetime(match) -> Optional[datetime]:
+    year, month, day, hour, minute = match.groups()
+    try:
+        if hour is None:
+            return datetime(int(year), int(month), int(day), 23, 59, 59)
+        return datetime(int(year), int(month), int(day), int(hour), int(minute))
+    except ValueError:
+        return None
+
+
+def _json_ld_end_time(soup: BeautifulSoup) -> Optional[str]:
+    """從 JSON-LD 找結束時間欄位"""
+    for script in soup.find_all("script", type="application/ld+json"):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        stack = [data]
+        while stack:
+            item = stack.pop()
+            if isinstance(item, list):
+                stack.extend(item)
+            elif isinstance(item, dict):
+                for key in END_TIME_KEYS:
+                    if isinstance(item.get(key), str):
+                        return item[key]
+                stack.extend(item.values())
+    return None
+
+
+def parse_activity_detail(page: str) -> Dict[str, Any]:
+    """解析活動內頁，返回商品數量、折扣條件與結束時間（找不到的欄位為 None 或空列表）"""
+    soup = BeautifulSoup(page, "html.parser")
+    end_time = _json_ld_end_time(soup)
+    product_ids = set()
+    for link in soup.find_all("a", href=True):
+        match = PRODUCT_LINK_PATTERN.search(link["href"])
+        if match:
+            product_ids.add(match.group(1))
+    for tag in soup(["script", "style", "template"]):
+        tag.decompose()
+    text = soup.get_text(" ", strip=True)
+
+    match = PRODUCT_COUNT_PATTERN.search(text)
+    if match:
+        product_count = int(match.group(1).replace(",", ""))
+    else:
+        product_count = len(product_ids) or None
+
+    discounts = []
+    covered: List[Tuple[int, int]] = []
+    for pattern in DISCOUNT_PATTERNS:
+        for match in pattern.finditer(text):
+            # 「滿 999 折 100」中的「999 折」已被較完整的條件涵蓋，不重複列出
+            if any(start < match.end() and match.start() < end for start, end in covered):
+                continue
+            covered.append(match.span())
+            term = re.sub(r"\s+", " ", match.group(0))
+            if term not in discounts:
+                discounts.append(term)
+    discounts = discounts[:MAX_DISCOUNTS]
+
+    if end_time is None:
+        # 內頁寫出的日期中最晚的一個視為結束時間
+        times = [t for t in map(_parse_datetime, DATETIME_PATTERN.finditer(text)) if t is not None]
+        if times:
+            end_time = max(times).isoformat()
+
+    return {"product_count": product_count, "discounts": discounts, "end_time": end_time}
+
+
+def end_time_from_date(date_info: str, today: Optional[datetime] = None) -> Optional[str]:
+    """從列表上的「3/15 ~ 4/15」推算結束時間（結束日當天 23:59:59），跨年時算到下一年"""
+    match = DATE_RANGE_PATTERN.search(date_info or "")
+    if not match:
+        return None
+    start_month, start_day, end_month, end_day = map(int, match.groups())
+    year = (today or datetime.now()).year
+    if (end_month, end_day) < (start_month, start_day):
+        year += 1
+    try:
+        return datetime(year, end_month, end_day, 23, 59, 59).isoformat()
+    except ValueError:
+        return None
+
+
+class DetailCache:
+    """活動內頁的磁碟快取，以網址為鍵保存 ETag / Last-Modified 與解析結果（可跨執行緒共用）
+
+    讀取與寫入時移除超過 retention 秒沒有再取得的項目。
+    """
+
+    def __init__(self, path: str = CACHE_FILE, retention: float = CACHE_RETENTION):
+        self.path = path
+        self.retention = retention
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"讀取活動內頁快取時出錯: {e}，將重新建立", file=sys.stderr)
+        self._prune()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention
+        self.entries = {url: entry for url, entry in self.entries.items()
+                        if isinstance(entry, dict) and entry.get("fetched_at", 0) >= cutoff}
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.entries.get(url)
+
+    def put(self, url: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self.entries[url] = entry
+
+    def save(self) -> None:
+        with self._lock:
+            self._prune()
+            data = json.dumps(self.entries, ensure_ascii=False)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+class ActivityEnricher:
+    """並行下載活動內頁並解析詳細資訊
+
+    - 同時請求數受 workers 限制，共用同一個連線池（keep-alive）
+    - 同一主機的請求至少間隔 host_interval 秒
+    - 快取未超過 max_age 時不發出請求；超過時帶上 If-None-Match / If-Modified-Since，304 時沿用快取
+    """
+
+    def __init__(self, session: requests.Session, cache: DetailCache, workers: int = 8,
+                 host_interval: float = 0.5, max_age: float = DEFAULT_MAX_AGE, timeout: float = 15.0):
+        """
+        參數:
+            session: HTTP session，連線池大小應不小於 workers（crawler_common.http_client.create_session）
+            cache: 活動內頁快取
+            workers: 同時下載的內頁數
+            host_interval: 同一主機兩次請求的最小間隔秒數
+            max_age: 快取直接使用的秒數
+        """
+        self.session = session
+        self.cache = cache
+        self.workers = workers
+        self.limiter = HostRateLimiter(host_interval)
+        self.max_age = max_age
+        self.timeout = timeout
+
+    def fetch_detail(self, url: str) -> Dict[str, Any]:
+        """取得一個活動內頁的解析結果"""
+        cached = self.cache.get(url)
+        if cached is not None and time.time() - cached["fetched_at"] < self.max_age:
+            return cached["detail"]
+
+        headers = {}
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        self.limiter.wait(urlparse(url).netloc)
+        response = self.session.get(url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304 and cached is not None:
+            detail = cached["detail"]
+        else:
+            response.raise_for_status()
+            detail = parse_activity_detail(response.text)
+        self.cache.put(url, {
+            "etag": response.headers.get("ETag", cached.get("etag", "") if cached else ""),
+            "last_modified": response.headers.get("Last-Modified", cached.get("last_modified", "") if cached else ""),
+            "fetched_at": time.time(),
+            "detail": detail,
+        })
+        return detail
+
+    def _fetch(self, url: str) -> Dict[str, Any]:
+        try:
+            return self.fetch_detail(url)
+        except requests.RequestException as e:
+            print(f"取得活動內頁 {url} 時出錯: {e}", file=sys.stderr)
+            return {"error": str(e)}
+        except (ValueError, KeyError, TypeError) as e:
+            # 單一內頁解析失敗不影響其他活動，也不會略過寫入快取
+            print(f"解析活動內頁 {url} 時出錯: {e}", file=sys.stderr)
+            return {"error": f"解析失敗: {e}"}
+
+    def enrich(self, activities: List[Tuple[str, str, str]], base_url: str) -> List[Optional[Dict[str, Any]]]:
+        """返回與 activities 對應的詳細資訊列表（沒有連結的活動為 None）
+
+        相同網址只下載一次；內頁沒有結束時間時，以列表上的日期推算。
+        """
+        urls = [detail_url(activity_link, base_url) for _, _, activity_link in activities]
+        unique_urls = list(dict.fromkeys(url for url in urls if url is not None))
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = dict(zip(unique_urls, executor.map(self._fetch, unique_urls)))
+        self.cache.save()
+
+        details = []
+        for (activity_text, date_info, activity_link), url in zip(activities, urls):
+            if url is None:
+                details.append(None)
+                continue
+            detail = dict(results[url])
+            if "error" not in detail and not detail.get("end_time"):
+                detail["end_time"] = end_time_from_date(date_info)
+            details.append(detail)
+        return details
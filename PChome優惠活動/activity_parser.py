@@ -0,0 +1,197 @@
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+# 沒有結束標籤的元素，不放入開啟中的元素堆疊
+VOID_ELEMENTS = frozenset([
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source',
+    'track', 'wbr',
+])
+# 這些元素內的文字不算活動或日期文字（與 get_text() 相同：script、style、template 以及注音的 rt、rp）
+SKIP_TEXT = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+
+NO_LINK = '無連結'
+NO_DATE = '無日期資訊'
+# 連結取自 a.slogan 的 HTML 中第一個 href="..."（與原本搜尋 str(activity) 的方式相同）
+HREF_MARKER = 'href="'
+
+
+def _has_class(attrs: Dict[str, str], name: str) -> bool:
+    return name in (attrs.get("class") or "").split()
+
+
+def _escape(text: str) -> str:
+    """與 BeautifulSoup 輸出 HTML 時相同的跳脫（formatter="minimal"）"""
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _start_tag_html(tag: str, attrs: Dict[str, str]) -> str:
+    """開始標籤輸出成 HTML 的樣子：值含雙引號時改用單引號，兩種引號都有時雙引號改為 &quot;"""
+    parts = [f"<{tag}"]
+    for name, value in attrs.items():
+        value = _escape(value)
+        quote = '"'
+        if '"' in value:
+            if "'" in value:
+                value = value.replace('"', "&quot;")
+            else:
+                quote = "'"
+        parts.append(f" {name}={quote}{value}{quote}")
+    parts.append("/>" if tag in VOID_ELEMENTS else ">")
+    return "".join(parts)
+
+
+class _Anchor:
+    __slots__ = ("texts", "parent", "link", "html")
+
+    def __init__(self, parent: "_Element", start_tag: str):
+        self.texts: List[str] = []
+        self.parent = parent
+        self.link: Optional[str] = None
+        # 還沒找到 href="..." 時，累積 a.slogan 目前為止的 HTML 繼續尋找
+        self.html = start_tag
+        self.find_link(final=False)
+
+    def find_link(self, final: bool) -> None:
+        start = self.html.find(HREF_MARKER)
+        end = self.html.find('"', start + len(HREF_MARKER)) if start >= 0 else -1
+        if end >= 0:
+            self.link = self.html[start + len(HREF_MARKER):end] or NO_LINK
+        elif final:
+            self.link = NO_LINK
+        if self.link is not None:
+            self.html = ""
+
+
+class _Element:
+    __slots__ = ("name", "date", "anchor")
+
+    def __init__(self, name: str):
+        self.name = name
+        # 子孫中第一個 span.date 的文字列表
+        self.date: Optional[List[str]] = None
+        # 此元素為 a.slogan 時對應的活動
+        self.anchor: Optional[_Anchor] = None
+
+
+class ActivityParser(HTMLParser):
+    """單次走訪 HTML 收集所有 a.slogan，不建立 BeautifulSoup 樹
+
+    結果與 PChome即時優惠活動.parse_activity_anchors_bs4() 相同：
+    - 活動文字：a.slogan 內各段文字去除頭尾空白後串接（同 get_text(strip=True)，含 CDATA）
+    - 日期：a.slogan 父元素的子孫中第一個 span.date 的文字
+    - 連結：a.slogan 的 HTML 中第一個 href="..." 的值（實體保持跳脫，例如 &amp;），沒有時為「無連結」
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.stack: List[_Element] = [_Element("[document]")]
+        self.anchors: List[_Anchor] = []
+        # 正在收集文字的列表（開啟中的 a.slogan 與 span.date）與其所屬元素
+        self.text_sinks: List[Tuple[_Element, List[str]]] = []
+        # 還沒找到連結的開啟中 a.slogan
+        self.pending: List[_Anchor] = []
+        self.skip_depth = 0
+
+    def _append_html(self, html: str) -> None:
+        for anchor in self.pending:
+            anchor.html += html
+            anchor.find_link(final=False)
+        self.pending = [anchor for anchor in self.pending if anchor.link is None]
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        attr_dict = {key: value or "" for key, value in attrs}
+        if self.pending:
+            self._append_html(_start_tag_html(tag, attr_dict))
+        if tag in VOID_ELEMENTS:
+            return
+        element = _Element(tag)
+
+        if tag == "a" and _has_class(attr_dict, "slogan"):
+            anchor = _Anchor(self.stack[-1], _start_tag_html(tag, attr_dict))
+            element.anchor = anchor
+            self.anchors.append(anchor)
+            self.text_sinks.append((element, anchor.texts))
+            if anchor.link is None:
+                self.pending.append(anchor)
+
+        if tag == "span" and _has_class(attr_dict, "date"):
+            texts: List[str] = []
+            self.text_sinks.append((element, texts))
+            # 開啟中的元素都是它的祖先；還沒找到 span.date 的祖先一定在堆疊頂端連續的一段
+            for ancestor in reversed(self.stack):
+                if ancestor.date is not None:
+                    break
+                ancestor.date = texts
+
+        if tag in SKIP_TEXT:
+            self.skip_depth += 1
+        self.stack.append(element)
+
+    def handle_startendtag(self, tag: str, attrs) -> None:
+        # <tag/> 沒有內容，只需要處理 a.slogan 與 span.date 的開始與結束
+        self.handle_starttag(tag, attrs)
+        if tag not in VOID_ELEMENTS:
+            self.handle_endtag(tag)
+
+    def handle_endtag(self, tag: str) -> None:
+        # 關閉最近一個同名的開啟中元素（以及其內仍開啟的元素），找不到則忽略
+        for i in range(len(self.stack) - 1, 0, -1):
+            if self.stack[i].name == tag:
+                while len(self.stack) > i:
+                    self._close(self.stack.pop())
+                return
+
+    def _close(self, element: _Element) -> None:
+        if element.name in SKIP_TEXT:
+            self.skip_depth -= 1
+        if self.pending:
+            self._append_html(f"</{element.name}>")
+        anchor = element.anchor
+        if anchor is not None and anchor.link is None:
+            anchor.find_link(final=True)
+            self.pending.remove(anchor)
+        self.text_sinks = [(owner, texts) for owner, texts in self.text_sinks if owner is not element]
+
+    def handle_data(self, data: str) -> None:
+        if self.pending:
+            self._append_html(_escape(data))
+        self._add_text(data)
+
+    def unknown_decl(self, data: str) -> None:
+        # <![CDATA[...]]> 的內容也算文字（BeautifulSoup 的 CData，在 rt、template 內也不略過）
+        if data.upper().startswith("CDATA["):
+            content = data[len("CDATA["):]
+            if self.pending:
+                self._append_html(f"<![CDATA[{content}]]>")
+            self._add_text(content, skip=False)
+
+    def _add_text(self, data: str, skip: bool = True) -> None:
+        if (skip and self.skip_depth) or not self.text_sinks:
+            return
+        stripped = data.strip()
+        if stripped:
+            for _, texts in self.text_sinks:
+                texts.append(stripped)
+
+    def close(self) -> None:
+        super().close()
+        # 文件結束時仍開啟的元素視為在此關閉
+        while len(self.stack) > 1:
+            self._close(self.stack.pop())
+
+    def activities(self) -> List[Tuple[str, str, str]]:
+        """返回 (活動文字, 日期, 連結) 列表（尚未去重）"""
+        return [
+            ("".join(anchor.texts),
+             "".join(anchor.parent.date) if anchor.parent.date is not None else NO_DATE,
+             anchor.link or NO_LINK)
+            for anchor in self.anchors
+        ]
+
+
+def parse_activity_anchors(html: str) -> List[Tuple[str, str, str]]:
+    """單次走訪解析所有 a.slogan，返回 (活動文字, 日期, 連結) 列表（依頁面順序、尚未去重）"""
+    parser = ActivityParser()
+    parser.feed(html)
+    parser.close()
+    return parser.activities()
@@ -0,0 +1,182 @@
+import os
+import sys
+import json
+import time
+import hashlib
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+# 已看過的活動與上次回應的驗證資訊
+STATE_FILE = "pchome_state.json"
+# 超過此秒數沒有再出現的活動會從紀錄中移除
+DEFAULT_TTL = 7 * 24 * 3600
+
+NO_LINK = '無連結'
+
+
+def activity_id(activity: Tuple[str, str, str]) -> str:
+    """活動的識別：優先使用連結，沒有連結時使用活動文字"""
+    activity_text, date_info, activity_link = activity
+    return activity_link if activity_link != NO_LINK else activity_text
+
+
+def print_event(event: Dict[str, Any]) -> None:
+    """以 JSON Lines 輸出事件"""
+    print(json.dumps(event, ensure_ascii=False), flush=True)
+
+
+class PromotionStore:
+    """保存在磁碟的活動紀錄，超過 ttl 沒有再出現的活動會被移除"""
+
+    def __init__(self, path: str = STATE_FILE, ttl: float = DEFAULT_TTL):
+        """
+        參數:
+            path: 紀錄檔
+            ttl: 活動紀錄的保存秒數（從最後一次出現起算）
+        """
+        self.path = path
+        self.ttl = ttl
+        self.activities: Dict[str, Dict[str, Any]] = {}
+        # 活動頁面上次回應的 ETag / Last-Modified 與內容雜湊
+        self.validators: Dict[str, str] = {}
+        # 頁面上目前有的活動
+        self.present: List[str] = []
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.activities = data.get("activities", {})
+                self.validators = data.get("validators", {})
+                self.present = data.get("present", [])
+            except (OSError, ValueError) as e:
+                print(f"讀取活動紀錄時出錯: {e}，將重新建立", file=sys.stderr)
+
+    def update(self, activities: List[Tuple[str, str, str]], now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """記錄這次看到的活動，返回新出現或內容變動的活動事件"""
+        now = time.time() if now is None else now
+        timestamp = datetime.fromtimestamp(now).isoformat(timespec="seconds")
+        events = []
+        self.present = []
+        for activity in activities:
+            activity_text, date_info, activity_link = activity
+            key = activity_id(activity)
+            self.present.append(key)
+            current = {"text": activity_text, "date": date_info, "link": activity_link}
+            previous = self.activities.get(key)
+            if previous is None:
+                events.append({"time": timestamp, "type": "new", **current})
+                self.activities[key] = {**current, "first_seen": now, "last_seen": now}
+                continue
+            fields = {field: [previous[field], value] for field, value in current.items() if previous[field] != value}
+            if fields:
+                events.append({"time": timestamp, "type": "changed", **current, "fields": fields})
+            previous.update(current, last_seen=now)
+        return events
+
+    def touch(self, now: Optional[float] = None) -> None:
+        """頁面沒有變動：目前的活動都視為這次也出現過"""
+        now = time.time() if now is None else now
+        for key in self.present:
+            if key in self.activities:
+                self.activities[key]["last_seen"] = now
+
+    def expire(self, now: Optional[float] = None) -> int:
+        """移除過期的活動，返回移除的數量"""
+        now = time.time() if now is None else now
+        expired = [key for key, entry in self.activities.items() if now - entry["last_seen"] > self.ttl]
+        for key in expired:
+            del self.activities[key]
+        return len(expired)
+
+    def save(self) -> None:
+        data = {"activities": self.activities, "validators": self.validators, "present": self.present}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+class PromotionMonitor:
+    """定期檢查活動頁面，只輸出新出現或內容變動的活動
+
+    每次請求都帶上 If-None-Match / If-Modified-Since，伺服器回應 304 時不下載也不解析；
+    伺服器不支援時，以內容雜湊判斷頁面是否變動，沒變就不解析。
+    """
+
+    def __init__(self, url: str, session: requests.Session, parse: Callable[[str], List[Tuple[str, str, str]]],
+                 store: PromotionStore, interval: float = 300.0, timeout: float = 15.0,
+                 emit: Callable[[Dict[str, Any]], None] = print_event):
+        """
+        參數:
+            url: 活動頁面網址
+            session: HTTP session（crawler_common.http_client.create_session）
+            parse: 解析頁面的函式，返回去重後的 (活動文字, 日期, 連結) 列表
+            store: 活動紀錄
+            interval: 輪詢間隔秒數
+            emit: 處理事件的函式
+        """
+        self.url = url
+        self.session = session
+        self.parse = parse
+        self.store = store
+        self.interval = interval
+        self.timeout = timeout
+        self.emit = emit
+
+    def fetch(self) -> Optional[str]:
+        """以條件式請求取得頁面，內容沒有變動時返回 None"""
+        validators = self.store.validators
+        headers = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+        if response.status_code == 304:
+            return None
+        response.raise_for_status()
+
+        digest = hashlib.sha256(response.content).hexdigest()
+        unchanged = digest == validators.get("sha256")
+        self.store.validators = {
+            "etag": response.headers.get("ETag", ""),
+            "last_modified": response.headers.get("Last-Modified", ""),
+            "sha256": digest,
+        }
+        return None if unchanged else response.text
+
+    def poll_once(self) -> List[Dict[str, Any]]:
+        """檢查一次，返回這次的事件"""
+        html = self.fetch()
+        events = []
+        if html is not None:
+            activities = self.parse(html)
+            if not activities:
+                print("頁面中沒有活動連結，可能由腳本渲染", file=sys.stderr)
+            events = self.store.update(activities)
+        else:
+            self.store.touch()
+        self.store.expire()
+        self.store.save()
+        return events
+
+    def run(self, rounds: Optional[int] = None) -> None:
+        """持續輪詢，rounds 為 None 時直到按下 Ctrl+C"""
+        print(f"開始監看 PChome 活動，每 {self.interval:g} 秒檢查一次", file=sys.stderr)
+        count = 0
+        try:
+            while rounds is None or count < rounds:
+                start = time.monotonic()
+                try:
+                    for event in self.poll_once():
+                        self.emit(event)
+                except requests.RequestException as e:
+                    print(f"取得活動頁面時出錯: {e}", file=sys.stderr)
+                count += 1
+                if rounds is None or count < rounds:
+                    time.sleep(max(0.0, self.interval - (time.monotonic() - start)))
+        except KeyboardInterrupt:
+            print("已停止監看", file=sys.stderr)
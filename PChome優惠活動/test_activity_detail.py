@@ -0,0 +1,102 @@
+import json
+import time
+from datetime import datetime
+
+import requests
+
+from activity_detail import ActivityEnricher, DetailCache, detail_url, end_time_from_date, parse_activity_detail
+from benchmarks.fixtures import render_activity_detail_page
+
+BASE_URL = "https://shopping.pchome.com.tw/activity/collection.htm"
+
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+        self.headers = {"ETag": '"v1"'}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}")
+
+
+class FakeSession:
+    def __init__(self, pages):
+        self.pages = pages
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append(url)
+        page = self.pages[url]
+        if isinstance(page, Exception):
+            raise page
+        return FakeResponse(page)
+
+
+def test_parse_activity_detail():
+    detail = parse_activity_detail(render_activity_detail_page(3))
+    assert detail["product_count"] is not None
+    assert "4 折起" in detail["discounts"]
+    assert detail["end_time"] == "2026-05-04T23:59:59"
+
+
+def test_detail_url_and_end_time_from_date():
+    assert detail_url("/onsale/v1?a=1&b=2", BASE_URL) == "https://shopping.pchome.com.tw/onsale/v1?a=1&b=2"
+    assert detail_url("無連結", BASE_URL) is None
+    assert detail_url("javascript:void(0)", BASE_URL) is None
+    assert end_time_from_date("12/20 ~ 1/5", datetime(2025, 12, 1)) == "2026-01-05T23:59:59"
+
+
+def test_errors_are_per_url_and_cache_is_saved(tmp_path, monkeypatch):
+    pages = {
+        "https://a.test/ok": render_activity_detail_page(1),
+        "https://a.test/broken": "<html></html>",
+        "https://a.test/down": requests.ConnectionError("refused"),
+    }
+
+    import activity_detail
+    original = activity_detail.parse_activity_detail
+
+    def parse(page):
+        if page == "<html></html>":
+            raise ValueError("unexpected markup")
+        return original(page)
+
+    monkeypatch.setattr(activity_detail, "parse_activity_detail", parse)
+    cache = DetailCache(str(tmp_path / "details.json"))
+    enricher = ActivityEnricher(FakeSession(pages), cache, workers=3, host_interval=0)
+    activities = [("A", "", url) for url in pages] + [("B", "", "無連結")]
+    details = enricher.enrich(activities, BASE_URL)
+
+    assert "error" not in details[0]
+    assert details[1]["error"].startswith("解析失敗")
+    assert "refused" in details[2]["error"]
+    assert details[3] is None
+    with open(tmp_path / "details.json", encoding="utf-8") as f:
+        assert list(json.load(f)) == ["https://a.test/ok"]
+
+
+def test_cache_drops_expired_entries(tmp_path):
+    path = tmp_path / "details.json"
+    now = time.time()
+    path.write_text(json.dumps({
+        "https://a.test/new": {"fetched_at": now, "detail": {}},
+        "https://a.test/old": {"fetched_at": now - 30 * 86400, "detail": {}},
+    }), encoding="utf-8")
+    cache = DetailCache(str(path), retention=7 * 86400)
+    assert list(cache.entries) == ["https://a.test/new"]
+
+    cache.put("https://a.test/stale", {"fetched_at": now - 8 * 86400, "detail": {}})
+    cache.save()
+    assert list(json.loads(path.read_text(encoding="utf-8"))) == ["https://a.test/new"]
+
+
+def test_fresh_cache_skips_requests(tmp_path):
+    url = "https://a.test/ok"
+    session = FakeSession({url: render_activity_detail_page(1)})
+    cache = DetailCache(str(tmp_path / "details.json"))
+    enricher = ActivityEnricher(session, cache, host_interval=0)
+    enricher.enrich([("A", "", url)], BASE_URL)
+    enricher.enrich([("A", "", url)], BASE_URL)
+    assert session.requests == [url]
@@ -0,0 +1,66 @@
+import pytest
+
+from activity_parser import NO_DATE, NO_LINK, parse_activity_anchors
+from benchmarks.fixtures import render_pchome_page
+from PChome即時優惠活動 import parse_activities, parse_activity_anchors_bs4
+
+EDGE_CASES = [
+    # 日期在連結之後、實體與數字參照、多個 class
+    '<div><a class="x slogan" href="/a?x=1&amp;y=2">A&#39;s <b>sale</b></a><span class="date"> 3/1 ~ 3/9 </span></div>',
+    # 沒有 href、空的 href、沒有日期
+    '<p><a class="slogan">無連結活動</a></p><p><a class="slogan" href="">空連結</a></p>',
+    # 父元素的第一個 span.date 在另一層
+    '<li><span class="date">1/1</span><div><a class="slogan" href="/b">B</a><span class="date">2/2</span></div></li>',
+    # script / style 內的文字不算
+    '<div><a class="slogan" href="/c">C<script>var x = 1;</script><style>.a{}</style></a></div>',
+    # 空元素、自行關閉的標籤與多餘的結束標籤
+    '<div><a class="slogan" href="/d">D<br>E<img src="x"/></span></a><span class="date">4/4</span></div>',
+    # 沒有關閉的 a.slogan 直到文件結束
+    '<section><a class="slogan" href="/e">E',
+    # 注音的 rt、rp 與 template 內的文字不算
+    '<div><a class="slogan" href="/f">漢<ruby>字<rt>ji</rt><rp>(</rp></ruby><template>t</template></a></div>',
+    # CDATA 的內容算文字（在 rt 內也算）
+    '<div><a class="slogan" href="/g">G</a><span class="date">q<![CDATA[zz]]>q</span></div>',
+    '<div><a class="slogan" href="/g2">G<rt>x<![CDATA[cd]]></rt></a></div>',
+    # 連結取自 HTML 中第一個 href="..."：其他屬性名稱結尾也是 href、值含引號、沒有值
+    '<div><a class="slogan" data-href="/first" href="/h">H</a></div>',
+    '<div><a class="slogan" href=\'/i"x\'>I</a><a class="slogan" href=\'/j"&#39;\'>J</a></div>',
+    '<div><a class="slogan" href>K</a></div>',
+    # a.slogan 本身沒有 href 時取子孫的 href，沒關閉的引號則為無連結
+    '<div><a class="slogan"><b href="/inner&amp;x">L</b></a></div>',
+    '<div><a class="slogan"><b title=\'href="abc\'>M</b></a></div>',
+    '<div><a class="slogan">N<span class="slogan-x">href="/text"</span></a></div>',
+]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_beautifulsoup_on_fixture_pages(seed):
+    html = render_pchome_page(count=300, seed=seed)
+    assert parse_activity_anchors(html) == parse_activity_anchors_bs4(html)
+
+
+@pytest.mark.parametrize("html", EDGE_CASES)
+def test_matches_beautifulsoup_on_edge_cases(html):
+    assert parse_activity_anchors(html) == parse_activity_anchors_bs4(html)
+
+
+def test_link_keeps_escaped_entities():
+    html = EDGE_CASES[0] + EDGE_CASES[1]
+    assert parse_activity_anchors(html) == [
+        ("A'ssale", "3/1 ~ 3/9", "/a?x=1&amp;y=2"),
+        ("無連結活動", NO_DATE, NO_LINK),
+        ("空連結", NO_DATE, NO_LINK),
+    ]
+
+
+def test_ruby_annotations_and_cdata():
+    assert parse_activity_anchors(EDGE_CASES[6]) == [("漢字", NO_DATE, "/f")]
+    assert parse_activity_anchors(EDGE_CASES[7]) == [("G", "qzzq", "/g")]
+
+
+def test_parse_activities_removes_duplicates():
+    html = render_pchome_page(count=300, seed=0)
+    activities = parse_activities(html)
+    assert len(activities) == len(set(activities)) < len(parse_activity_anchors(html))
+    # 連結與原本的輸出相同，保留未還原的 &amp;
+    assert all("&amp;id=" in link for _, _, link in activities)
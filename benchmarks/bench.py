@@ -0,0 +1,358 @@
+import os
+import io
+import sys
+import json
+import time
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+import importlib.util
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+# 讓 benchmarks/ 內的模組與專案根目錄的共用模組都能匯入
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+from fixtures import ROOT_DIR, video_ids
+from fixture_server import FixtureServer
+
+sys.path.insert(0, ROOT_DIR)
+from crawler_common.http_client import create_session
+
+# 各爬蟲腳本的位置
+SCRIPTS = {
+    "courses": os.path.join(ROOT_DIR, "nchu_系所課表", "課表資訊.py"),
+    "pchome": os.path.join(ROOT_DIR, "PChome優惠活動", "PChome即時優惠活動.py"),
+    "ilearning": os.path.join(ROOT_DIR, "nchu_ilearning3課程資訊", "ilearning3課程資訊.py"),
+    "yt": os.path.join(ROOT_DIR, "youtube影片下載", "YT.py"),
+}
+
+
+def load_script(target: str):
+    """以檔案路徑匯入爬蟲腳本（腳本所在目錄也加入 sys.path，讓同目錄的模組可以匯入）"""
+    path = SCRIPTS[target]
+    script_dir = os.path.dirname(path)
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+    spec = importlib.util.spec_from_file_location(f"bench_{target}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def peak_rss_mb() -> Optional[float]:
+    """行程到目前為止的最大常駐記憶體（MB），無法取得時返回 None"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 以 KB 為單位，macOS 以 byte 為單位
+        return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+    except ImportError:
+        return None
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class PhaseTimer:
+    """記錄每個階段每次執行的耗時"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = {}
+
+    @contextlib.contextmanager
+    def measure(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.samples.setdefault(phase, []).append(time.perf_counter() - start)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        result = {}
+        for phase, values in self.samples.items():
+            total = sum(values)
+            result[phase] = {
+                "count": len(values),
+                "total_s": total,
+                "mean_ms": total / len(values) * 1000,
+                "p50_ms": percentile(values, 0.50) * 1000,
+                "p95_ms": percentile(values, 0.95) * 1000,
+                "pages_per_s": len(values) / total if total else 0.0,
+            }
+        return result
+
+
+def bench_courses(base_url: str, timer: PhaseTimer, rounds: int, browser: bool = False) -> int:
+    """課程查詢：分別量測下載、解析，以及 scrape_department_courses() 的完整流程"""
+    module = load_script("courses")
+    module.course_url = f"{base_url}/cofsys/plsql/crseqry_home"
+    session = create_session(retries=0)
+    depts = module.get_departments(lambda: module.fetch_query_page(session), refresh=True, fallback=[])
+
+    pages = 0
+    for _ in range(rounds):
+        for dept in depts:
+            dept_code = dept["code"]
+            with timer.measure("courses.fetch"):
+                content = session.get(f"{module.course_url}_now", params={"v_dept": dept_code}).content
+            with timer.measure("courses.parse"):
+                module.parse_course_tables(content)
+            with timer.measure("courses.scrape"):
+                module.scrape_department_courses(dept_code, dept["name"], session=session)
+            pages += 1
+
+    if browser:
+        module.launch_browser()
+        try:
+            for dept in depts:
+                with timer.measure("courses.scrape_browser"):
+                    module.scrape_department_courses(dept["code"], dept["name"])
+            # 在最大的幾個系所頁面上比較兩種頁內擷取方式（同一個已載入的頁面）
+            for dept_code in largest_departments(module, session, depts):
+                module.page.get(f"{module.course_url}_now?v_dept={dept_code}")
+                module.wait_for_course_tables(module.page, dept_code)
+                for _ in range(rounds):
+                    with timer.measure("courses.extract_innertext"):
+                        json.loads(module.page.run_js(module.EXTRACT_TABLES_JS))
+                    with timer.measure("courses.extract_bulk"):
+                        module.expand_row_tables(json.loads(module.page.run_js(module.EXTRACT_TABLES_BULK_JS)))
+        finally:
+            module.page.quit()
+    session.close()
+    return pages
+
+
+def largest_departments(module, session, depts, count: int = 5) -> List[str]:
+    """頁面最大的幾個系所（例如 U86、U52）"""
+    sizes = {dept["code"]: len(session.get(f"{module.course_url}_now", params={"v_dept": dept["code"]}).content)
+             for dept in depts}
+    return sorted(sizes, key=sizes.get, reverse=True)[:count]
+
+
+def bench_pchome(base_url: str, timer: PhaseTimer, rounds: int, browser: bool = False) -> int:
+    """PChome：以 HTTP 下載活動頁面並執行 parse_activities() 的去重流程、並行補上活動內頁資訊
+    （--browser 時另外量測無頭瀏覽器）"""
+    module = load_script("pchome")
+    page_url = f"{base_url}/activity/collection.htm"
+    session = create_session(retries=0)
+
+    for _ in range(rounds):
+        with timer.measure("pchome.fetch"):
+            html = module.fetch_page_http(page_url, session)
+        with timer.measure("pchome.parse"):
+            activities = module.parse_activities(html)
+        with timer.measure("pchome.parse_bs4"):
+            reference = module.parse_activities(html, parser="bs4")
+        if activities != reference:
+            raise AssertionError("單次走訪解析器與 BeautifulSoup 的結果不同")
+
+    # 活動內頁：把連結導向本機，依序量測無快取、快取過期（條件式請求 304）與快取有效三種情況
+    activities = [(text, date, link.replace("https://24h.pchome.com.tw", base_url))
+                  for text, date, link in activities]
+    cache = module.DetailCache(os.path.join(os.getcwd(), "pchome_details.json"))
+    for phase, max_age in (("pchome.enrich", 0), ("pchome.enrich_revalidate", 0), ("pchome.enrich_cached", 3600)):
+        for _ in range(rounds):
+            if phase == "pchome.enrich":
+                cache.entries = {}
+            enricher = module.ActivityEnricher(create_session(pool_size=8, retries=0), cache, workers=8,
+                                               host_interval=0, max_age=max_age)
+            with timer.measure(phase):
+                details = enricher.enrich(activities, page_url)
+            enricher.session.close()
+            if any(detail is None or "error" in detail for detail in details):
+                raise AssertionError("有活動內頁無法取得")
+
+    if browser:
+        for _ in range(rounds):
+            with timer.measure("pchome.fetch_browser"):
+                module.fetch_page_source(page_url)
+    session.close()
+    return rounds
+
+
+def bench_ilearning(base_url: str, timer: PhaseTimer, rounds: int, browser: bool = False) -> int:
+    """iLearning：下載 dashboard、解析課程卡片，並行收集各課程內容"""
+    module = load_script("ilearning")
+    session = create_session(retries=0)
+
+    for _ in range(rounds):
+        with timer.measure("ilearning.fetch"):
+            html = session.get(f"{base_url}/dashboard").text
+        with timer.measure("ilearning.parse"):
+            module.parse_dashboard_courses(html)
+
+    # 以同一個連線池並行收集各課程的首頁、公告與教材
+    for _ in range(rounds):
+        harvester = module.CourseHarvester(create_session(pool_size=8, retries=0), base_url, workers=8,
+                                           output_dir=os.path.join(os.getcwd(), "課程內容"))
+        with timer.measure("ilearning.harvest"):
+            courses = harvester.harvest(module.parse_course_cards(html, base_url))
+        harvester.session.close()
+        if any(course["errors"] for course in courses):
+            raise AssertionError("有課程頁面無法取得")
+    session.close()
+    return rounds
+
+
+def bench_yt(base_url: str, timer: PhaseTimer, rounds: int, browser: bool = False) -> int:
+    """YouTubeScraper：影片資訊（以本機 info JSON 取代 yt-dlp 的網路請求）與備用搜尋"""
+    module = load_script("yt")
+
+    class FixtureYouTubeScraper(module.YouTubeScraper):
+        OEMBED_URL = f"{base_url}/oembed"
+        SEARCH_URL = f"{base_url}/results"
+
+        def _extract_info(self, url):
+            response = requests.get(f"{base_url}/info/{self._extract_video_id(url)}.json")
+            response.raise_for_status()
+            return response.json()
+
+    # 量測實際的請求，不使用影片資訊快取；另以暫存目錄的快取量測 oEmbed 已快取時的備用搜尋
+    scraper = FixtureYouTubeScraper(output_dir="downloads", use_cache=False)
+    cached_scraper = FixtureYouTubeScraper(output_dir="downloads",
+                                           cache=module.MetadataCache(os.path.join(os.getcwd(), ".cache")))
+    cached_scraper._search_fallback("bench", limit=10)
+    ids = video_ids()
+
+    # 以 HTTP 請求數計算頁數：影片資訊各一次，備用搜尋為搜尋頁加上每個結果的 oEmbed（已快取時只有搜尋頁）
+    pages = 0
+    for _ in range(rounds):
+        for video_id in ids:
+            url = f"https://www.youtube.com/watch?v={video_id}"
+            with timer.measure("yt.extract"):
+                info = scraper._extract_info(url)
+            with timer.measure("yt.format"):
+                scraper._format_video_info(info, video_id)
+            with timer.measure("yt.get_video_info"):
+                scraper.get_video_info(url)
+            pages += 2
+        with timer.measure("yt.search_fallback"):
+            scraper._search_fallback("bench", limit=10)
+        with timer.measure("yt.search_fallback_cached"):
+            cached_scraper._search_fallback("bench", limit=10)
+        pages += 12
+    return pages
+
+
+TARGETS: Dict[str, Callable[..., int]] = {
+    "courses": bench_courses,
+    "pchome": bench_pchome,
+    "ilearning": bench_ilearning,
+    "yt": bench_yt,
+}
+
+
+def run(targets: List[str], rounds: int, latency: float, browser: bool, trace: bool) -> Dict[str, Any]:
+    """在暫存目錄中執行各項量測，返回可存成 JSON 的結果"""
+    results: Dict[str, Any] = {"rounds": rounds, "latency_ms": latency * 1000, "targets": {}}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir, FixtureServer(latency=latency) as server:
+        # 爬蟲腳本會在目前目錄寫入輸出檔案，移到暫存目錄避免覆蓋真實資料
+        os.chdir(workdir)
+        try:
+            for target in targets:
+                timer = PhaseTimer()
+                if trace:
+                    tracemalloc.start()
+                start = time.perf_counter()
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        pages = TARGETS[target](server.base_url, timer, rounds, browser)
+                except ImportError as e:
+                    results["targets"][target] = {"skipped": f"缺少套件: {e}"}
+                    continue
+                finally:
+                    traced_peak = tracemalloc.get_traced_memory()[1] if trace else None
+                    if trace:
+                        tracemalloc.stop()
+                elapsed = time.perf_counter() - start
+                results["targets"][target] = {
+                    "pages": pages,
+                    "elapsed_s": elapsed,
+                    "pages_per_s": pages / elapsed if elapsed else 0.0,
+                    "peak_rss_mb": peak_rss_mb(),
+                    "traced_peak_mb": traced_peak / 1024 / 1024 if traced_peak is not None else None,
+                    "phases": timer.summary(),
+                }
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    for target, result in results["targets"].items():
+        if "skipped" in result:
+            print(f"[{target}] 略過（{result['skipped']}）")
+            continue
+        memory = f"峰值 RSS {result['peak_rss_mb']:.1f} MB" if result["peak_rss_mb"] is not None else "峰值 RSS 無法取得"
+        if result["traced_peak_mb"] is not None:
+            memory += f"，Python 配置峰值 {result['traced_peak_mb']:.1f} MB"
+        print(f"[{target}] {result['pages']} 頁 / {result['elapsed_s']:.2f} 秒 = "
+              f"{result['pages_per_s']:.1f} 頁/秒，{memory}")
+        print(f"  {'階段':<24}{'次數':>6}{'平均ms':>10}{'p50ms':>10}{'p95ms':>10}{'次/秒':>10}")
+        for phase, stats in result["phases"].items():
+            print(f"  {phase:<24}{stats['count']:>6}{stats['mean_ms']:>10.2f}{stats['p50_ms']:>10.2f}"
+                  f"{stats['p95_ms']:>10.2f}{stats['pages_per_s']:>10.1f}")
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """與基準結果比較各階段的 p50，返回變慢超過 tolerance 比例的階段"""
+    regressions = []
+    for target, result in results["targets"].items():
+        base_phases = baseline.get("targets", {}).get(target, {}).get("phases", {})
+        for phase, stats in result.get("phases", {}).items():
+            base = base_phases.get(phase)
+            if base and base["p50_ms"] > 0 and stats["p50_ms"] > base["p50_ms"] * (1 + tolerance):
+                regressions.append(f"{phase}: p50 {base['p50_ms']:.2f} ms -> {stats['p50_ms']:.2f} ms "
+                                   f"(+{(stats['p50_ms'] / base['p50_ms'] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="以本機替身伺服器離線量測各爬蟲的效能")
+    parser.add_argument("targets", nargs="*", metavar="TARGET",
+                        help=f"要量測的項目（{', '.join(TARGETS)}），預設全部")
+    parser.add_argument("--rounds", type=int, default=3, help="每個項目重複的輪數")
+    parser.add_argument("--latency", type=float, default=0.0, help="每個請求模擬的網路延遲（毫秒）")
+    parser.add_argument("--browser", action="store_true", help="一併量測以瀏覽器載入本機頁面的流程")
+    parser.add_argument("--tracemalloc", action="store_true", help="記錄 Python 記憶體配置峰值（會拖慢執行）")
+    parser.add_argument("--save", metavar="FILE", help="把結果存成 JSON，可作為之後比較的基準")
+    parser.add_argument("--compare", metavar="FILE", help="與先前 --save 的基準結果比較")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p50 允許變慢的比例（預設 0.2）")
+    args = parser.parse_args()
+    unknown = [target for target in args.targets if target not in TARGETS]
+    if unknown:
+        parser.error(f"未知的項目: {', '.join(unknown)}")
+    return args
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = run(args.targets or list(TARGETS), args.rounds, args.latency / 1000, args.browser, args.tracemalloc)
+    print_report(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\n效能退步:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\n與基準相比沒有明顯退步")
@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import random
+import argparse
+from typing import List, Optional, Sequence, Tuple
+
+# 讓 benchmarks/ 內的模組與 iLearning 目錄中的辨識器都能匯入
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+from fixtures import ROOT_DIR
+from bench import percentile
+
+ILEARNING_DIR = os.path.join(ROOT_DIR, "nchu_ilearning3課程資訊")
+sys.path.insert(0, ILEARNING_DIR)
+from captcha_solver import TemplateSolver, load_samples, DEFAULT_MIN_CONFIDENCE
+
+# 預設報告的信心門檻
+DEFAULT_THRESHOLDS = (0.0, 0.2, DEFAULT_MIN_CONFIDENCE, 0.5, 0.7)
+
+
+def split_samples(samples: Sequence[Tuple[str, bytes]], holdout: float,
+                  seed: int) -> Tuple[List[Tuple[str, bytes]], List[Tuple[str, bytes]]]:
+    """以固定亂數種子把樣本分成訓練與測試兩組"""
+    shuffled = list(samples)
+    random.Random(seed).shuffle(shuffled)
+    test_count = max(1, int(len(shuffled) * holdout))
+    return shuffled[test_count:], shuffled[:test_count]
+
+
+def evaluate(solver: TemplateSolver, samples: Sequence[Tuple[str, bytes]]) -> List[Tuple[str, str, float, float]]:
+    """逐一辨識，返回 (答案, 辨識結果, 信心, 耗時毫秒) 列表"""
+    results = []
+    for label, image in samples:
+        start = time.perf_counter()
+        text, confidence = solver.solve(image)
+        results.append((label, text, confidence, (time.perf_counter() - start) * 1000))
+    return results
+
+
+def print_report(results: Sequence[Tuple[str, str, float, float]], thresholds: Sequence[float],
+                 train_seconds: Optional[float] = None) -> None:
+    total = len(results)
+    correct = sum(label == text for label, text, _, _ in results)
+    char_total = sum(len(label) for label, _, _, _ in results)
+    char_correct = sum(a == b for label, text, _, _ in results for a, b in zip(label, text))
+    latencies = sorted(elapsed for _, _, _, elapsed in results)
+
+    print(f"測試樣本 {total} 張")
+    if train_seconds is not None:
+        print(f"訓練耗時 {train_seconds:.2f} 秒")
+    print(f"整串正確率 {correct / total:.1%}，字元正確率 {char_correct / max(1, char_total):.1%}")
+    print(f"每張耗時 平均 {sum(latencies) / total:.2f} ms，p50 {percentile(latencies, 0.5):.2f} ms，"
+          f"p95 {percentile(latencies, 0.95):.2f} ms")
+    print()
+    # 門檻以下的樣本會交給 Gemini：本機處理比例越高，API 呼叫越少
+    print(f"  {'信心門檻':<8}{'本機處理':>10}{'本機正確率':>12}{'改用備援':>10}")
+    for threshold in thresholds:
+        accepted = [(label, text) for label, text, confidence, _ in results if confidence >= threshold]
+        accuracy = sum(label == text for label, text in accepted) / len(accepted) if accepted else 0.0
+        print(f"  {threshold:<12.2f}{len(accepted) / total:>10.1%}{accuracy:>14.1%}"
+              f"{(total - len(accepted)) / total:>12.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="離線量測本機驗證碼辨識器的正確率與耗時")
+    parser.add_argument("samples", nargs="?", default=os.path.join(ILEARNING_DIR, "captcha_samples"),
+                        help="樣本目錄，檔名為「答案_任意文字.png」（預設為登入時保存的 captcha_samples/）")
+    parser.add_argument("--model", help="直接量測既有的模型檔（全部樣本都用來測試），不指定時先以部分樣本訓練")
+    parser.add_argument("--holdout", type=float, default=0.2, help="不指定 --model 時保留作為測試的比例（預設 0.2）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=list(DEFAULT_THRESHOLDS),
+                        help="要報告的信心門檻")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.samples):
+        parser.error(f"找不到樣本目錄 {args.samples}，可先以 ilearning3課程資訊.py --collect-captchas 收集")
+    samples = load_samples(args.samples)
+    if not samples:
+        parser.error(f"{args.samples} 中沒有圖片")
+
+    train_seconds = None
+    if args.model:
+        solver = TemplateSolver.load(args.model)
+        test = samples
+    else:
+        if len(samples) < 2:
+            parser.error("至少需要 2 張樣本才能分成訓練與測試兩組")
+        train, test = split_samples(samples, args.holdout, args.seed)
+        start = time.perf_counter()
+        solver = TemplateSolver.train(train)
+        train_seconds = time.perf_counter() - start
+        print(f"訓練樣本 {len(train)} 張，字元樣本 {len(solver.templates)} 個")
+    print_report(evaluate(solver, test), args.thresholds, train_seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import re
+import sys
+import json
+import hashlib
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from typing import Dict, Optional, Tuple
+
+import fixtures
+
+# LMS 課程首頁 /course/<id>，公告 /course/bulletin/<id>，教材 /course/doc/<id>
+LMS_COURSE_PATTERN = re.compile(r"^/course/(?:(bulletin|doc)/)?(\d+)$")
+
+
+class FixtureSite:
+    """各爬蟲目標網站的離線替身：課程查詢、PChome 活動頁、LMS dashboard 與 YouTube
+
+    有錄製的頁面（benchmarks/fixtures/）時優先使用，否則以固定亂數種子產生，
+    讓每次量測的輸入都相同。
+    """
+
+    def __init__(self, pchome_count: int = 300, dashboard_count: int = 40, video_count: int = 20):
+        self.course_data = fixtures.load_course_data()
+        self.dept_codes = list(self.course_data)
+        self.video_ids = fixtures.video_ids(video_count)
+        self._pages: Dict[str, bytes] = {}
+
+        self._pages["/activity/collection.htm"] = (
+            fixtures.read_recorded("collection.htm")
+            or fixtures.render_pchome_page(pchome_count).encode("utf-8"))
+        self._pages["/dashboard"] = (
+            fixtures.read_recorded("dashboard.html")
+            or fixtures.render_dashboard_page(dashboard_count).encode("utf-8"))
+        self._pages["/cofsys/plsql/crseqry_home"] = (
+            fixtures.read_recorded("crseqry_home.html")
+            or fixtures.render_query_page(self.dept_codes).encode("utf-8"))
+        self._pages["/results"] = fixtures.render_search_page(self.video_ids).encode("utf-8")
+        # 系所頁面在第一次請求時才產生並快取
+        self._lock = threading.Lock()
+
+    def course_page(self, dept_code: str) -> Optional[bytes]:
+        key = f"crseqry_home_now?v_dept={dept_code}"
+        with self._lock:
+            if key not in self._pages:
+                recorded = fixtures.read_recorded(f"crseqry_home_now_{dept_code}.html")
+                if recorded is not None:
+                    self._pages[key] = recorded
+                elif dept_code in self.course_data:
+                    self._pages[key] = fixtures.render_course_page(self.course_data[dept_code]).encode("utf-8")
+                else:
+                    return None
+            return self._pages[key]
+
+    def video_info(self, video_id: str) -> bytes:
+        recorded = fixtures.read_recorded(f"info_{video_id}.json")
+        return recorded or json.dumps(fixtures.make_video_info(video_id), ensure_ascii=False).encode("utf-8")
+
+    def oembed(self, video_url: str) -> Optional[bytes]:
+        video_id = video_url.rsplit("v=", 1)[-1]
+        if video_id not in self.video_ids:
+            return None
+        info = fixtures.make_video_info(video_id)
+        data = {"title": info["title"], "author_name": info["uploader"], "type": "video"}
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    def resolve(self, path: str) -> Tuple[int, str, bytes]:
+        """依請求路徑返回 (狀態碼, Content-Type, 內容)"""
+        parsed = urlparse(path)
+        query = parse_qs(parsed.query)
+        html_type = "text/html; charset=utf-8"
+        json_type = "application/json; charset=utf-8"
+
+        if parsed.path == "/cofsys/plsql/crseqry_home_now":
+            body = self.course_page(query.get("v_dept", [""])[0])
+            return (200, html_type, body) if body is not None else (404, html_type, b"")
+        if parsed.path.startswith("/info/") and parsed.path.endswith(".json"):
+            return 200, json_type, self.video_info(parsed.path[len("/info/"):-len(".json")])
+        if parsed.path.startswith("/onsale/v") and parsed.path[len("/onsale/v"):].isdigit():
+            return 200, html_type, fixtures.render_activity_detail_page(int(parsed.path[len("/onsale/v"):])).encode("utf-8")
+        match = LMS_COURSE_PATTERN.match(parsed.path)
+        if match:
+            kind, course_id = match.group(1), int(match.group(2))
+            if kind is None:
+                return 200, html_type, fixtures.render_lms_course_page(course_id).encode("utf-8")
+            return 200, html_type, fixtures.render_lms_listing_page(course_id, kind).encode("utf-8")
+        if parsed.path == "/oembed":
+            body = self.oembed(query.get("url", [""])[0])
+            return (200, json_type, body) if body is not None else (404, json_type, b"")
+        if parsed.path in self._pages:
+            return 200, html_type, self._pages[parsed.path]
+        return 404, html_type, b""
+
+
+def make_handler(site: FixtureSite, latency: float = 0.0):
+    class FixtureHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # 標頭與內容分兩次寫出，不關閉 Nagle 時 keep-alive 連線的每個請求會多等約 40 毫秒
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            status, content_type, body = site.resolve(self.path)
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if status == 200 and self.headers.get("If-None-Match") == etag:
+                # 與真實網站一樣支援條件式請求
+                status, body = 304, b""
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            if status in (200, 304):
+                self.send_header("ETag", etag)
+            if status != 304:
+                self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return FixtureHandler
+
+
+class FixtureServer:
+    """在背景執行緒啟動本機 HTTP 伺服器，可用 with 陳述式自動關閉"""
+
+    def __init__(self, site: Optional[FixtureSite] = None, host: str = "127.0.0.1", port: int = 0,
+                 latency: float = 0.0):
+        """
+        參數:
+            site: 提供頁面的 FixtureSite
+            port: 0 表示自動選擇可用的連接埠
+            latency: 每個請求額外延遲的秒數，用來模擬網路往返時間
+        """
+        self.site = site or FixtureSite()
+        self.httpd = ThreadingHTTPServer((host, port), make_handler(self.site, latency))
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FixtureServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="啟動離線測試用的本機替身伺服器")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="每個請求的額外延遲（毫秒）")
+    args = parser.parse_args()
+
+    server = FixtureServer(port=args.port, latency=args.latency / 1000)
+    print(f"伺服器已啟動: {server.base_url}（系所 {len(server.site.dept_codes)} 個），按 Ctrl+C 停止", file=sys.stderr)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -0,0 +1,180 @@
+import os
+import json
+import html
+import random
+from typing import Dict, List
+
+# 專案根目錄與錄製頁面的存放位置
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RECORDED_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+# 產生課表頁面時使用的課程資料（爬蟲上次的輸出）
+COURSE_DATA_DIR = os.path.join(ROOT_DIR, "nchu_系所課表", "課程資訊")
+
+# 與 course_parser.COURSE_FIELDS 相同的欄位順序；這裡另外列出，避免載入 bs4 才能產生頁面
+COURSE_FIELDS = [
+    '必選別', '選課號碼', '科目名稱', '先修科目', '全半年', '學分數', '上課時數', '實習時數',
+    '上課時間', '實習時間', '上課教室', '實習教室', '上課教師', '實習教師', '開課單位',
+    '開課人數', '外系人數', '可加選餘額', '授課語言',
+]
+REMARK_FIELD = '備註'
+
+
+def read_recorded(name: str):
+    """讀取 benchmarks/fixtures/ 中錄製的真實頁面，不存在時返回 None"""
+    path = os.path.join(RECORDED_DIR, name)
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def load_course_data() -> Dict[str, List[Dict[str, str]]]:
+    """讀取各系所的課程 JSON，返回 {系所代碼: 課程列表}"""
+    data = {}
+    if not os.path.isdir(COURSE_DATA_DIR):
+        return data
+    for filename in sorted(os.listdir(COURSE_DATA_DIR)):
+        if not filename.endswith(".json") or "_" not in filename:
+            continue
+        with open(os.path.join(COURSE_DATA_DIR, filename), "r", encoding="utf-8") as f:
+            courses = json.load(f)
+        if isinstance(courses, list):
+            data[filename.split("_", 1)[0]] = courses
+    return data
+
+
+def _cell(value: str) -> str:
+    return "<br>".join(html.escape(line) for line in value.split("\n"))
+
+
+def render_course_page(courses: List[Dict[str, str]]) -> str:
+    """把課程列表還原成 crseqry_home_now 的表格結構（每個標題一個 mytable）"""
+    tables: Dict[str, List[Dict[str, str]]] = {}
+    for course in courses:
+        tables.setdefault(course.get('標題', ''), []).append(course)
+
+    parts = ['<html><head><meta charset="utf-8"><title>課程查詢</title></head><body>']
+    for header, rows in tables.items():
+        has_remark = any(REMARK_FIELD in course for course in rows)
+        fields = COURSE_FIELDS + ([REMARK_FIELD] if has_remark else [])
+        parts.append('<table name="mytable" class="tablesorter">')
+        parts.append(f'<tr><td colspan="{len(fields)}"><div class="tablesorter-header-inner">'
+                     f'<strong>{html.escape(header)}</strong></div></td></tr>')
+        parts.append("<tr>" + "".join(f"<td>{field}</td>" for field in fields) + "</tr>")
+        for course in rows:
+            parts.append("<tr>" + "".join(f"<td>{_cell(course.get(field, ''))}</td>" for field in fields) + "</tr>")
+        parts.append("</table>")
+    parts.append("</body></html>")
+    return "\n".join(parts)
+
+
+def render_query_page(dept_codes: List[str]) -> str:
+    """課程查詢首頁的系所選單"""
+    options = "".join(f'<option value="{code}">{code} 測試系所</option>' for code in dept_codes)
+    return f'<html><body><form><select name="v_dept">{options}</select></form></body></html>'
+
+
+def render_pchome_page(count: int = 300, seed: int = 0) -> str:
+    """PChome 活動頁面：a.slogan 與同層的 span.date，包含重複連結與帶 & 的網址"""
+    rng = random.Random(seed)
+    parts = ['<html><body><div id="collection">']
+    for i in range(count):
+        # 約三分之一的活動在頁面上重複出現
+        n = rng.randrange(max(1, count * 2 // 3))
+        parts.append(
+            f'<div class="item"><a class="slogan" href="https://24h.pchome.com.tw/onsale/v{n}?utm_source=pc&amp;id={n}">'
+            f'<span>限時優惠 {n} 件 {n % 9 + 1} 折</span></a>'
+            f'<span class="date">{1 + n % 12}/{1 + n % 28} ~ {1 + (n + 1) % 12}/{1 + n % 28}</span></div>'
+        )
+    parts.append("</div></body></html>")
+    return "\n".join(parts)
+
+
+def render_activity_detail_page(n: int) -> str:
+    """PChome 活動內頁：商品數、折扣條件、結束時間（JSON-LD）與商品連結"""
+    rng = random.Random(n)
+    products = "".join(
+        f'<li><a href="https://24h.pchome.com.tw/prod/DYAJ{n:03d}-A{i:05d}">商品 {i}</a> ${rng.randrange(100, 5000)}</li>'
+        for i in range(20)
+    )
+    return (
+        '<html><head><script type="application/ld+json">'
+        f'{{"@type": "Offer", "priceValidUntil": "2026-{1 + (n + 1) % 12:02d}-{1 + n % 28:02d}T23:59:59"}}</script></head>'
+        f'<body><h1>限時優惠 {n}</h1><p>全館 {n % 9 + 1} 折起，滿 {(n % 5 + 1) * 500} 現折 {(n % 5 + 1) * 50}</p>'
+        f'<p>共 {rng.randrange(20, 2000)} 件商品</p><ul>{products}</ul></body></html>'
+    )
+
+
+def render_dashboard_page(count: int = 40) -> str:
+    """LMS dashboard 上的課程卡片"""
+    parts = ['<html><body><div class="dashboard">']
+    for i in range(count):
+        parts.append(
+            f'<div class="fs-thumblist"><div class="fs-caption">'
+            f'<div class="fs-label"><a href="/course/{10000 + i}">測試課程 {i}</a></div>'
+            f'<div class="fs-hint">1141 學期 · 教師 {i % 7}</div></div></div>'
+        )
+    parts.append("</div></body></html>")
+    return "\n".join(parts)
+
+
+def render_lms_course_page(course_id: int) -> str:
+    """LMS 課程首頁：標題與公告、教材的選單連結"""
+    return (
+        f'<html><head><title>課程 {course_id}</title></head><body><h1>測試課程 {course_id - 10000}</h1>'
+        f'<ul class="menu"><li><a href="/course/bulletin/{course_id}">課程公告</a></li>'
+        f'<li><a href="/course/doc/{course_id}">上課教材</a></li></ul></body></html>'
+    )
+
+
+def render_lms_listing_page(course_id: int, kind: str, count: int = 15) -> str:
+    """LMS 公告或教材列表：表頭加上 count 列"""
+    rng = random.Random(f"{kind}{course_id}")
+    rows = "".join(
+        f'<tr><td>{i + 1}</td><td><a href="/course/{course_id}/{kind}/{i}">{kind} {i} 第{rng.randrange(1, 18)}週</a></td>'
+        f'<td>2025-{1 + i % 12:02d}-{1 + i % 28:02d}</td><td>{rng.randrange(10, 500)}</td></tr>'
+        for i in range(count)
+    )
+    return (
+        '<html><body><table class="table"><thead><tr><th>#</th><th>標題</th><th>日期</th><th>點閱</th></tr></thead>'
+        f'<tbody>{rows}</tbody></table></body></html>'
+    )
+
+
+def video_ids(count: int = 20) -> List[str]:
+    """固定的 11 字元影片 ID"""
+    return [f"bench{i:06d}"[:11] for i in range(count)]
+
+
+def make_video_info(video_id: str) -> Dict:
+    """yt-dlp extract_info() 結果的精簡版本（包含常用欄位與格式列表）"""
+    index = int(video_id[-6:])
+    return {
+        "id": video_id,
+        "title": f"測試影片 {index}",
+        "duration": 60 + index * 37,
+        "view_count": index * 1000,
+        "average_rating": None,
+        "upload_date": "20250101",
+        "uploader": f"頻道 {index % 5}",
+        "thumbnail": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+        "description": "測試描述\n" * 20,
+        "webpage_url": f"https://www.youtube.com/watch?v={video_id}",
+        "formats": [
+            {"format_id": str(fid), "ext": ext, "height": height, "vcodec": vcodec, "acodec": acodec,
+             "url": f"https://example.invalid/{video_id}/{fid}"}
+            for fid, ext, height, vcodec, acodec in [
+                (140, "m4a", None, "none", "mp4a.40.2"),
+                (251, "webm", None, "none", "opus"),
+                (136, "mp4", 720, "avc1.4d401f", "none"),
+                (135, "mp4", 480, "avc1.4d401e", "none"),
+                (18, "mp4", 360, "avc1.42001E", "mp4a.40.2"),
+            ]
+        ],
+    }
+
+
+def render_search_page(ids: List[str]) -> str:
+    """YouTube 搜尋結果頁面（每個 ID 出現兩次，測試去重）"""
+    links = "".join(f'<a href="/watch?v={video_id}">x</a><a href="/watch?v={video_id}">y</a>' for video_id in ids)
+    return f"<html><body>{links}</body></html>"
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 讓各目錄的測試可以匯入專案根目錄的共用模組（crawler_common、benchmarks.fixtures）
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -0,0 +1,122 @@
+"""各爬蟲的統一入口
+
+    python crawler.py courses --http --workers 4
+    python crawler.py pchome --watch
+    python crawler.py ilearning --harvest
+    python crawler.py yt info https://www.youtube.com/watch?v=...
+
+子命令之後的參數原樣交給對應的腳本。只有被選到的腳本會被載入，
+其他爬蟲用到的 DrissionPage、selenium、yt-dlp 等套件都不會被匯入。
+腳本在自己的目錄中執行（與 cd 到該目錄再執行相同），輸出檔與參數中的相對路徑都以該目錄為準。
+"""
+import os
+import sys
+import time
+import builtins
+import argparse
+import importlib.util
+from typing import Dict, List, Tuple
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 子命令 → (腳本位置, 進入點函式, 說明)
+COMMANDS: Dict[str, Tuple[str, str, str]] = {
+    "courses": (os.path.join("nchu_系所課表", "課表資訊.py"), "run", "中興大學各系所課程資訊"),
+    "pchome": (os.path.join("PChome優惠活動", "PChome即時優惠活動.py"), "main", "PChome 即時優惠活動"),
+    "ilearning": (os.path.join("nchu_ilearning3課程資訊", "ilearning3課程資訊.py"), "main", "中興大學 iLearning 課程資訊"),
+    "yt": (os.path.join("youtube影片下載", "YT.py"), "main", "YouTube 影片資訊、搜尋與下載"),
+}
+# --profile-startup 列出的模組數
+PROFILE_TOP = 15
+
+
+class ImportProfiler:
+    """記錄每個模組第一次匯入的耗時（累計：含其匯入的其他模組；自身：扣除子模組）"""
+
+    def __init__(self):
+        self.records: Dict[str, List[float]] = {}
+        self._stack: List[float] = []
+        self._original = builtins.__import__
+
+    def _import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._original(name, globals, locals, fromlist, level)
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self._original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+            record = self.records.setdefault(name, [0.0, 0.0])
+            record[0] += elapsed
+            record[1] += elapsed - children
+
+    def __enter__(self) -> "ImportProfiler":
+        builtins.__import__ = self._import
+        return self
+
+    def __exit__(self, *exc):
+        builtins.__import__ = self._original
+
+    def report(self, top: int = PROFILE_TOP) -> None:
+        print(f"  {'模組':<40}{'累計ms':>10}{'自身ms':>10}", file=sys.stderr)
+        ranked = sorted(self.records.items(), key=lambda item: item[1][0], reverse=True)
+        for name, (cumulative, own) in ranked[:top]:
+            print(f"  {name:<40}{cumulative * 1000:>10.1f}{own * 1000:>10.1f}", file=sys.stderr)
+
+
+def load_backend(command: str):
+    """以檔案路徑載入子命令對應的腳本（不執行其 __main__ 區塊），並切換到腳本所在目錄"""
+    script, _, _ = COMMANDS[command]
+    path = os.path.join(ROOT_DIR, script)
+    # 腳本以相對路徑讀寫輸出（部分腳本在匯入時就建立輸出目錄），並匯入同目錄的模組
+    script_dir = os.path.dirname(path)
+    os.chdir(script_dir)
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+    spec = importlib.util.spec_from_file_location(f"crawler_{command}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="各爬蟲的統一入口，子命令之後的參數原樣交給對應的腳本（例如 crawler.py yt --help）",
+        epilog="\n".join(f"  {name:<10}{description}" for name, (_, _, description) in COMMANDS.items()),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="在執行前輸出載入子命令的耗時與最慢的匯入模組（輸出到 stderr）")
+    parser.add_argument("command", choices=list(COMMANDS), metavar="command",
+                        help=f"子命令：{'、'.join(COMMANDS)}")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help="交給子命令的參數")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    started = time.perf_counter()
+    args = parse_args(argv)
+    script, entry, _ = COMMANDS[args.command]
+
+    if args.profile_startup:
+        with ImportProfiler() as profiler:
+            load_start = time.perf_counter()
+            module = load_backend(args.command)
+            load_elapsed = time.perf_counter() - load_start
+        print(f"啟動耗時 {(time.perf_counter() - started) * 1000:.1f} ms"
+              f"（載入 {args.command} 後端 {load_elapsed * 1000:.1f} ms）", file=sys.stderr)
+        profiler.report()
+    else:
+        module = load_backend(args.command)
+
+    # 子命令的 argparse 依 sys.argv 解析，說明中的程式名稱顯示為「crawler.py <子命令>」
+    sys.argv = [f"{os.path.basename(__file__)} {args.command}", *args.args]
+    getattr(module, entry)()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1 @@
+"""各爬蟲共用的工具模組"""
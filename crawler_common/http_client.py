@@ -0,0 +1,53 @@
+from typing import Any, Dict, Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 預設的瀏覽器 User-Agent，部分網站會拒絕 python-requests 的預設值
+DEFAULT_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+)
+
+
+def create_session(pool_size: int = 10, retries: int = 3, backoff: float = 0.5,
+                   user_agent: Optional[str] = None) -> requests.Session:
+    """建立具連線池、keep-alive 與自動重試的 HTTP session
+
+    參數:
+        pool_size: 每個主機保留的連線數，應不小於同時發出請求的執行緒數
+        retries: 連線錯誤或 5xx / 429 回應時的重試次數
+        backoff: 重試間隔的指數退避係數（秒）
+        user_agent: 自訂 User-Agent，None 則使用 DEFAULT_USER_AGENT
+    """
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(["GET", "HEAD"]),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = user_agent or DEFAULT_USER_AGENT
+    return session
+
+
+def session_from_browser_cookies(cookies: Iterable[Dict[str, Any]], **kwargs) -> requests.Session:
+    """用瀏覽器匯出的 cookie 列表建立 session，沿用瀏覽器已登入的狀態
+
+    cookies 的每個元素需包含 name、value，可選 domain、path
+    （DrissionPage 的 page.cookies() 與 Selenium 的 driver.get_cookies() 皆符合此格式）。
+    其餘參數會傳給 create_session。
+    """
+    session = create_session(**kwargs)
+    for cookie in cookies:
+        session.cookies.set(
+            cookie["name"],
+            cookie["value"],
+            domain=cookie.get("domain", ""),
+            path=cookie.get("path", "/"),
+        )
+    return session
@@ -0,0 +1,91 @@
+import os
+import json
+import shutil
+import threading
+import subprocess
+import importlib.util
+from typing import Dict, Optional, Sequence
+
+# 外部工具的檢查結果快取（專案根目錄下的 .cache，已加入 .gitignore）
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+PROBE_CACHE_FILE = os.path.join(CACHE_DIR, "probes.json")
+
+_lock = threading.Lock()
+_memo: Dict[str, Optional[str]] = {}
+_disk_cache: Optional[Dict[str, Optional[str]]] = None
+
+
+def _load_disk_cache() -> Dict[str, Optional[str]]:
+    global _disk_cache
+    if _disk_cache is None:
+        try:
+            with open(PROBE_CACHE_FILE, "r", encoding="utf-8") as f:
+                _disk_cache = json.load(f)
+        except (OSError, ValueError):
+            _disk_cache = {}
+    return _disk_cache
+
+
+def _save_disk_cache() -> None:
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = PROBE_CACHE_FILE + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(_disk_cache, f, ensure_ascii=False)
+        os.replace(tmp_path, PROBE_CACHE_FILE)
+    except OSError:
+        # 快取寫不進去只影響下次啟動的速度
+        pass
+
+
+def probe_command(name: str, args: Sequence[str] = ("-version",), timeout: float = 10.0) -> Optional[str]:
+    """檢查外部工具是否可用，返回版本輸出的第一行，不可用時返回 None
+
+    結果依執行檔的路徑、大小與修改時間快取在磁碟，工具沒有更新時不會再啟動子行程；
+    找不到執行檔時不快取（shutil.which 本身很快，之後安裝了就能立即偵測到）。
+    """
+    path = shutil.which(name)
+    if path is None:
+        return None
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    key = f"{name}|{path}|{stat.st_size}|{stat.st_mtime_ns}|{' '.join(args)}"
+
+    with _lock:
+        if key in _memo:
+            return _memo[key]
+        cache = _load_disk_cache()
+        if key in cache:
+            _memo[key] = cache[key]
+            return cache[key]
+
+    try:
+        result = subprocess.run([path, *args], stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=timeout)
+        lines = result.stdout.decode("utf-8", "replace").splitlines()
+        version = (lines[0] if lines else path) if result.returncode == 0 else None
+    except (OSError, subprocess.SubprocessError):
+        version = None
+
+    with _lock:
+        _memo[key] = version
+        # 同一個執行檔的舊紀錄（版本更新前）一併移除
+        prefix = f"{name}|{path}|"
+        for old_key in [k for k in cache if k.startswith(prefix)]:
+            del cache[old_key]
+        cache[key] = version
+        _save_disk_cache()
+    return version
+
+
+def module_available(name: str) -> bool:
+    """只查詢套件是否已安裝，不實際匯入"""
+    with _lock:
+        key = f"module:{name}"
+        if key not in _memo:
+            try:
+                _memo[key] = "" if importlib.util.find_spec(name) is not None else None
+            except (ImportError, ValueError):
+                _memo[key] = None
+        return _memo[key] is not None
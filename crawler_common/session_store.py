@@ -0,0 +1,85 @@
+import os
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+
+from crawler_common.http_client import session_from_browser_cookies
+
+# 登入狀態保存位置（專案根目錄下的 .sessions，已加入 .gitignore）
+SESSION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".sessions")
+# 超過此秒數的 cookie 直接視為過期，不再驗證
+DEFAULT_MAX_AGE = 12 * 3600
+
+
+class SessionStore:
+    """把登入後的 cookie 與瀏覽器設定檔保存在磁碟，下次啟動時先驗證再決定是否重新登入"""
+
+    def __init__(self, name: str, directory: str = SESSION_DIR, max_age: float = DEFAULT_MAX_AGE):
+        """
+        參數:
+            name: 登入狀態名稱，每個網站各用一個，例如 "nchu_cas"
+            directory: 保存目錄
+            max_age: cookie 的最長保存秒數
+        """
+        self.name = name
+        self.directory = directory
+        self.max_age = max_age
+        self.path = os.path.join(directory, f"{name}.json")
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def profile_dir(self) -> str:
+        """瀏覽器使用者資料目錄，讓 Cloudflare 等驗證狀態在多次執行間保留"""
+        return os.path.join(self.directory, f"{self.name}-profile")
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """讀取保存的登入狀態，不存在或超過 max_age 時返回 None"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if time.time() - data.get("saved_at", 0) > self.max_age:
+            return None
+        return data
+
+    def save(self, cookies: List[Dict[str, Any]], user_agent: Optional[str] = None) -> None:
+        """保存登入後的 cookie（DrissionPage 的 page.cookies() 或 Selenium 的 driver.get_cookies()）"""
+        data = {"saved_at": time.time(), "user_agent": user_agent, "cookies": list(cookies)}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def validate(self, data: Dict[str, Any], check_url: str,
+                 is_logged_in: Callable[[requests.Response], bool], timeout: float = 10) -> bool:
+        """以保存的 cookie 發出一次不跟隨轉址的請求，由 is_logged_in 判斷是否仍為登入狀態"""
+        session = session_from_browser_cookies(data.get("cookies", []), retries=0,
+                                               user_agent=data.get("user_agent"))
+        try:
+            response = session.get(check_url, allow_redirects=False, timeout=timeout)
+            return is_logged_in(response)
+        except requests.RequestException as e:
+            print(f"驗證保存的登入狀態時出錯: {e}")
+            return False
+        finally:
+            session.close()
+
+    def restore(self, check_url: str, is_logged_in: Callable[[requests.Response], bool]) -> Optional[Dict[str, Any]]:
+        """讀取並驗證保存的登入狀態，有效時返回資料，否則清除並返回 None"""
+        data = self.load()
+        if data is None:
+            return None
+        if self.validate(data, check_url, is_logged_in):
+            return data
+        print("保存的登入狀態已失效，將重新登入")
+        self.clear()
+        return None
@@ -0,0 +1,70 @@
+import threading
+import time
+from typing import Optional
+
+
+class RateLimiter:
+    """全域請求節流器，確保任意兩次請求之間至少間隔 min_interval 秒（可跨執行緒共用）"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+
+    def wait(self) -> None:
+        """阻塞直到輪到本次請求"""
+        # 在鎖內預約下一個可用時間點，鎖外再睡，避免其他執行緒排隊等鎖
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_time)
+            self._next_time = start + self.min_interval
+        delay = start - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+class HostRateLimiter:
+    """依主機分別節流：同一主機的兩次請求至少間隔 min_interval 秒，不同主機互不影響"""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._limiters = {}
+
+    def wait(self, host: str) -> None:
+        """阻塞直到輪到對 host 的本次請求"""
+        with self._lock:
+            limiter = self._limiters.get(host)
+            if limiter is None:
+                limiter = self._limiters[host] = RateLimiter(self.min_interval)
+        limiter.wait()
+
+
+class BandwidthLimiter:
+    """全域頻寬上限（token bucket）：所有共用此物件的傳輸合計每秒不超過 rate 位元組（可跨執行緒共用）"""
+
+    def __init__(self, rate: Optional[float], burst: Optional[float] = None):
+        """
+        參數:
+            rate: 每秒位元組數，0 或 None 表示不限制
+            burst: 可瞬間用掉的位元組數，預設為一秒的量
+        """
+        self.rate = rate or 0
+        self.burst = burst if burst is not None else self.rate
+        self._lock = threading.Lock()
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+
+    def consume(self, amount: float) -> None:
+        """記錄已傳輸 amount 位元組，超過上限時阻塞到額度補回"""
+        if not self.rate or amount <= 0:
+            return
+        # 與 RateLimiter 相同：在鎖內扣除額度（可以扣成負數，等於預約），鎖外再睡
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,61 @@
+import time
+from typing import Any, Callable, Optional
+
+
+class WaitTimeout(TimeoutError):
+    """等待頁面就緒逾時"""
+
+
+def wait_until(condition: Callable[[], Any], timeout: float = 30.0, interval: float = 0.2,
+               description: str = "條件成立") -> Any:
+    """反覆呼叫 condition()，一旦回傳真值就立即返回該值
+
+    參數:
+        condition: 檢查函式，回傳真值表示已就緒；拋出例外視為尚未就緒
+        timeout: 最長等待秒數
+        interval: 每次檢查之間的間隔秒數
+        description: 等待目標的說明，用於逾時錯誤訊息
+
+    返回:
+        condition() 第一次回傳的真值
+
+    逾時時拋出 WaitTimeout，訊息中包含等待目標與最後一次檢查時的錯誤。
+    """
+    deadline = time.monotonic() + timeout
+    last_error: Optional[Exception] = None
+    while True:
+        try:
+            result = condition()
+            if result:
+                return result
+            last_error = None
+        except Exception as e:
+            last_error = e
+
+        if time.monotonic() >= deadline:
+            message = f"等待「{description}」逾時（{timeout:g} 秒）"
+            if last_error is not None:
+                message += f"，最後一次檢查出錯: {last_error}"
+            raise WaitTimeout(message)
+        time.sleep(interval)
+
+
+def wait_stable(probe: Callable[[], Any], timeout: float = 30.0, interval: float = 0.2,
+                settle: float = 0.5, description: str = "內容穩定") -> Any:
+    """等待 probe() 的回傳值不為 None，且連續 settle 秒沒有變化
+
+    適合用在「表格列數不再增加」這類判斷，回傳最後穩定下來的值。
+    """
+    state = {"value": None, "since": None}
+
+    def is_stable():
+        value = probe()
+        now = time.monotonic()
+        if value is None or value != state["value"]:
+            state["value"] = value
+            state["since"] = now
+            return False
+        return now - state["since"] >= settle
+
+    wait_until(is_stable, timeout=timeout, interval=interval, description=description)
+    return state["value"]
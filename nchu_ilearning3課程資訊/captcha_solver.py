@@ -0,0 +1,311 @@
+import io
+import os
+import sys
+import time
+import base64
+import argparse
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 本機辨識器的模型檔（由 train 子命令產生）
+MODEL_FILE = "captcha_model.npz"
+# 登入成功時保存的驗證碼圖片，檔名為「答案_時間.png」，可用來訓練與量測
+SAMPLE_DIR = "captcha_samples"
+# 本機辨識的信心低於此值時改用備援辨識器
+DEFAULT_MIN_CONFIDENCE = 0.35
+# 每個字元縮放成 GLYPH_SIZE x GLYPH_SIZE 後比對
+GLYPH_SIZE = 16
+# 墨跡少於此像素數的片段視為雜點
+MIN_GLYPH_PIXELS = 8
+
+GEMINI_MODEL = "gemini-1.5-flash"
+GEMINI_INSTRUCTION = "你是OCR辨識專家，請精確讀取圖片中的驗證碼，並只回傳驗證碼（不加註解、不加標點、沒有多餘文字）。"
+GEMINI_PROMPT = "請讀取這張圖片的驗證碼，請只回傳驗證碼。"
+
+
+def _otsu_threshold(gray: np.ndarray) -> int:
+    """以 Otsu 法求前景與背景的分界灰階值"""
+    hist = np.bincount(gray.ravel(), minlength=256).astype(np.float64)
+    weight = np.cumsum(hist)
+    mean = np.cumsum(hist * np.arange(256))
+    total_weight, total_mean = weight[-1], mean[-1]
+    background = weight[:-1]
+    foreground = total_weight - background
+    valid = (background > 0) & (foreground > 0)
+    between = np.zeros(255)
+    between[valid] = ((total_mean * background[valid] - mean[:-1][valid] * total_weight) ** 2
+                      / (background[valid] * foreground[valid]))
+    return int(np.argmax(between)) + 1
+
+
+def binarize(image: bytes) -> np.ndarray:
+    """把圖片位元組轉成文字為 True 的二值陣列（先以中值濾波去掉細雜線與雜點）"""
+    from PIL import Image, ImageFilter
+
+    with Image.open(io.BytesIO(image)) as img:
+        gray = np.asarray(img.convert("L").filter(ImageFilter.MedianFilter(3)), dtype=np.uint8)
+    mask = gray < _otsu_threshold(gray)
+    # 文字應該比背景少，反過來表示是深色背景上的淺色文字
+    if mask.mean() > 0.5:
+        mask = ~mask
+    return mask
+
+
+def _runs(inked: np.ndarray) -> List[Tuple[int, int]]:
+    """連續為 True 的區段 [start, end)"""
+    padded = np.concatenate(([False], inked, [False]))
+    edges = np.flatnonzero(padded[1:] != padded[:-1])
+    return list(zip(edges[::2], edges[1::2]))
+
+
+def segment(mask: np.ndarray, count: Optional[int] = None) -> List[np.ndarray]:
+    """以垂直投影切出各字元；指定 count 時把黏在一起的字元切開、多出來的片段合併或丟棄"""
+    columns = mask.sum(axis=0)
+    runs = [(s, e) for s, e in _runs(columns > 0) if columns[s:e].sum() >= MIN_GLYPH_PIXELS]
+    if count:
+        while runs and len(runs) < count:
+            # 最寬的片段在中段投影最少的地方切開
+            i = max(range(len(runs)), key=lambda k: runs[k][1] - runs[k][0])
+            start, end = runs[i]
+            if end - start < 2:
+                break
+            quarter = (end - start) // 4
+            middle = columns[start + quarter:end - quarter]
+            cut = start + quarter + int(np.argmin(middle)) if len(middle) else (start + end) // 2
+            cut = min(max(cut, start + 1), end - 1)
+            runs[i:i + 1] = [(start, cut), (cut, end)]
+        while len(runs) > count:
+            masses = [columns[s:e].sum() for s, e in runs]
+            i = int(np.argmin(masses))
+            if masses[i] * 4 < np.median(masses):
+                # 遠小於其他字元的片段是雜點
+                del runs[i]
+            else:
+                # 斷成兩段的字元：合併間隔最小的相鄰片段
+                j = min(range(len(runs) - 1), key=lambda k: runs[k + 1][0] - runs[k][1])
+                runs[j:j + 2] = [(runs[j][0], runs[j + 1][1])]
+    return [mask[:, s:e] for s, e in runs]
+
+
+def glyph_features(glyph: np.ndarray) -> np.ndarray:
+    """把字元裁切到墨跡範圍、補成正方形（保留長寬比）後縮放，返回長度為 1 的特徵向量"""
+    from PIL import Image
+
+    rows = np.flatnonzero(glyph.any(axis=1))
+    if len(rows):
+        glyph = glyph[rows[0]:rows[-1] + 1]
+    height, width = glyph.shape
+    side = max(height, width, 1)
+    square = np.zeros((side, side), dtype=np.uint8)
+    top, left = (side - height) // 2, (side - width) // 2
+    square[top:top + height, left:left + width] = glyph * 255
+    resized = Image.fromarray(square).resize((GLYPH_SIZE, GLYPH_SIZE), Image.BILINEAR)
+    vector = np.asarray(resized, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class CaptchaSolver(ABC):
+    """驗證碼辨識器的共同介面：solve() 接收圖片位元組，返回 (答案, 信心 0~1)"""
+
+    name = "base"
+
+    @abstractmethod
+    def solve(self, image: bytes) -> Tuple[str, float]:
+        """子類別實作實際的辨識"""
+
+
+class TemplateSolver(CaptchaSolver):
+    """只用 CPU 的本機辨識器：切出各字元後，與訓練樣本的字元以餘弦相似度做最近鄰比對
+
+    每個字元的信心為最相似的字元類別與次相似類別的相對差距，整串的信心取各字元的最小值；
+    切出的字元數與訓練時的答案長度不同時信心為 0。
+    """
+
+    name = "local"
+
+    def __init__(self, templates: np.ndarray, labels: Sequence[str], length: int):
+        """
+        參數:
+            templates: 各字元樣本的特徵向量 (N, GLYPH_SIZE * GLYPH_SIZE)
+            labels: 各樣本對應的字元
+            length: 驗證碼的字元數
+        """
+        order = np.argsort(np.asarray(labels), kind="stable")
+        self.templates = np.asarray(templates, dtype=np.float32)[order]
+        self.labels = np.asarray(labels)[order]
+        # 依字元排序後，各類別的起點供 reduceat 取每類最大相似度
+        self.classes, self.starts = np.unique(self.labels, return_index=True)
+        self.length = int(length)
+
+    @classmethod
+    def train(cls, samples: Sequence[Tuple[str, bytes]]) -> "TemplateSolver":
+        """以 (答案, 圖片位元組) 列表建立辨識器；切出的字元數與答案長度不同的樣本略過"""
+        if not samples:
+            raise ValueError("沒有可用的驗證碼樣本")
+        length = Counter(len(label) for label, _ in samples).most_common(1)[0][0]
+        features, labels = [], []
+        for label, image in samples:
+            if len(label) != length:
+                continue
+            glyphs = segment(binarize(image), length)
+            if len(glyphs) != length:
+                continue
+            features.extend(glyph_features(glyph) for glyph in glyphs)
+            labels.extend(label)
+        if not features:
+            raise ValueError("沒有任何樣本能切出正確的字元數")
+        return cls(np.stack(features), labels, length)
+
+    @classmethod
+    def load(cls, path: str = MODEL_FILE) -> "TemplateSolver":
+        with np.load(path) as data:
+            return cls(data["templates"], data["labels"], int(data["length"]))
+
+    def save(self, path: str = MODEL_FILE) -> None:
+        tmp_path = path + ".tmp.npz"
+        np.savez_compressed(tmp_path, templates=self.templates, labels=self.labels, length=self.length)
+        os.replace(tmp_path, path)
+
+    def solve(self, image: bytes) -> Tuple[str, float]:
+        glyphs = segment(binarize(image), self.length)
+        if not glyphs:
+            return "", 0.0
+        features = np.stack([glyph_features(glyph) for glyph in glyphs])
+        # 每個字元對每個類別的最大相似度 (字元數, 類別數)
+        scores = np.maximum.reduceat(features @ self.templates.T, self.starts, axis=1)
+        best = np.argmax(scores, axis=1)
+        text = "".join(self.classes[best])
+        if len(glyphs) != self.length:
+            return text, 0.0
+        if scores.shape[1] < 2:
+            return text, 1.0
+        top2 = np.sort(scores, axis=1)[:, -2:]
+        margins = (top2[:, 1] - top2[:, 0]) / np.maximum(1.0 - top2[:, 0], 1e-6)
+        return text, float(np.clip(margins.min(), 0.0, 1.0))
+
+
+class GeminiSolver(CaptchaSolver):
+    """以 Gemini 辨識（需要網路與 GEMINI_API_KEY，不提供信心，固定為 1）"""
+
+    name = "gemini"
+
+    def __init__(self, api_key: Optional[str], model_name: str = GEMINI_MODEL):
+        self.api_key = api_key
+        self.model_name = model_name
+        self._client = None
+
+    def solve(self, image: bytes) -> Tuple[str, float]:
+        if self._client is None:
+            import google.generativeai as genai
+
+            genai.configure(api_key=self.api_key)
+            self._client = genai.GenerativeModel(model_name=self.model_name,
+                                                 system_instruction=GEMINI_INSTRUCTION)
+        response = self._client.generate_content(
+            contents=[
+                {
+                    "role": "user",
+                    "parts": [
+                        {"text": GEMINI_PROMPT},
+                        {"inline_data": {"mime_type": "image/png", "data": base64.b64encode(image).decode("utf-8")}}
+                    ]
+                }
+            ],
+        )
+        return response.text.strip(), 1.0
+
+
+class FallbackSolver(CaptchaSolver):
+    """先用 primary 辨識，信心不足或出錯時才改用 fallback"""
+
+    def __init__(self, primary: CaptchaSolver, fallback: CaptchaSolver,
+                 min_confidence: float = DEFAULT_MIN_CONFIDENCE):
+        self.primary = primary
+        self.fallback = fallback
+        self.min_confidence = min_confidence
+        self.name = f"{primary.name}+{fallback.name}"
+        # 最近一次實際採用結果的辨識器名稱
+        self.last_used = primary.name
+
+    def solve(self, image: bytes) -> Tuple[str, float]:
+        try:
+            text, confidence = self.primary.solve(image)
+            if confidence >= self.min_confidence:
+                self.last_used = self.primary.name
+                return text, confidence
+            print(f"本機辨識信心 {confidence:.2f} 過低，改用 {self.fallback.name}", file=sys.stderr)
+        except Exception as e:
+            print(f"本機辨識驗證碼時出錯: {e}，改用 {self.fallback.name}", file=sys.stderr)
+        self.last_used = self.fallback.name
+        return self.fallback.solve(image)
+
+
+def create_solver(mode: str = "auto", model_path: str = MODEL_FILE, api_key: Optional[str] = None,
+                  min_confidence: float = DEFAULT_MIN_CONFIDENCE) -> CaptchaSolver:
+    """
+    參數:
+        mode: "local" 只用本機辨識；"gemini" 只用 Gemini；
+              "auto" 有模型檔時先用本機辨識、信心不足才用 Gemini，沒有模型檔時直接用 Gemini
+    """
+    if mode == "gemini":
+        return GeminiSolver(api_key)
+    if mode == "local":
+        return TemplateSolver.load(model_path)
+    if not os.path.exists(model_path):
+        return GeminiSolver(api_key)
+    return FallbackSolver(TemplateSolver.load(model_path), GeminiSolver(api_key), min_confidence)
+
+
+def save_sample(directory: str, label: str, image: bytes) -> str:
+    """保存答案已確認的驗證碼圖片，返回檔案路徑"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{label}_{int(time.time() * 1000)}.png")
+    with open(path, "wb") as f:
+        f.write(image)
+    return path
+
+
+def load_samples(directory: str = SAMPLE_DIR) -> List[Tuple[str, bytes]]:
+    """讀取樣本目錄，返回依檔名排序的 (答案, 圖片位元組) 列表；答案取自檔名第一個底線之前"""
+    samples = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        if ext.lower() not in (".png", ".jpg", ".jpeg", ".gif", ".bmp"):
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            samples.append((stem.split("_", 1)[0], f.read()))
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="iLearning 驗證碼的本機辨識器")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    train_parser = subparsers.add_parser("train", help="以保存的樣本訓練本機辨識器")
+    train_parser.add_argument("samples", nargs="?", default=SAMPLE_DIR, help=f"樣本目錄（預設 {SAMPLE_DIR}）")
+    train_parser.add_argument("--model", default=MODEL_FILE, help=f"輸出的模型檔（預設 {MODEL_FILE}）")
+
+    solve_parser = subparsers.add_parser("solve", help="辨識圖片檔")
+    solve_parser.add_argument("images", nargs="+")
+    solve_parser.add_argument("--model", default=MODEL_FILE)
+
+    args = parser.parse_args()
+    if args.command == "train":
+        solver = TemplateSolver.train(load_samples(args.samples))
+        solver.save(args.model)
+        print(f"已保存 {args.model}：{len(solver.templates)} 個字元樣本、{len(solver.classes)} 種字元、"
+              f"驗證碼長度 {solver.length}")
+    else:
+        solver = TemplateSolver.load(args.model)
+        for path in args.images:
+            with open(path, "rb") as f:
+                text, confidence = solver.solve(f.read())
+            print(f"{path}: {text}（信心 {confidence:.2f}）")
+
+
+if __name__ == "__main__":
+    main()
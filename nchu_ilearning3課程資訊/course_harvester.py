@@ -0,0 +1,180 @@
+import os
+import re
+import sys
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+from bs4 import BeautifulSoup
+
+from crawler_common.throttle import RateLimiter
+
+# 各課程的輸出目錄（每門課一個 JSON 檔，另有 courses.json 彙整）
+OUTPUT_DIR = "課程內容"
+# 課程首頁的選單中找不到時使用的預設網址
+SECTION_PATHS = {
+    "announcements": "/course/bulletin/{id}",
+    "materials": "/course/doc/{id}",
+}
+# 課程首頁選單中各區塊連結的文字
+SECTION_KEYWORDS = {
+    "announcements": ("公告",),
+    "materials": ("教材", "講義"),
+}
+REQUEST_TIMEOUT = 15
+
+COURSE_ID_PATTERN = re.compile(r"/course/(\d+)")
+
+
+class LoginRequired(RuntimeError):
+    """請求被導回登入頁，保存的登入狀態已失效"""
+
+
+def parse_course_cards(html: str, base_url: str) -> List[Dict[str, str]]:
+    """解析 dashboard 的課程卡片，返回含課程名稱、說明、連結與課程 ID 的列表（沒有連結的卡片略過）"""
+    soup = BeautifulSoup(html, 'html.parser')
+    cards = []
+    for caption in soup.find_all('div', class_="fs-caption"):
+        label = caption.find('div', class_='fs-label')
+        hint = caption.find('div', class_='fs-hint')
+        anchor = label.find('a', href=True) if label else None
+        if anchor is None:
+            continue
+        link = urljoin(base_url, anchor['href'])
+        match = COURSE_ID_PATTERN.search(link)
+        if match is None:
+            continue
+        cards.append({
+            "id": match.group(1),
+            "name": label.get_text(strip=True),
+            "hint": hint.get_text(strip=True) if hint else "",
+            "link": link,
+        })
+    return cards
+
+
+def find_section_links(html: str, base_url: str, course_id: str) -> Dict[str, str]:
+    """從課程首頁的選單找公告與教材的連結，找不到時使用 SECTION_PATHS"""
+    soup = BeautifulSoup(html, 'html.parser')
+    links = {}
+    for anchor in soup.find_all('a', href=True):
+        text = anchor.get_text(strip=True)
+        for section, keywords in SECTION_KEYWORDS.items():
+            if section not in links and any(keyword in text for keyword in keywords):
+                links[section] = urljoin(base_url, anchor['href'])
+    for section, path in SECTION_PATHS.items():
+        links.setdefault(section, urljoin(base_url, path.format(id=course_id)))
+    return links
+
+
+def parse_course_title(html: str) -> str:
+    soup = BeautifulSoup(html, 'html.parser')
+    heading = soup.find('h1') or soup.find('title')
+    return heading.get_text(strip=True) if heading else ""
+
+
+def parse_listing(html: str, base_url: str) -> List[Dict[str, Any]]:
+    """解析公告或教材列表：表格的每一列為一筆，返回標題、連結與各欄文字"""
+    soup = BeautifulSoup(html, 'html.parser')
+    items = []
+    for row in soup.find_all('tr'):
+        cells = row.find_all('td')
+        if not cells:
+            # 表頭
+            continue
+        columns = [cell.get_text(" ", strip=True) for cell in cells]
+        anchor = row.find('a', href=True)
+        title = anchor.get_text(strip=True) if anchor else next((c for c in columns if c), "")
+        items.append({
+            "title": title,
+            "link": urljoin(base_url, anchor['href']) if anchor else None,
+            "columns": columns,
+        })
+    return items
+
+
+class CourseHarvester:
+    """以同一個已登入的 HTTP session 並行收集各課程的首頁、公告與教材列表
+
+    先並行下載所有課程首頁，再並行下載各課程的公告與教材頁面；
+    同時請求數受 workers 限制，任兩次請求至少間隔 interval 秒。
+    """
+
+    def __init__(self, session: requests.Session, base_url: str, workers: int = 8, interval: float = 0.0,
+                 output_dir: str = OUTPUT_DIR):
+        """
+        參數:
+            session: 帶有登入 cookie 的 session，連線池大小應不小於 workers
+                     （crawler_common.http_client.session_from_browser_cookies）
+            base_url: LMS 網址
+            workers: 同時下載的頁面數
+            interval: 任兩次請求的最小間隔秒數
+            output_dir: 輸出目錄
+        """
+        self.session = session
+        self.base_url = base_url
+        self.workers = workers
+        self.limiter = RateLimiter(interval)
+        self.output_dir = output_dir
+
+    def fetch(self, url: str) -> str:
+        self.limiter.wait()
+        response = self.session.get(url, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        if "/index/login" in response.url:
+            raise LoginRequired(f"請求 {url} 時被導回登入頁")
+        return response.text
+
+    def _fetch_or_error(self, url: str) -> Tuple[Optional[str], Optional[str]]:
+        """返回 (頁面, 錯誤訊息)；登入失效時直接拋出，其他頁面繼續收集"""
+        try:
+            return self.fetch(url), None
+        except requests.RequestException as e:
+            print(f"取得 {url} 時出錯: {e}", file=sys.stderr)
+            return None, str(e)
+
+    def harvest(self, cards: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """收集 parse_course_cards() 返回的各課程，寫出每門課的 JSON 檔並返回結果"""
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            home_pages = list(executor.map(self._fetch_or_error, [card["link"] for card in cards]))
+
+            courses = []
+            section_urls = []
+            for card, (html, error) in zip(cards, home_pages):
+                course = {**card, "title": "", "errors": {}}
+                if html is None:
+                    course["errors"]["home"] = error
+                    links = {section: urljoin(self.base_url, path.format(id=card["id"]))
+                             for section, path in SECTION_PATHS.items()}
+                else:
+                    course["title"] = parse_course_title(html)
+                    links = find_section_links(html, self.base_url, card["id"])
+                for section, url in links.items():
+                    course[section] = []
+                    section_urls.append((course, section, url))
+                courses.append(course)
+
+            section_pages = executor.map(self._fetch_or_error, [url for _, _, url in section_urls])
+            for (course, section, url), (html, error) in zip(section_urls, section_pages):
+                if html is None:
+                    course["errors"][section] = error
+                else:
+                    course[section] = parse_listing(html, self.base_url)
+
+        self.save(courses)
+        return courses
+
+    def save(self, courses: List[Dict[str, Any]]) -> None:
+        os.makedirs(self.output_dir, exist_ok=True)
+        for course in courses:
+            with open(os.path.join(self.output_dir, f"{course['id']}.json"), "w", encoding="utf-8") as f:
+                json.dump(course, f, ensure_ascii=False, indent=2)
+        summary = [
+            {"id": course["id"], "name": course["name"], "hint": course["hint"],
+             **{section: len(course[section]) for section in SECTION_PATHS}, "errors": list(course["errors"])}
+            for course in courses
+        ]
+        with open(os.path.join(self.output_dir, "courses.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2)
@@ -1,75 +1,189 @@
 import os
-from selenium import webdriver
-from selenium.webdriver.common.by import By 
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.options import Options
+import sys
+import argparse
 from dotenv import load_dotenv
+from bs4 import BeautifulSoup
+
+# 讓腳本可以直接執行時也能匯入專案根目錄的共用模組
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler_common.waits import wait_until, WaitTimeout
+from crawler_common.session_store import SessionStore
+from crawler_common.http_client import session_from_browser_cookies
+from captcha_solver import create_solver, save_sample, MODEL_FILE, SAMPLE_DIR, DEFAULT_MIN_CONFIDENCE
+from course_harvester import CourseHarvester, LoginRequired, parse_course_cards, OUTPUT_DIR
+
+# 等待頁面就緒的最長秒數
+WAIT_TIMEOUT = 30
+# 送出登入表單後等待跳轉的秒數，逾時視為驗證碼錯誤
+LOGIN_WAIT = 10
+# 驗證碼辨識錯誤時最多重試的次數
+LOGIN_ATTEMPTS = 3
 
 load_dotenv()
 url = "https://lms2020.nchu.edu.tw/index/login?next=%2Fdashboard"
+base_url = "https://lms2020.nchu.edu.tw"
+dashboard_url = "https://lms2020.nchu.edu.tw/dashboard"
 username =os.getenv("usernames")
 password = os.getenv("password")
 
-# 模擬登入
-chrome_options = Options()
-chrome_options.add_experimental_option("detach", True)  # 設置瀏覽器分離
-driver = webdriver.Chrome(options=chrome_options)
-driver.get(url)#打開登入網頁
-
-
-driver.find_element(By.XPATH, '//*[@id="account"]/div/input').send_keys(username)
-driver.find_element(By.XPATH, '//*[@id="password"]/div/div[1]/input').send_keys(password)
-
-#抓取驗證碼
-captcah_input = driver.find_element(By.CSS_SELECTOR, "img.js-captcha")
-captcah_input.screenshot("captcha.png")
-
-import google.generativeai as genai
-import base64
-
-# 讀取圖片並轉為 base64
-def encode_image(image_path):
-    with open(image_path, "rb") as f:
-        return base64.b64encode(f.read()).decode("utf-8")   
-base64_img = encode_image('captcha.png')    
-
-#輸入gemini api 和 系統指令
-gemini_api = os.getenv('GEMINI_API_KEY')
-genai.configure(api_key=gemini_api)
-
-system_instruction_text = "你是OCR辨識專家，請精確讀取圖片中的驗證碼，並只回傳驗證碼（不加註解、不加標點、沒有多餘文字）。"
-
-# 使用 system_instruction 建立模型
-client = genai.GenerativeModel(
-    model_name="gemini-1.5-flash",
-    system_instruction=system_instruction_text
-)
-
-response = client.generate_content(
-    contents=[
-        {
-            "role": "user",
-            "parts": [
-                {"text": "請讀取這張圖片的驗證碼，請只回傳驗證碼。"},
-                {"inline_data": {"mime_type": "image/png", "data": base64_img}}
-            ]
-        }
-    ],
-)
-
-driver.find_element(By.XPATH, '//*[@id="captcha"]/div/input').send_keys(response.text)
-driver.find_element(By.XPATH, '//*[@id="login_form"]/div[7]/div/button').click()
-
-from bs4 import BeautifulSoup
-import time
-
-time.sleep(3)
-soup = BeautifulSoup(driver.page_source,'html.parser')
-
-courses = soup.find_all('div',class_="fs-caption")
-
-for a in courses:
-    all_courses = a.find('div',class_='fs-label')
-    print(all_courses.text)
-    courses_hint = a.find('div',class_='fs-hint')
-    print(courses_hint.text)
\ No newline at end of file
+# 保存 LMS 登入狀態，下次啟動時若仍有效就不必再辨識驗證碼
+session_store = SessionStore("nchu_lms")
+
+# 判斷回應是否仍在登入狀態（未被導回登入頁）
+def is_logged_in(response):
+    location = response.headers.get("Location", "")
+    return response.status_code == 200 and "/index/login" not in response.url + location
+
+# 嘗試沿用上次保存的登入狀態
+def restore_login(driver):
+    data = session_store.restore(dashboard_url, is_logged_in)
+    if data is None:
+        return False
+    # Selenium 只能為目前所在網域加入 cookie，先開啟首頁
+    driver.get(base_url)
+    for cookie in data["cookies"]:
+        cookie = {k: v for k, v in cookie.items() if k in ("name", "value", "domain", "path", "secure", "httpOnly", "expiry")}
+        driver.add_cookie(cookie)
+    driver.get(dashboard_url)
+    print("沿用已保存的登入狀態")
+    return True
+
+# 辨識驗證碼並登入，驗證碼錯誤時重新取得驗證碼再試
+def login(driver, solver, collect_dir=None, attempts=LOGIN_ATTEMPTS):
+    from selenium.webdriver.common.by import By
+
+    for attempt in range(1, attempts + 1):
+        driver.get(url)#打開登入網頁
+
+
+        driver.find_element(By.XPATH, '//*[@id="account"]/div/input').send_keys(username)
+        driver.find_element(By.XPATH, '//*[@id="password"]/div/div[1]/input').send_keys(password)
+
+        #抓取驗證碼
+        captcah_input = driver.find_element(By.CSS_SELECTOR, "img.js-captcha")
+        # 等待驗證碼圖片載入完成再截圖
+        wait_until(lambda: driver.execute_script("return arguments[0].complete && arguments[0].naturalWidth > 0", captcah_input),
+                   timeout=WAIT_TIMEOUT, description="驗證碼圖片載入")
+        # 截圖直接取得 PNG 位元組，不寫入暫存檔
+        image = captcah_input.screenshot_as_png
+        captcha, _ = solver.solve(image)
+
+        driver.find_element(By.XPATH, '//*[@id="captcha"]/div/input').send_keys(captcha)
+        driver.find_element(By.XPATH, '//*[@id="login_form"]/div[7]/div/button').click()
+
+        try:
+            wait_until(lambda: "/index/login" not in driver.current_url,
+                       timeout=LOGIN_WAIT, description="LMS 登入完成並跳轉")
+        except WaitTimeout:
+            print(f"第 {attempt} 次登入失敗（驗證碼辨識為 {captcha}），重新取得驗證碼")
+            continue
+        # 登入成功表示答案正確，保存下來作為本機辨識器的訓練資料
+        if collect_dir:
+            save_sample(collect_dir, captcha, image)
+        return
+    raise WaitTimeout(f"登入失敗，已嘗試 {attempts} 次")
+
+# 解析 dashboard 上的課程卡片，返回 (課程名稱, 課程說明) 列表
+def parse_dashboard_courses(html):
+    soup = BeautifulSoup(html,'html.parser')
+
+    courses = soup.find_all('div',class_="fs-caption")
+
+    results = []
+    for a in courses:
+        all_courses = a.find('div',class_='fs-label')
+        courses_hint = a.find('div',class_='fs-hint')
+        results.append((all_courses.text, courses_hint.text))
+    return results
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="中興大學 iLearning 課程資訊")
+    parser.add_argument("--solver", choices=["auto", "local", "gemini"], default="auto",
+                        help="驗證碼辨識方式：auto 有模型檔時先用本機辨識、信心不足才用 Gemini（預設）")
+    parser.add_argument("--captcha-model", default=MODEL_FILE,
+                        help=f"本機辨識器的模型檔（預設 {MODEL_FILE}）")
+    parser.add_argument("--min-confidence", type=float, default=DEFAULT_MIN_CONFIDENCE,
+                        help=f"本機辨識的信心低於此值時改用 Gemini（預設 {DEFAULT_MIN_CONFIDENCE}）")
+    parser.add_argument("--collect-captchas", nargs="?", const=SAMPLE_DIR, metavar="DIR",
+                        help=f"登入成功時把驗證碼圖片與答案保存到 DIR（預設 {SAMPLE_DIR}），供訓練本機辨識器")
+    parser.add_argument("--harvest", action="store_true",
+                        help="以 HTTP 並行收集各課程的首頁、公告與教材列表，每門課輸出一個 JSON 檔")
+    parser.add_argument("--workers", type=int, default=8, help="--harvest 時同時下載的頁面數（預設 8）")
+    parser.add_argument("--interval", type=float, default=0.0, help="--harvest 時任兩次請求的最小間隔秒數")
+    parser.add_argument("--output", default=OUTPUT_DIR, help=f"--harvest 的輸出目錄（預設 {OUTPUT_DIR}）")
+    return parser.parse_args()
+
+# 開啟瀏覽器（使用固定的使用者資料目錄，保留瀏覽器狀態）
+def create_driver(detach=True):
+    # 只有需要瀏覽器時才匯入 selenium（--harvest 沿用登入狀態時不會用到）
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
+    chrome_options = Options()
+    if detach:
+        chrome_options.add_experimental_option("detach", True)  # 設置瀏覽器分離
+    chrome_options.add_argument(f"--user-data-dir={session_store.profile_dir}")
+    return webdriver.Chrome(options=chrome_options)
+
+# 建立驗證碼辨識器；只在需要登入時才呼叫，沿用登入狀態時不必有模型檔或 API 金鑰
+def build_solver(args):
+    return create_solver(args.solver, args.captcha_model, os.getenv('GEMINI_API_KEY'), args.min_confidence)
+
+# 只在沒有有效的登入狀態時開瀏覽器登入一次，之後以 HTTP 連線池收集所有課程內容
+def harvest(args):
+    data = session_store.restore(dashboard_url, is_logged_in)
+    if data is None:
+        solver = build_solver(args)
+        driver = create_driver(detach=False)
+        try:
+            login(driver, solver, args.collect_captchas)
+            session_store.save(driver.get_cookies(), driver.execute_script("return navigator.userAgent"))
+        finally:
+            driver.quit()
+        data = session_store.load()
+
+    session = session_from_browser_cookies(data["cookies"], pool_size=args.workers, user_agent=data.get("user_agent"))
+    harvester = CourseHarvester(session, base_url, workers=args.workers, interval=args.interval, output_dir=args.output)
+    try:
+        cards = parse_course_cards(harvester.fetch(dashboard_url), base_url)
+        courses = harvester.harvest(cards)
+    except LoginRequired:
+        # 下次執行時重新登入
+        session_store.clear()
+        raise
+    finally:
+        session.close()
+
+    for course in courses:
+        counts = "、".join(f"{name} {len(course[section])} 筆"
+                          for section, name in (("announcements", "公告"), ("materials", "教材")))
+        failed = f"（失敗: {', '.join(course['errors'])}）" if course["errors"] else ""
+        print(f"{course['name']}: {counts}{failed}")
+    print(f"已將 {len(courses)} 門課程寫入 {args.output}/")
+
+def main():
+    args = parse_args()
+    if args.harvest:
+        harvest(args)
+        return
+
+    from selenium.webdriver.common.by import By
+
+    driver = create_driver()
+
+    # 先嘗試沿用保存的登入狀態，失效時才重新登入
+    if not restore_login(driver):
+        login(driver, build_solver(args), args.collect_captchas)
+        # 登入完成後保存 cookie 供下次使用
+        session_store.save(driver.get_cookies(), driver.execute_script("return navigator.userAgent"))
+
+    # 等待登入後的課程清單出現
+    wait_until(lambda: driver.find_elements(By.CSS_SELECTOR, "div.fs-caption"),
+               timeout=WAIT_TIMEOUT, description="登入後課程清單 div.fs-caption 出現")
+    for label, hint in parse_dashboard_courses(driver.page_source):
+        print(label)
+        print(hint)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+import io
+
+import numpy as np
+import pytest
+
+from captcha_solver import (CaptchaSolver, FallbackSolver, TemplateSolver, binarize, load_samples,
+                            save_sample, segment)
+
+
+def glyph_mask(widths, gap=3, height=12):
+    """橫向排列的實心字元（寬度為 widths），字元之間空 gap 欄，gap 為 0 時黏在一起"""
+    columns = []
+    for i, width in enumerate(widths):
+        if i:
+            columns.append(np.zeros((height, gap), dtype=bool))
+        columns.append(np.ones((height, width), dtype=bool))
+    return np.hstack([np.zeros((height, 2), dtype=bool), *columns, np.zeros((height, 2), dtype=bool)])
+
+
+def widths(glyphs):
+    return [glyph.shape[1] for glyph in glyphs]
+
+
+def test_segment_by_vertical_projection():
+    assert widths(segment(glyph_mask([4, 5, 6]))) == [4, 5, 6]
+
+
+def test_segment_drops_specks_without_count():
+    mask = glyph_mask([4, 5])
+    mask[0, 0] = True
+    assert widths(segment(mask)) == [4, 5]
+
+
+def test_segment_splits_touching_glyphs():
+    mask = glyph_mask([5, 5, 5], gap=0)
+    # 黏在一起的字元之間墨跡較少
+    mask[:8, 7] = False
+    mask[:8, 12] = False
+    glyphs = segment(mask, 3)
+    assert len(glyphs) == 3
+    assert sum(widths(glyphs)) == 15
+
+
+def test_segment_merges_broken_glyph_and_drops_noise():
+    mask = glyph_mask([5, 5, 5])
+    # 第二個字元中間斷開一欄，最後加上一小塊雜點
+    mask[:, 12] = False
+    noise = np.zeros((12, 6), dtype=bool)
+    noise[5:8, 3:6] = True
+    mask = np.hstack([mask, noise])
+    assert len(segment(mask)) == 5
+    assert widths(segment(mask, 3)) == [5, 5, 5]
+
+
+def render(text, scale=4):
+    """以 Pillow 內建字型畫出驗證碼並放大，字元之間留白"""
+    from PIL import Image, ImageDraw
+
+    image = Image.new("L", (10 * len(text) + 6, 16), 255)
+    draw = ImageDraw.Draw(image)
+    for i, char in enumerate(text):
+        draw.text((3 + 10 * i, 2), char, fill=0)
+    image = image.resize((image.width * scale, image.height * scale), Image.NEAREST)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def test_binarize_marks_dark_text():
+    mask = binarize(render("18"))
+    assert mask.dtype == bool
+    assert 0 < mask.mean() < 0.5
+    assert len(segment(mask, 2)) == 2
+
+
+def test_template_solver_round_trip(tmp_path):
+    samples = [(text, render(text)) for text in ["0123", "4567", "8901", "2345", "6789"]]
+    solver = TemplateSolver.train(samples)
+    assert solver.length == 4
+    assert list(solver.classes) == list("0123456789")
+
+    text, confidence = solver.solve(render("9630"))
+    assert text == "9630"
+    assert confidence > 0
+
+    path = str(tmp_path / "model.npz")
+    solver.save(path)
+    assert TemplateSolver.load(path).solve(render("9630")) == (text, confidence)
+
+    # 切不出任何字元時信心為 0
+    assert solver.solve(render("")) == ("", 0.0)
+
+
+def test_train_rejects_empty_samples():
+    with pytest.raises(ValueError):
+        TemplateSolver.train([])
+
+
+def test_samples_round_trip(tmp_path):
+    directory = str(tmp_path / "samples")
+    save_sample(directory, "1234", b"png")
+    (tmp_path / "samples" / "notes.txt").write_text("x")
+    assert load_samples(directory) == [("1234", b"png")]
+
+
+class FixedSolver(CaptchaSolver):
+    def __init__(self, name, result):
+        self.name = name
+        self.result = result
+        self.calls = 0
+
+    def solve(self, image):
+        self.calls += 1
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+@pytest.mark.parametrize("primary_result, expected, used", [
+    (("1234", 0.9), ("1234", 0.9), "local"),
+    (("1234", 0.1), ("5678", 1.0), "gemini"),
+    (RuntimeError("壞掉"), ("5678", 1.0), "gemini"),
+])
+def test_fallback_solver(primary_result, expected, used):
+    solver = FallbackSolver(FixedSolver("local", primary_result), FixedSolver("gemini", ("5678", 1.0)), 0.35)
+    assert solver.solve(b"") == expected
+    assert solver.last_used == used
+    assert solver.name == "local+gemini"
+
+
+def test_solver_interface_requires_solve():
+    with pytest.raises(TypeError):
+        CaptchaSolver()
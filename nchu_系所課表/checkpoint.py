@@ -0,0 +1,110 @@
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+# 記錄本次完整爬取中已完成的系所（JSON Lines，每完成一個系所附加一行）
+CHECKPOINT_FILE = "課程資訊/.checkpoint.jsonl"
+# 超過此秒數的紀錄視為過期，重新執行時會再抓一次
+DEFAULT_MAX_AGE = 6 * 3600
+
+
+# 連續這麼多個系所抓取失敗時（例如瀏覽器當掉或斷線），不再開始新的系所
+MAX_CONSECUTIVE_FAILURES = 3
+
+
+class SessionExpired(RuntimeError):
+    """登入狀態在爬取途中失效，繼續爬取其他系所也只會失敗"""
+
+
+class DepartmentFailed(RuntimeError):
+    """單一系所抓取或解析失敗，其輸出檔維持原狀、也不記錄為完成"""
+
+
+class CrawlIncomplete(RuntimeError):
+    """本輪有系所沒有完成，進度紀錄保留，重新執行時只抓取這些系所"""
+
+    def __init__(self, failed: List[str]):
+        super().__init__(f"{len(failed)} 個系所沒有完成（{'、'.join(failed)}），重新執行即可只抓取這些系所")
+        self.failed = failed
+
+
+class CheckpointJournal:
+    """可接續的爬取進度
+
+    每個系所的 JSON 檔寫入完成後附加一行紀錄並立即寫入磁碟。爬取中途失敗時紀錄會留下，
+    下次執行時略過已完成且未過期的系所，改讀取已保存的檔案來重建合併檔；整輪完成後才刪除。
+    """
+
+    def __init__(self, path: str = CHECKPOINT_FILE, max_age: float = DEFAULT_MAX_AGE):
+        """
+        參數:
+            path: 進度紀錄檔
+            max_age: 紀錄的有效秒數
+        """
+        self.path = path
+        self.max_age = max_age
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 寫到一半中斷的最後一行
+                        continue
+                    self.entries[entry["code"]] = entry
+        # 本次執行中沿用舊紀錄而略過的系所
+        self.skipped: List[str] = []
+        self._file = open(path, "a", encoding="utf-8")
+        # 上次寫到一半的行補上換行，避免與新紀錄黏在一起
+        if self._file.tell() > 0:
+            with open(path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+        self._lock = threading.Lock()
+
+    def completed(self, dept_code: str) -> Optional[Dict[str, Any]]:
+        """系所已完成且未過期、輸出檔也還在時返回紀錄，否則返回 None"""
+        entry = self.entries.get(dept_code)
+        if entry is None or time.time() - entry.get("time", 0) > self.max_age:
+            return None
+        if not os.path.exists(entry.get("path", "")):
+            return None
+        return entry
+
+    def load(self, dept_code: str) -> List[Dict[str, Any]]:
+        """讀取已完成系所保存的課程，並記為本次略過"""
+        entry = self.entries[dept_code]
+        with open(entry["path"], "r", encoding="utf-8") as f:
+            courses = json.load(f)
+        with self._lock:
+            self.skipped.append(dept_code)
+        return courses
+
+    def record(self, dept_code: str, dept_name: str, path: str, count: int) -> None:
+        """記錄系所已完成（輸出檔已寫入）"""
+        entry = {"code": dept_code, "name": dept_name, "path": path, "count": count, "time": time.time()}
+        with self._lock:
+            self.entries[dept_code] = entry
+            self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def reset(self) -> None:
+        """捨棄所有紀錄，從頭開始"""
+        with self._lock:
+            self.entries = {}
+            self._file.seek(0)
+            self._file.truncate()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def finish(self) -> None:
+        """整輪爬取完成，刪除紀錄讓下次執行重新抓取全部系所"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -0,0 +1,230 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+from typing import Any, Dict, List, Optional
+
+from department_list import read_departments_file
+
+# 爬蟲輸出目錄與資料庫位置
+DATA_DIR = "課程資訊"
+DB_FILE = "課程資訊/courses.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS departments (
+    code      TEXT PRIMARY KEY,
+    name      TEXT NOT NULL,
+    signature TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS courses (
+    id        INTEGER PRIMARY KEY,
+    dept_code TEXT NOT NULL,
+    number    TEXT NOT NULL,
+    teacher   TEXT NOT NULL,
+    unit      TEXT NOT NULL,
+    required  TEXT NOT NULL,
+    data      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_courses_dept ON courses(dept_code);
+CREATE INDEX IF NOT EXISTS idx_courses_number ON courses(number);
+CREATE INDEX IF NOT EXISTS idx_courses_teacher ON courses(teacher);
+CREATE INDEX IF NOT EXISTS idx_courses_unit ON courses(unit);
+CREATE INDEX IF NOT EXISTS idx_courses_required ON courses(required);
+"""
+
+# 查詢條件對應的欄位
+FILTER_COLUMNS = {
+    "number": "number",
+    "unit": "unit",
+    "required": "required",
+    "dept": "dept_code",
+}
+
+
+def has_crawl_data(data_dir: str = DATA_DIR) -> bool:
+    """爬蟲是否已輸出系所列表（尚未執行過完整爬取時沒有）"""
+    return os.path.exists(os.path.join(data_dir, "departments.json"))
+
+
+def _file_signature(path: str) -> str:
+    """以檔案大小與修改時間判斷內容是否變動，不需要讀取檔案"""
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _escape_glob(text: str) -> str:
+    """跳脫 GLOB 的萬用字元，讓前綴查詢可以使用索引"""
+    return "".join(f"[{ch}]" if ch in "*?[" else ch for ch in text)
+
+
+class CourseDB:
+    """以 SQLite 保存爬蟲結果，並在選課號碼、教師、開課單位、必選別與系所代碼上建立索引"""
+
+    def __init__(self, path: str = DB_FILE):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def reload(self, data_dir: str = DATA_DIR) -> List[str]:
+        """依各系所的 JSON 檔增量更新資料庫
+
+        只重新載入檔案有變動的系所，不讀取 all_courses.json。
+
+        返回:
+            本次有更新的系所代碼；還沒有系所列表（尚未執行過完整爬取）時返回空列表
+        """
+        if not has_crawl_data(data_dir):
+            print(f"找不到 {os.path.join(data_dir, 'departments.json')}，請先執行一次完整爬取（python 課表資訊.py）",
+                  file=sys.stderr)
+            return []
+        departments = read_departments_file(os.path.join(data_dir, "departments.json"))["departments"]
+
+        known = dict(self.conn.execute("SELECT code, signature FROM departments"))
+        updated = []
+        with self.conn:
+            for dept in departments:
+                code, name = dept["code"], dept["name"]
+                path = os.path.join(data_dir, f"{code}_{name}.json")
+                if not os.path.exists(path):
+                    continue
+                signature = _file_signature(path)
+                if known.get(code) == signature:
+                    continue
+
+                with open(path, "r", encoding="utf-8") as f:
+                    courses = json.load(f)
+                self.conn.execute("DELETE FROM courses WHERE dept_code = ?", (code,))
+                self.conn.executemany(
+                    "INSERT INTO courses (dept_code, number, teacher, unit, required, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    [
+                        (code, course.get("選課號碼", ""), course.get("上課教師", ""),
+                         course.get("開課單位", ""), course.get("必選別", ""),
+                         json.dumps(course, ensure_ascii=False, separators=(",", ":")))
+                        for course in courses
+                    ],
+                )
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO departments (code, name, signature) VALUES (?, ?, ?)",
+                    (code, name, signature),
+                )
+                updated.append(code)
+
+            # 移除已不在系所列表中的系所
+            current = {dept["code"] for dept in departments}
+            for code in set(known) - current:
+                self.conn.execute("DELETE FROM courses WHERE dept_code = ?", (code,))
+                self.conn.execute("DELETE FROM departments WHERE code = ?", (code,))
+                updated.append(code)
+        return updated
+
+    def query(self, number: Optional[str] = None, teacher: Optional[str] = None,
+              unit: Optional[str] = None, required: Optional[str] = None,
+              dept: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """依條件查詢課程，多個條件之間為 AND
+
+        teacher 會同時比對完全相同與開頭相同的教師（例如「林振祥」可查到「林振祥等」）。
+        返回的課程字典多一個「系所代碼」欄位。
+        """
+        conditions = []
+        params: List[Any] = []
+        for key, value in (("number", number), ("unit", unit), ("required", required), ("dept", dept)):
+            if value is not None:
+                conditions.append(f"{FILTER_COLUMNS[key]} = ?")
+                params.append(value)
+        if teacher is not None:
+            conditions.append("teacher GLOB ?")
+            params.append(_escape_glob(teacher) + "*")
+
+        sql = "SELECT dept_code, data FROM courses"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        results = []
+        for dept_code, data in self.conn.execute(sql, params):
+            course = json.loads(data)
+            course["系所代碼"] = dept_code
+            results.append(course)
+        return results
+
+    def by_number(self, number: str) -> List[Dict[str, Any]]:
+        """以選課號碼查詢（同一門課可能列在多個系所或年級）"""
+        return self.query(number=number)
+
+    def by_teacher(self, teacher: str) -> List[Dict[str, Any]]:
+        """查詢某位教師的所有課程"""
+        return self.query(teacher=teacher)
+
+    def by_unit(self, unit: str) -> List[Dict[str, Any]]:
+        """查詢某開課單位的所有課程"""
+        return self.query(unit=unit)
+
+    def by_required(self, required: str) -> List[Dict[str, Any]]:
+        """查詢必修或選修課程"""
+        return self.query(required=required)
+
+    def by_department(self, dept_code: str) -> List[Dict[str, Any]]:
+        """查詢某系所頁面列出的所有課程"""
+        return self.query(dept=dept_code)
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def _print_course(course: Dict[str, Any]) -> None:
+    title = course.get("科目名稱", "").split("\n")[0]
+    print(f"{course.get('選課號碼', '')}  {title}  {course.get('上課教師', '')}  "
+          f"時間:{course.get('上課時間', '').replace(chr(10), ',')}  教室:{course.get('上課教室', '')}  "
+          f"餘額:{course.get('可加選餘額', '')}  [{course['系所代碼']} {course.get('必選別', '')}]")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查詢已爬取的課程資料")
+    parser.add_argument("--db", default=DB_FILE, help=f"資料庫路徑（預設 {DB_FILE}）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("reload", help="依爬蟲輸出增量更新資料庫")
+
+    query_parser = subparsers.add_parser("query", help="查詢課程")
+    query_parser.add_argument("--number", help="選課號碼")
+    query_parser.add_argument("--teacher", help="上課教師（可只輸入開頭）")
+    query_parser.add_argument("--unit", help="開課單位")
+    query_parser.add_argument("--required", help="必選別（必修 / 選修）")
+    query_parser.add_argument("--dept", help="系所代碼")
+    query_parser.add_argument("--limit", type=int, help="最多顯示幾筆")
+    query_parser.add_argument("--json", action="store_true", help="以 JSON 輸出完整欄位")
+    args = parser.parse_args()
+
+    if not has_crawl_data():
+        parser.exit(1, f"找不到 {DATA_DIR}/departments.json，請先執行一次完整爬取（python 課表資訊.py）\n")
+    db = CourseDB(args.db)
+    try:
+        start = time.perf_counter()
+        if args.command == "reload":
+            updated = db.reload()
+            elapsed = (time.perf_counter() - start) * 1000
+            print(f"已更新 {len(updated)} 個系所（{elapsed:.1f} ms）")
+            return
+
+        # 查詢前先增量更新，確保結果是最新一次爬取的資料
+        db.reload()
+        start = time.perf_counter()
+        courses = db.query(args.number, args.teacher, args.unit, args.required, args.dept, args.limit)
+        elapsed = (time.perf_counter() - start) * 1000
+        if args.json:
+            print(json.dumps(courses, ensure_ascii=False, indent=2))
+        else:
+            for course in courses:
+                _print_course(course)
+        print(f"共 {len(courses)} 筆（查詢 {elapsed:.1f} ms）")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import json
+import threading
+from typing import Any, Dict, Iterable, List
+
+# 每門課程一行的串流輸出檔
+JSONL_FILE = "課程資訊/courses.jsonl"
+# 各系所在 JSONL 中的位元組範圍
+INDEX_FILE = "課程資訊/courses.index.json"
+
+
+class CourseSink:
+    """只寫入一次的 JSON Lines 課程輸出
+
+    每門課程序列化成一行附加到 JSONL；同一系所的課程在檔案中是連續的，
+    並在索引中記錄其位元組範圍。各系所的 JSON 檔與 all_courses.json 都直接由這些位元組
+    拼接而成，不需要把所有系所的課程留在記憶體中，也不會再序列化一次。
+
+    呼叫端以系所為單位寫入（爬蟲會先解析完整個系所頁面），記憶體上限是最大的單一系所。
+    輸出的 JSON 為每行一門課程的精簡格式，不縮排。
+    """
+
+    def __init__(self, path: str = JSONL_FILE, index_path: str = INDEX_FILE):
+        self.path = path
+        self.index_path = index_path
+        self.index: Dict[str, Dict[str, Any]] = {}
+        self._file = open(path, "wb")
+        self._offset = 0
+        # 多個分頁同時寫入時，確保同一系所的課程不會被其他系所插隊
+        self._lock = threading.Lock()
+
+    def write_department(self, dept_code: str, dept_name: str, courses: Iterable[Dict[str, Any]]) -> int:
+        """把一個系所的課程逐筆附加到 JSONL，返回寫入的筆數"""
+        with self._lock:
+            start = self._offset
+            count = 0
+            for course in courses:
+                line = (json.dumps(course, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+                self._file.write(line)
+                self._offset += len(line)
+                count += 1
+            self._file.flush()
+            self.index[dept_code] = {
+                "name": dept_name,
+                "offset": start,
+                "length": self._offset - start,
+                "count": count,
+            }
+        return count
+
+    def _copy_array(self, source, dept_code: str, out) -> None:
+        """把某系所在 JSONL 中的各行包成 JSON 陣列寫到 out（一次只讀一行）"""
+        entry = self.index.get(dept_code)
+        if not entry or not entry["count"]:
+            out.write(b"[]")
+            return
+
+        source.seek(entry["offset"])
+        remaining = entry["length"]
+        separator = b"[\n"
+        while remaining > 0:
+            line = source.readline()
+            remaining -= len(line)
+            out.write(separator)
+            out.write(line.rstrip(b"\n"))
+            separator = b",\n"
+        out.write(b"\n]")
+
+    def export_department(self, dept_code: str, path: str) -> None:
+        """輸出單一系所的 JSON 檔"""
+        with open(self.path, "rb") as source, open(path, "wb") as out:
+            self._copy_array(source, dept_code, out)
+
+    def export_combined(self, path: str, dept_codes: List[str]) -> None:
+        """依 dept_codes 的順序輸出 {系所代碼: 課程列表} 格式的合併檔"""
+        with open(self.path, "rb") as source, open(path, "wb") as out:
+            out.write(b"{")
+            for i, dept_code in enumerate(dept_codes):
+                if i:
+                    out.write(b",")
+                out.write(b"\n" + json.dumps(dept_code).encode("utf-8") + b": ")
+                self._copy_array(source, dept_code, out)
+            out.write(b"\n}")
+
+    def close(self) -> None:
+        """關閉 JSONL 並保存索引"""
+        with self._lock:
+            self._file.close()
+        with open(self.index_path, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,97 @@
+import re
+from typing import Any, Dict, List, Union
+
+from bs4 import BeautifulSoup
+from bs4.element import NavigableString, PreformattedString
+
+# 固定使用內建解析器：頁面還原測試（test_course_parser.py）以它驗證，
+# 結果不能因為有沒有安裝 lxml 而改變
+HTML_PARSER = "html.parser"
+
+# 課程表格每一列的欄位順序（與頁面上的欄位一致）
+COURSE_FIELDS = [
+    '必選別', '選課號碼', '科目名稱', '先修科目', '全半年', '學分數', '上課時數', '實習時數',
+    '上課時間', '實習時間', '上課教室', '實習教室', '上課教師', '實習教師', '開課單位',
+    '開課人數', '外系人數', '可加選餘額', '授課語言',
+]
+# 第 20 欄（部分表格才有）
+REMARK_FIELD = '備註'
+# 批次擷取時每列陣列對應的欄位（備註欄可能不存在）
+ROW_SCHEMA = COURSE_FIELDS + [REMARK_FIELD]
+
+# CSS 會合併的空白字元（不包含 &nbsp;）
+_COLLAPSIBLE_SPACE = re.compile(r"[ \t\n\r\f]+")
+
+
+def cell_text(element) -> str:
+    """取得元素的文字，結果等同瀏覽器中 element.innerText.trim()
+
+    連續空白合併為一個空格、<br> 轉為換行，並去除每行頭尾的空白。
+    """
+    parts = []
+    for node in element.descendants:
+        if isinstance(node, NavigableString):
+            # 跳過註解、CDATA 以及 script / style 內的文字
+            if isinstance(node, PreformattedString) or node.parent.name in ("script", "style"):
+                continue
+            parts.append(_COLLAPSIBLE_SPACE.sub(" ", str(node)))
+        elif node.name == "br":
+            parts.append("\n")
+    lines = "".join(parts).split("\n")
+    return "\n".join(line.strip() for line in lines).strip()
+
+
+def parse_course_tables(html: Union[str, bytes]) -> List[Dict[str, Any]]:
+    """解析 crseqry_home_now 頁面中的所有 mytable 表格
+
+    返回:
+        與頁面內 JavaScript 擷取結果相同的結構：
+        [{"header": 表格標題, "courses": [課程字典, ...]}, ...]，只包含有課程的表格
+    """
+    soup = BeautifulSoup(html, HTML_PARSER)
+    result = []
+
+    for table in soup.find_all("table", attrs={"name": "mytable"}):
+        rows = table.find_all("tr")
+        table_data = {"header": "", "courses": []}
+
+        # 獲取表格標題信息（第一行）
+        if rows:
+            header_cell = rows[0].find("td")
+            if header_cell:
+                header_text = cell_text(header_cell)
+                header_div = header_cell.select_one("div.tablesorter-header-inner")
+                if header_div:
+                    strong = header_div.find("strong")
+                    if strong:
+                        header_text = cell_text(strong)
+                table_data["header"] = header_text
+
+        # 從第3行開始（跳過表頭）
+        for row in rows[2:]:
+            cells = row.find_all("td")
+            if len(cells) < len(COURSE_FIELDS):
+                continue
+            course = {field: cell_text(cell) for field, cell in zip(COURSE_FIELDS, cells)}
+            if len(cells) > len(COURSE_FIELDS):
+                course[REMARK_FIELD] = cell_text(cells[len(COURSE_FIELDS)])
+            table_data["courses"].append(course)
+
+        # 只添加有課程的表格
+        if table_data["courses"]:
+            result.append(table_data)
+
+    return result
+
+
+def expand_row_tables(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """把批次擷取的結果（schema 加上每列的值陣列）還原成 parse_course_tables() 的結構
+
+    參數:
+        data: {"schema": [欄位名稱, ...], "tables": [{"header": 表格標題, "rows": [[值, ...], ...]}, ...]}
+    """
+    schema = data.get("schema") or ROW_SCHEMA
+    return [
+        {"header": table.get("header", ""), "courses": [dict(zip(schema, row)) for row in table.get("rows", [])]}
+        for table in data.get("tables", [])
+    ]
@@ -0,0 +1,110 @@
+import os
+import re
+import json
+import time
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from bs4 import BeautifulSoup
+
+# 系所列表快取
+DEPARTMENTS_FILE = "課程資訊/departments.json"
+# 快取有效秒數，同一學期內超過此時間也會重新抓取
+CACHE_TTL = 7 * 24 * 3600
+# 只爬取學院（C）與學士班（U）的系所，與原本手動維護的列表範圍相同
+DEPARTMENT_PREFIXES = ("C", "U")
+
+# 系所代碼，例如 C10、U56、U38A
+_CODE_PATTERN = re.compile(r"^[A-Z]\d{2}[A-Z]?$")
+
+
+def current_semester(today: Optional[date] = None) -> str:
+    """依日期推算學年期，例如 2025 年 9 月為 1141、2026 年 3 月為 1142"""
+    today = today or date.today()
+    if today.month >= 8:
+        return f"{today.year - 1911}1"
+    if today.month >= 2:
+        return f"{today.year - 1912}2"
+    return f"{today.year - 1912}1"
+
+
+def parse_department_options(html: Union[str, bytes], prefixes=DEPARTMENT_PREFIXES) -> List[Dict[str, str]]:
+    """從查詢頁面的系所下拉選單解析系所代碼與名稱（依選單順序、代碼不重複）"""
+    soup = BeautifulSoup(html, "html.parser")
+    select = soup.find("select", attrs={"name": "v_dept"})
+    options = select.find_all("option") if select else soup.find_all("option")
+
+    departments = []
+    seen = set()
+    for option in options:
+        code = (option.get("value") or "").strip()
+        if not _CODE_PATTERN.match(code) or code in seen:
+            continue
+        if prefixes and not code.startswith(tuple(prefixes)):
+            continue
+        # 選項文字可能帶有代碼前綴，例如「U56 資訊工程學系學士班」
+        name = option.get_text(strip=True)
+        name = re.sub(rf"^{re.escape(code)}[\s:：\-]*", "", name).strip() or code
+        departments.append({"code": code, "name": name})
+        seen.add(code)
+    return departments
+
+
+def read_departments_file(path: str = DEPARTMENTS_FILE) -> Dict[str, Any]:
+    """讀取系所列表檔，舊格式（單純的列表）視為沒有學期與時間資訊"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return {"semester": None, "fetched_at": 0, "departments": data}
+    return data
+
+
+def save_departments(departments: List[Dict[str, str]], semester: str, path: str = DEPARTMENTS_FILE,
+                     fetched_at: Optional[int] = None) -> None:
+    """寫入系所列表檔，fetched_at 預設為現在（傳入 0 表示下次執行時一律重新抓取）"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({
+            "semester": semester,
+            "fetched_at": int(time.time()) if fetched_at is None else fetched_at,
+            "departments": departments,
+        }, f, ensure_ascii=False, indent=2)
+
+
+def get_departments(fetch_html: Callable[[], Union[str, bytes]], semester: Optional[str] = None,
+                    ttl: float = CACHE_TTL, refresh: bool = False,
+                    fallback: Optional[List[Dict[str, str]]] = None,
+                    path: str = DEPARTMENTS_FILE) -> List[Dict[str, str]]:
+    """取得系所列表，優先使用快取
+
+    快取屬於同一學期且未超過 ttl 時直接使用；否則呼叫 fetch_html() 取得查詢頁面重新解析並寫回快取。
+    解析失敗時依序退回舊快取與 fallback。
+    """
+    semester = semester or current_semester()
+    cached = read_departments_file(path) if os.path.exists(path) else None
+
+    if cached and not refresh:
+        age = time.time() - cached.get("fetched_at", 0)
+        if cached.get("semester") == semester and age < ttl and cached.get("departments"):
+            print(f"使用快取的系所列表（{semester} 學期，{len(cached['departments'])} 個系所）")
+            return cached["departments"]
+
+    try:
+        departments = parse_department_options(fetch_html())
+    except Exception as e:
+        print(f"取得系所列表時出錯: {e}")
+        departments = []
+
+    if departments:
+        save_departments(departments, semester, path)
+        print(f"已從查詢頁面更新系所列表，共 {len(departments)} 個系所")
+        return departments
+
+    if cached and cached.get("departments"):
+        print("無法從查詢頁面解析系所列表，沿用舊的快取")
+        return cached["departments"]
+    print("無法從查詢頁面解析系所列表，使用內建列表")
+    if fallback:
+        # 課程資料庫依此檔載入各系所；標記為過期，下次執行時仍會重新從查詢頁面解析
+        save_departments(fallback, semester, path, fetched_at=0)
+    return fallback or []
@@ -0,0 +1,106 @@
+import os
+import json
+import hashlib
+import threading
+from datetime import datetime
+from typing import Any, Dict, List
+
+# 上次爬取各系所的內容雜湊
+STATE_FILE = "課程資訊/.crawl_state.json"
+# 只記錄有變動的課程（JSON Lines，每行一筆）
+CHANGELOG_FILE = "課程資訊/changes.jsonl"
+
+# 比對課程時使用的鍵
+KEY_FIELD = '選課號碼'
+
+
+def course_list_hash(courses: List[Dict[str, Any]]) -> str:
+    """計算課程列表的內容雜湊（欄位順序與課程順序皆納入計算）"""
+    payload = json.dumps(courses, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def diff_courses(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """以選課號碼比對新舊課程列表，只回傳有差異的課程
+
+    同一門課可能同時出現在多個年級的表格中，比對時以第一次出現的資料為準。
+    """
+    old_by_key: Dict[str, Dict[str, Any]] = {}
+    for course in old:
+        old_by_key.setdefault(course.get(KEY_FIELD, ''), course)
+    new_by_key: Dict[str, Dict[str, Any]] = {}
+    for course in new:
+        new_by_key.setdefault(course.get(KEY_FIELD, ''), course)
+
+    changes = []
+    for key, course in new_by_key.items():
+        previous = old_by_key.get(key)
+        if previous is None:
+            changes.append({"type": "added", KEY_FIELD: key, "course": course})
+            continue
+        fields = {
+            field: [previous.get(field), value]
+            for field, value in course.items()
+            if previous.get(field) != value
+        }
+        fields.update({field: [value, None] for field, value in previous.items() if field not in course})
+        if fields:
+            changes.append({"type": "changed", KEY_FIELD: key, "fields": fields})
+
+    for key, course in old_by_key.items():
+        if key not in new_by_key:
+            changes.append({"type": "removed", KEY_FIELD: key, "course": course})
+
+    return changes
+
+
+class ChangeTracker:
+    """增量爬取：記錄每個系所上次的內容雜湊，內容沒變就不重寫檔案，有變動時寫入變更紀錄"""
+
+    def __init__(self, state_file: str = STATE_FILE, changelog_file: str = CHANGELOG_FILE):
+        self.state_file = state_file
+        self.changelog_file = changelog_file
+        self.state: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(state_file):
+            with open(state_file, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        # 本次執行中內容有變動的系所
+        self.changed_departments: List[str] = []
+        # 多個分頁同時爬取時保護 state 與變更紀錄
+        self._lock = threading.Lock()
+
+    def load_previous(self, path: str) -> List[Dict[str, Any]]:
+        """讀取上次保存的系所課程，檔案不存在則回傳空列表"""
+        if not os.path.exists(path):
+            return []
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def update(self, dept_code: str, path: str, courses: List[Dict[str, Any]]) -> bool:
+        """比對本次結果與上次的雜湊
+
+        返回:
+            True 表示內容有變動（或尚無紀錄），呼叫端需要重寫檔案；False 表示可以略過
+        """
+        digest = course_list_hash(courses)
+        previous_state = self.state.get(dept_code)
+        if previous_state and previous_state.get("hash") == digest and os.path.exists(path):
+            return False
+
+        changes = diff_courses(self.load_previous(path), courses)
+        now = datetime.now().isoformat(timespec="seconds")
+        with self._lock:
+            if changes:
+                with open(self.changelog_file, "a", encoding="utf-8") as f:
+                    for change in changes:
+                        record = {"time": now, "dept": dept_code, **change}
+                        f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self.state[dept_code] = {"hash": digest, "updated_at": now}
+            self.changed_departments.append(dept_code)
+        print(f"{dept_code} 內容有變動，共 {len(changes)} 筆課程異動")
+        return True
+
+    def save(self) -> None:
+        """保存各系所的雜湊，供下次執行比對"""
+        with open(self.state_file, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,132 @@
+import sys
+import json
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from checkpoint import SessionExpired
+
+# 觀察的欄位
+SEAT_FIELD = '可加選餘額'
+
+
+def plan_departments(numbers: Iterable[str], db) -> Dict[str, List[str]]:
+    """依課程資料庫找出需要抓取的系所頁面
+
+    同一門課可能列在多個系所頁面，這裡以貪婪法挑出最少的系所涵蓋所有選課號碼。
+
+    返回:
+        {系所代碼: 在該頁面觀察的選課號碼列表}
+    """
+    listed_in: Dict[str, set] = {}
+    for number in numbers:
+        depts = {course['系所代碼'] for course in db.by_number(number)}
+        if depts:
+            listed_in[number] = depts
+        else:
+            print(f"警告: 課程資料庫中找不到選課號碼 {number}，將略過", file=sys.stderr)
+
+    plan: Dict[str, List[str]] = {}
+    remaining = set(listed_in)
+    while remaining:
+        coverage: Dict[str, List[str]] = {}
+        for number in remaining:
+            for dept in listed_in[number]:
+                coverage.setdefault(dept, []).append(number)
+        dept = max(sorted(coverage), key=lambda code: len(coverage[code]))
+        plan[dept] = sorted(coverage[dept])
+        remaining -= set(coverage[dept])
+    return plan
+
+
+def print_event(event: Dict[str, Any]) -> None:
+    """以 JSON Lines 輸出事件"""
+    print(json.dumps(event, ensure_ascii=False), flush=True)
+
+
+class SeatWatcher:
+    """只重抓觀察清單所在的系所頁面，在可加選餘額變動時發出事件
+
+    輪詢間隔會自動調整：有變動時回到 min_interval，連續沒有變動則逐步放寬到 max_interval。
+    """
+
+    def __init__(self, plan: Dict[str, List[str]], fetch_tables: Callable[[str], List[Dict[str, Any]]],
+                 min_interval: float = 5.0, max_interval: float = 60.0, backoff: float = 1.5,
+                 emit: Callable[[Dict[str, Any]], None] = print_event):
+        """
+        參數:
+            plan: plan_departments() 的結果
+            fetch_tables: 取得某系所表格的函式（fetch_tables_http 或 fetch_tables_browser 的包裝）
+            min_interval / max_interval: 輪詢間隔的上下限（秒）
+            backoff: 沒有變動時間隔放大的倍數
+            emit: 處理事件的函式
+        """
+        self.plan = plan
+        self.fetch_tables = fetch_tables
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.emit = emit
+        self.interval = min_interval
+        # 選課號碼 -> 上次看到的餘額
+        self.seats: Dict[str, str] = {}
+
+    def poll_once(self) -> List[Dict[str, Any]]:
+        """抓取一輪，返回這一輪的變動事件（第一次看到的課程不算變動）
+
+        登入失效時直接拋出 SessionExpired，繼續輪詢只會一直抓到登入頁。
+        """
+        events = []
+        for dept_code, numbers in self.plan.items():
+            try:
+                tables = self.fetch_tables(dept_code)
+            except SessionExpired:
+                raise
+            except Exception as e:
+                print(f"抓取 {dept_code} 時出錯: {e}", file=sys.stderr)
+                continue
+
+            wanted = set(numbers)
+            for table in tables:
+                for course in table.get('courses', []):
+                    number = course.get('選課號碼')
+                    if number not in wanted:
+                        continue
+                    wanted.discard(number)
+                    seats = course.get(SEAT_FIELD, '')
+                    previous = self.seats.get(number)
+                    self.seats[number] = seats
+                    if previous is not None and previous != seats:
+                        events.append({
+                            "time": datetime.now().isoformat(timespec="seconds"),
+                            "dept": dept_code,
+                            "選課號碼": number,
+                            "科目名稱": course.get('科目名稱', '').split("\n")[0],
+                            "old": previous,
+                            "new": seats,
+                        })
+        return events
+
+    def run(self, rounds: Optional[int] = None) -> None:
+        """持續輪詢，rounds 為 None 時直到按下 Ctrl+C"""
+        print(f"開始觀察 {sum(len(v) for v in self.plan.values())} 門課程，"
+              f"每輪抓取 {len(self.plan)} 個系所頁面", file=sys.stderr)
+        count = 0
+        try:
+            while rounds is None or count < rounds:
+                start = time.monotonic()
+                events = self.poll_once()
+                for event in events:
+                    self.emit(event)
+
+                # 有變動就縮短間隔，否則逐步放寬
+                if events:
+                    self.interval = self.min_interval
+                else:
+                    self.interval = min(self.interval * self.backoff, self.max_interval)
+
+                count += 1
+                if rounds is None or count < rounds:
+                    time.sleep(max(0.0, self.interval - (time.monotonic() - start)))
+        except KeyboardInterrupt:
+            print("已停止觀察", file=sys.stderr)
@@ -0,0 +1,78 @@
+import json
+import os
+
+import checkpoint
+from checkpoint import CheckpointJournal
+
+
+def write_courses(path, courses):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(courses, f, ensure_ascii=False)
+    return str(path)
+
+
+def test_record_survives_restart(tmp_path):
+    journal_path = str(tmp_path / ".checkpoint.jsonl")
+    courses = [{'選課號碼': "1"}]
+    dept_file = write_courses(tmp_path / "U56.json", courses)
+
+    journal = CheckpointJournal(journal_path)
+    assert journal.completed("U56") is None
+    journal.record("U56", "資工系", dept_file, 1)
+    journal.close()
+
+    journal = CheckpointJournal(journal_path)
+    assert journal.completed("U56")["name"] == "資工系"
+    assert journal.load("U56") == courses
+    assert journal.skipped == ["U56"]
+    journal.close()
+
+
+def test_truncated_last_line_is_ignored_and_terminated(tmp_path):
+    journal_path = tmp_path / ".checkpoint.jsonl"
+    dept_file = write_courses(tmp_path / "U56.json", [])
+    entry = {"code": "U56", "name": "資工系", "path": dept_file, "count": 0, "time": 1e12}
+    journal_path.write_text(json.dumps(entry) + "\n" + '{"code": "U57", "na', encoding="utf-8")
+
+    journal = CheckpointJournal(str(journal_path))
+    assert set(journal.entries) == {"U56"}
+    dept_file = write_courses(tmp_path / "U57.json", [])
+    journal.record("U57", "電機系", dept_file, 0)
+    journal.close()
+
+    journal = CheckpointJournal(str(journal_path))
+    assert set(journal.entries) == {"U56", "U57"}
+    journal.close()
+
+
+def test_expired_or_missing_output_is_not_completed(tmp_path, monkeypatch):
+    journal = CheckpointJournal(str(tmp_path / ".checkpoint.jsonl"), max_age=60)
+    kept = write_courses(tmp_path / "U56.json", [])
+    removed = write_courses(tmp_path / "U57.json", [])
+    journal.record("U56", "資工系", kept, 0)
+    journal.record("U57", "電機系", removed, 0)
+    os.remove(removed)
+
+    assert journal.completed("U56") is not None
+    assert journal.completed("U57") is None
+
+    now = checkpoint.time.time()
+    monkeypatch.setattr(checkpoint.time, "time", lambda: now + 61)
+    assert journal.completed("U56") is None
+    journal.close()
+
+
+def test_reset_and_finish(tmp_path):
+    journal_path = str(tmp_path / ".checkpoint.jsonl")
+    dept_file = write_courses(tmp_path / "U56.json", [])
+    journal = CheckpointJournal(journal_path)
+    journal.record("U56", "資工系", dept_file, 0)
+    journal.reset()
+    assert journal.entries == {}
+    journal.record("U57", "電機系", dept_file, 0)
+    journal.close()
+
+    journal = CheckpointJournal(journal_path)
+    assert set(journal.entries) == {"U57"}
+    journal.finish()
+    assert not os.path.exists(journal_path)
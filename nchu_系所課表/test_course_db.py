@@ -0,0 +1,47 @@
+import json
+
+from course_db import CourseDB, has_crawl_data
+from department_list import save_departments
+
+
+def write_department(data_dir, code, name, courses):
+    with open(data_dir / f"{code}_{name}.json", "w", encoding="utf-8") as f:
+        json.dump(courses, f, ensure_ascii=False)
+
+
+def course(number, teacher="林振祥", required="必修"):
+    return {"選課號碼": number, "上課教師": teacher, "開課單位": "資工系", "必選別": required}
+
+
+def test_reload_without_departments_file(tmp_path, capsys):
+    db = CourseDB(str(tmp_path / "courses.db"))
+    try:
+        assert not has_crawl_data(str(tmp_path))
+        assert db.reload(str(tmp_path)) == []
+        assert "請先執行一次完整爬取" in capsys.readouterr().err
+        assert db.query() == []
+    finally:
+        db.close()
+
+
+def test_reload_is_incremental_and_queries(tmp_path):
+    save_departments([{"code": "U56", "name": "資工系"}, {"code": "U57", "name": "電機系"}], "1141",
+                     str(tmp_path / "departments.json"))
+    write_department(tmp_path, "U56", "資工系", [course("1"), course("2", teacher="林振祥等", required="選修")])
+    write_department(tmp_path, "U57", "電機系", [course("3", teacher="王小明")])
+
+    db = CourseDB(str(tmp_path / "courses.db"))
+    try:
+        assert has_crawl_data(str(tmp_path))
+        assert db.reload(str(tmp_path)) == ["U56", "U57"]
+        assert db.reload(str(tmp_path)) == []
+        assert [c["選課號碼"] for c in db.by_teacher("林振祥")] == ["1", "2"]
+        assert [c["選課號碼"] for c in db.by_required("選修")] == ["2"]
+        assert db.by_number("3")[0]["系所代碼"] == "U57"
+
+        # 系所從列表中移除時一併刪除其課程
+        save_departments([{"code": "U56", "name": "資工系"}], "1141", str(tmp_path / "departments.json"))
+        assert db.reload(str(tmp_path)) == ["U57"]
+        assert db.by_department("U57") == []
+    finally:
+        db.close()
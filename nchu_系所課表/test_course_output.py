@@ -0,0 +1,73 @@
+import json
+import threading
+
+from course_output import CourseSink
+
+
+def course(number, name="課程"):
+    return {'選課號碼': number, '科目名稱': f"{name}{number}\nCourse", '備註': "含\"引號\"與\\"}
+
+
+def read_json(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def make_sink(tmp_path):
+    return CourseSink(str(tmp_path / "courses.jsonl"), str(tmp_path / "courses.index.json"))
+
+
+def test_index_records_byte_ranges(tmp_path):
+    sink = make_sink(tmp_path)
+    assert sink.write_department("U56", "資工系", [course("1"), course("2")]) == 2
+    assert sink.write_department("U57", "電機系", iter([course("3")])) == 1
+    assert sink.write_department("U58", "空系所", []) == 0
+    sink.close()
+
+    index = read_json(tmp_path / "courses.index.json")
+    assert index["U56"] == {"name": "資工系", "offset": 0, "length": index["U57"]["offset"], "count": 2}
+    assert index["U58"]["length"] == 0
+
+    data = (tmp_path / "courses.jsonl").read_bytes()
+    entry = index["U57"]
+    lines = data[entry["offset"]:entry["offset"] + entry["length"]].decode("utf-8").splitlines()
+    assert [json.loads(line) for line in lines] == [course("3")]
+
+
+def test_export_department_and_combined(tmp_path):
+    sink = make_sink(tmp_path)
+    sink.write_department("U56", "資工系", [course("1"), course("2")])
+    sink.write_department("U57", "電機系", [course("3")])
+    sink.write_department("U58", "空系所", [])
+    sink.close()
+
+    sink.export_department("U56", str(tmp_path / "U56.json"))
+    sink.export_department("U99", str(tmp_path / "U99.json"))
+    assert read_json(tmp_path / "U56.json") == [course("1"), course("2")]
+    assert read_json(tmp_path / "U99.json") == []
+
+    combined = tmp_path / "all_courses.json"
+    sink.export_combined(str(combined), ["U57", "U56", "U58"])
+    result = read_json(combined)
+    assert list(result) == ["U57", "U56", "U58"]
+    assert result == {"U57": [course("3")], "U56": [course("1"), course("2")], "U58": []}
+
+
+def test_concurrent_departments_stay_contiguous(tmp_path):
+    sink = make_sink(tmp_path)
+    codes = [f"U{i}" for i in range(8)]
+
+    def write(code):
+        sink.write_department(code, code, (course(f"{code}-{n}") for n in range(50)))
+
+    threads = [threading.Thread(target=write, args=(code,)) for code in codes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sink.close()
+
+    for code in codes:
+        path = tmp_path / f"{code}.json"
+        sink.export_department(code, str(path))
+        assert [c['選課號碼'] for c in read_json(path)] == [f"{code}-{n}" for n in range(50)]
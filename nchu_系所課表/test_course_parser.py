@@ -0,0 +1,75 @@
+import pytest
+
+from benchmarks.fixtures import load_course_data, render_course_page
+from course_parser import HTML_PARSER, ROW_SCHEMA, expand_row_tables, parse_course_tables
+
+COURSE_DATA = load_course_data()
+
+
+def flatten(tables):
+    return [{"標題": table["header"], **course} for table in tables for course in table["courses"]]
+
+
+def test_parser_is_pinned():
+    assert HTML_PARSER == "html.parser"
+
+
+@pytest.mark.skipif(not COURSE_DATA, reason="沒有課程資料")
+@pytest.mark.parametrize("dept_code", sorted(COURSE_DATA))
+def test_round_trip_matches_saved_courses(dept_code):
+    """由課程 JSON 還原的頁面，解析後與原本的 JSON 相同（沒有備註欄的表格以空字串比較）"""
+    courses = COURSE_DATA[dept_code]
+    parsed = flatten(parse_course_tables(render_course_page(courses)))
+    assert len(parsed) == len(courses)
+    for original, result in zip(courses, parsed):
+        for field in ["標題", *ROW_SCHEMA]:
+            assert result.get(field, "") == original.get(field, ""), field
+
+
+def test_cell_text_collapses_spaces_and_keeps_line_breaks():
+    tables = parse_course_tables(
+        '<table name="mytable"><tr><td>標題</td></tr><tr><td>欄位</td></tr><tr>'
+        + '<td>  必修 \n </td><td>A<br> B </td>' + '<td>x</td>' * 17 + '</tr></table>'
+    )
+    course = tables[0]["courses"][0]
+    assert course["必選別"] == "必修"
+    assert course["選課號碼"] == "A\nB"
+    assert "備註" not in course
+
+
+def test_table_without_courses_is_skipped():
+    assert parse_course_tables('<table name="mytable"><tr><td>標題</td></tr></table>') == []
+
+
+def test_expand_row_tables():
+    data = {"schema": ["必選別", "選課號碼"], "tables": [{"header": "H", "rows": [["必修", "1"]]}]}
+    assert expand_row_tables(data) == [{"header": "H", "courses": [{"必選別": "必修", "選課號碼": "1"}]}]
+
+
+def to_row_tables(tables):
+    """模擬 EXTRACT_TABLES_BULK_JS 的輸出：每列依 ROW_SCHEMA 排成值陣列，沒有備註欄時少一格"""
+    return {
+        "schema": ROW_SCHEMA,
+        "tables": [
+            {"header": table["header"],
+             "rows": [[course[field] for field in ROW_SCHEMA if field in course] for course in table["courses"]]}
+            for table in tables
+        ],
+    }
+
+
+@pytest.mark.skipif(not COURSE_DATA, reason="沒有課程資料")
+@pytest.mark.parametrize("dept_code", sorted(COURSE_DATA)[:5])
+def test_bulk_rows_expand_to_parsed_tables(dept_code):
+    tables = parse_course_tables(render_course_page(COURSE_DATA[dept_code]))
+    assert expand_row_tables(to_row_tables(tables)) == tables
+
+
+def test_expand_row_tables_defaults_to_row_schema():
+    row = [str(i) for i in range(len(ROW_SCHEMA))]
+    expanded = expand_row_tables({"tables": [{"rows": [row, row[:-1]]}]})
+    assert expanded[0]["header"] == ""
+    first, second = expanded[0]["courses"]
+    assert list(first) == ROW_SCHEMA
+    assert list(second) == ROW_SCHEMA[:-1]
+    assert expand_row_tables({}) == []
@@ -0,0 +1,81 @@
+import importlib
+import json
+import os
+
+import pytest
+
+from checkpoint import CheckpointJournal, CrawlIncomplete, MAX_CONSECUTIVE_FAILURES
+
+DEPTS = [{"code": code, "name": f"系所{code}"} for code in ("C10", "C20", "C30", "C60", "C70")]
+
+
+@pytest.fixture
+def crawler(tmp_path, monkeypatch):
+    # 腳本以相對路徑寫入 課程資訊/，在暫存目錄中執行
+    monkeypatch.chdir(tmp_path)
+    module = importlib.import_module("課表資訊")
+    os.makedirs("課程資訊", exist_ok=True)
+    return module
+
+
+def fake_fetch(calls, failing=()):
+    def fetch(session, dept_code):
+        calls.append(dept_code)
+        if dept_code in failing:
+            raise ConnectionError("瀏覽器連線中斷")
+        return [{"header": f"{dept_code} 表格", "courses": [{"選課號碼": f"{dept_code}-1"}]}]
+    return fetch
+
+
+def output_path(dept):
+    return f"課程資訊/{dept['code']}_{dept['name']}.json"
+
+
+def crawl(crawler, journal):
+    return crawler.crawl_departments(DEPTS, interval=0, session=object(), journal=journal)
+
+
+def test_failed_department_is_redone_on_rerun(crawler, monkeypatch):
+    # 上次完整爬取留下的 C30 檔案不應被空列表覆蓋
+    with open(output_path(DEPTS[2]), "w", encoding="utf-8") as f:
+        json.dump([{"選課號碼": "舊資料"}], f)
+
+    calls = []
+    monkeypatch.setattr(crawler, "fetch_tables_http", fake_fetch(calls, failing={"C30"}))
+    journal = CheckpointJournal()
+    with pytest.raises(CrawlIncomplete) as excinfo:
+        crawl(crawler, journal)
+    journal.close()
+    assert excinfo.value.failed == ["C30"]
+    assert calls == ["C10", "C20", "C30", "C60", "C70"]
+    with open(output_path(DEPTS[2]), encoding="utf-8") as f:
+        assert json.load(f) == [{"選課號碼": "舊資料"}]
+
+    # 重新執行只抓取失敗的系所，其餘沿用已保存的檔案
+    calls.clear()
+    monkeypatch.setattr(crawler, "fetch_tables_http", fake_fetch(calls))
+    journal = CheckpointJournal()
+    results = crawl(crawler, journal)
+    assert calls == ["C30"]
+    assert sorted(journal.skipped) == ["C10", "C20", "C60", "C70"]
+    assert list(results) == [dept["code"] for dept in DEPTS]
+    assert results["C30"][0]["選課號碼"] == "C30-1"
+    journal.finish()
+
+
+def test_consecutive_failures_stop_the_crawl(crawler, monkeypatch):
+    calls = []
+    failing = {dept["code"] for dept in DEPTS[1:]}
+    monkeypatch.setattr(crawler, "fetch_tables_http", fake_fetch(calls, failing=failing))
+    journal = CheckpointJournal()
+    with pytest.raises(CrawlIncomplete) as excinfo:
+        crawl(crawler, journal)
+    journal.close()
+
+    # 連續失敗後不再開始新的系所，沒有抓取的系所也列為沒有完成
+    assert calls == ["C10", *sorted(failing)[:MAX_CONSECUTIVE_FAILURES]]
+    assert excinfo.value.failed == [dept["code"] for dept in DEPTS[1:]]
+    assert not os.path.exists(output_path(DEPTS[4]))
+    journal = CheckpointJournal()
+    assert set(journal.entries) == {"C10"}
+    journal.close()
@@ -0,0 +1,48 @@
+from datetime import date
+
+from department_list import current_semester, get_departments, parse_department_options, read_departments_file
+
+QUERY_PAGE = """
+<select name="v_dept">
+  <option value="">請選擇</option>
+  <option value="C10">C10 文學院</option>
+  <option value="U56">U56：資訊工程學系學士班</option>
+  <option value="U56">U56 重複</option>
+  <option value="G12">G12 研究所</option>
+  <option value="U38A">資訊管理學系</option>
+</select>
+"""
+FALLBACK = [{"code": "C10", "name": "文學院"}]
+
+
+def test_current_semester():
+    assert current_semester(date(2025, 9, 1)) == "1141"
+    assert current_semester(date(2026, 3, 1)) == "1142"
+    assert current_semester(date(2026, 1, 15)) == "1141"
+
+
+def test_parse_department_options_filters_and_strips_codes():
+    assert parse_department_options(QUERY_PAGE) == [
+        {"code": "C10", "name": "文學院"},
+        {"code": "U56", "name": "資訊工程學系學士班"},
+        {"code": "U38A", "name": "資訊管理學系"},
+    ]
+
+
+def test_fetched_list_is_cached(tmp_path):
+    path = str(tmp_path / "課程資訊" / "departments.json")
+    assert len(get_departments(lambda: QUERY_PAGE, semester="1141", path=path)) == 3
+
+    def fail():
+        raise AssertionError("快取有效時不應該重新抓取")
+
+    assert len(get_departments(fail, semester="1141", path=path)) == 3
+
+
+def test_fallback_is_persisted_but_refetched_next_time(tmp_path):
+    path = str(tmp_path / "課程資訊" / "departments.json")
+    assert get_departments(lambda: "", semester="1141", fallback=FALLBACK, path=path) == FALLBACK
+    # 第一次執行就退回內建列表時也要寫入檔案，CourseDB.reload 需要它
+    assert read_departments_file(path)["departments"] == FALLBACK
+
+    assert len(get_departments(lambda: QUERY_PAGE, semester="1141", fallback=FALLBACK, path=path)) == 3
@@ -0,0 +1,73 @@
+import json
+
+from incremental import ChangeTracker, course_list_hash, diff_courses
+
+
+def course(number, **fields):
+    return {'選課號碼': number, '科目名稱': f"課程{number}", '可加選餘額': "5", **fields}
+
+
+def test_course_list_hash_is_order_sensitive():
+    a, b = course("1"), course("2")
+    assert course_list_hash([a, b]) == course_list_hash([dict(a), dict(b)])
+    assert course_list_hash([a, b]) != course_list_hash([b, a])
+
+
+def test_diff_courses():
+    old = [course("1"), course("2"), course("3", 備註="舊")]
+    new = [course("1"), course("2", 可加選餘額="0"), course("3"), course("4")]
+    changes = diff_courses(old, new)
+    assert changes == [
+        {"type": "changed", "選課號碼": "2", "fields": {"可加選餘額": ["5", "0"]}},
+        {"type": "changed", "選課號碼": "3", "fields": {"備註": ["舊", None]}},
+        {"type": "added", "選課號碼": "4", "course": course("4")},
+    ]
+    assert diff_courses(new, old)[-1]["type"] == "removed"
+    assert diff_courses(old, old) == []
+
+
+def test_diff_courses_uses_first_occurrence():
+    # 同一門課出現在多個年級的表格中，以第一次出現的資料比對
+    old = [course("1"), course("1", 可加選餘額="0")]
+    new = [course("1"), course("1", 可加選餘額="3")]
+    assert diff_courses(old, new) == []
+
+
+def read_changelog(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_change_tracker(tmp_path):
+    state_file = str(tmp_path / "state.json")
+    changelog = str(tmp_path / "changes.jsonl")
+    dept_file = tmp_path / "U56.json"
+    courses = [course("1"), course("2")]
+
+    tracker = ChangeTracker(state_file, changelog)
+    assert tracker.update("U56", str(dept_file), courses)
+    dept_file.write_text(json.dumps(courses, ensure_ascii=False), encoding="utf-8")
+    tracker.save()
+    assert [record["type"] for record in read_changelog(changelog)] == ["added", "added"]
+
+    # 下一次執行：內容相同時略過
+    tracker = ChangeTracker(state_file, changelog)
+    assert not tracker.update("U56", str(dept_file), courses)
+    assert tracker.changed_departments == []
+
+    # 內容有變動時只記錄差異
+    updated = [course("1"), course("2", 可加選餘額="0")]
+    assert tracker.update("U56", str(dept_file), updated)
+    assert tracker.changed_departments == ["U56"]
+    last = read_changelog(changelog)[-1]
+    assert last["dept"] == "U56"
+    assert last["fields"] == {"可加選餘額": ["5", "0"]}
+    assert len(read_changelog(changelog)) == 3
+
+
+def test_change_tracker_rewrites_missing_file(tmp_path):
+    tracker = ChangeTracker(str(tmp_path / "state.json"), str(tmp_path / "changes.jsonl"))
+    path = str(tmp_path / "U56.json")
+    tracker.update("U56", path, [course("1")])
+    # 雜湊相同但檔案被刪除時仍需重寫
+    assert tracker.update("U56", path, [course("1")])
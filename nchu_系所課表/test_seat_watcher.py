@@ -0,0 +1,63 @@
+import argparse
+import importlib
+
+import pytest
+
+from checkpoint import SessionExpired
+from seat_watcher import SeatWatcher, plan_departments
+
+
+class FakeDB:
+    def __init__(self, listing):
+        self.listing = listing
+
+    def by_number(self, number):
+        return [{'系所代碼': dept} for dept in self.listing.get(number, [])]
+
+
+def table(*courses):
+    return [{"header": "", "courses": [{'選課號碼': number, '科目名稱': f"課程{number}\nCourse", '可加選餘額': seats}
+                                       for number, seats in courses]}]
+
+
+def test_plan_covers_all_numbers_with_fewest_departments():
+    db = FakeDB({"1": ["A", "B"], "2": ["B"], "3": ["C"], "4": []})
+    assert plan_departments(["1", "2", "3", "4"], db) == {"B": ["1", "2"], "C": ["3"]}
+
+
+def test_poll_once_reports_changes_only_after_first_sight():
+    pages = {"B": table(("1", "0"), ("2", "5"), ("9", "1"))}
+    watcher = SeatWatcher({"B": ["1", "2"]}, lambda dept: pages[dept])
+    assert watcher.poll_once() == []
+
+    pages["B"] = table(("1", "3"), ("2", "5"), ("9", "0"))
+    events = watcher.poll_once()
+    assert [(e["選課號碼"], e["old"], e["new"], e["科目名稱"]) for e in events] == [("1", "0", "3", "課程1")]
+
+
+def test_fetch_errors_skip_the_department():
+    def fetch(dept):
+        if dept == "A":
+            raise ValueError("timeout")
+        return table(("2", "1"))
+
+    watcher = SeatWatcher({"A": ["1"], "B": ["2"]}, fetch)
+    assert watcher.poll_once() == []
+    assert watcher.seats == {"2": "1"}
+
+
+def test_session_expired_stops_the_watcher():
+    def fetch(dept):
+        raise SessionExpired("登入狀態已失效")
+
+    watcher = SeatWatcher({"A": ["1"]}, fetch, min_interval=0, max_interval=0)
+    with pytest.raises(SessionExpired):
+        watcher.run(rounds=3)
+
+
+def test_watch_before_any_crawl_asks_for_a_crawl(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    crawler = importlib.import_module("課表資訊")
+    args = argparse.Namespace(watch=["1226"], interval=0, watch_min=5, watch_max=60)
+    crawler.watch_seats(args, session=object())
+    assert "請先執行一次完整爬取" in capsys.readouterr().out
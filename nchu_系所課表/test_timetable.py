@@ -0,0 +1,122 @@
+import json
+
+import numpy as np
+import pytest
+
+from timetable import Timetable, WORDS, encode_slots, format_slots, parse_slots
+
+
+def course(number, time, seats="5", name=None, lab=""):
+    return {'選課號碼': number, '上課時間': time, '實習時間': lab, '可加選餘額': seats,
+            '科目名稱': name or f"課程{number}\nCourse {number}"}
+
+
+def test_parse_slots():
+    assert parse_slots("234,35") == [(1, 2), (1, 3), (2, 4)]
+    assert parse_slots("5ab\n1D") == [(4, 9), (4, 10), (0, 12)]
+    assert parse_slots("") == []
+    assert parse_slots("*") == []
+
+
+@pytest.mark.parametrize("text", ["8123", "x12", "12Z"])
+def test_parse_slots_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        parse_slots(text)
+
+
+@pytest.mark.parametrize("text", ["234,35", "1123456789ABCD", "7D", "1A,3B,5C"])
+def test_encode_format_round_trip(text):
+    mask = encode_slots(text)
+    assert mask.shape == (WORDS,)
+    assert format_slots(mask) == text
+
+
+def test_duplicates_and_invalid_times():
+    table = Timetable([course("1", "234"), course("1", "567"), course("2", "9"), course("3", "")])
+    assert list(table.numbers) == ["1", "2", "3"]
+    assert table.invalid == ["2"]
+    assert not table.masks[1].any()
+
+
+def test_conflicts_include_lab_time():
+    table = Timetable([
+        course("1", "234"),
+        course("2", "245"),
+        course("3", "312", lab="41"),
+        course("4", "41"),
+        course("5", "*"),
+    ])
+    assert table.conflict_pairs() == [("1", "2"), ("3", "4")]
+    assert table.conflict_pairs(["4", "3", "1"]) == [("4", "3")]
+    assert sorted(table.conflicts_with("2")) == ["1"]
+    assert table.conflicts_with("5") == []
+    matrix = table.conflict_matrix()
+    assert matrix.shape == (5, 5)
+    assert not matrix.diagonal().any()
+
+
+def test_conflict_matrix_matches_pairwise_masks():
+    rng = np.random.default_rng(0)
+    courses = []
+    for i in range(40):
+        day = rng.integers(1, 8)
+        periods = "".join(sorted(set(rng.choice(list("123456789ABCD"), size=rng.integers(1, 4)))))
+        courses.append(course(str(i), f"{day}{periods}"))
+    table = Timetable(courses)
+    matrix = table.conflict_matrix()
+    for i in range(len(courses)):
+        for j in range(len(courses)):
+            expected = i != j and bool((table.masks[i] & table.masks[j]).any())
+            assert matrix[i, j] == expected
+
+
+def test_fitting_and_busy_mask():
+    table = Timetable([
+        course("1", "12"),
+        course("2", "13", seats="0"),
+        course("3", "22"),
+        course("4", ""),
+        course("5", "12", seats="額滿"),
+    ])
+    free = encode_slots("1123")
+    assert table.fitting(free) == ["1"]
+    assert table.fitting(free, open_only=False) == ["1", "2", "5"]
+    assert table.fitting(free, include_unscheduled=True) == ["1", "4"]
+
+    busy = table.busy_mask(["1", "3"])
+    assert format_slots(busy) == "12,22"
+    assert not table.busy_mask([]).any()
+    with pytest.raises(KeyError):
+        table.busy_mask(["999"])
+
+
+def test_sections_strip_section_suffix():
+    table = Timetable([
+        course("1", "12", name="微積分(一) u\nCalculus"),
+        course("2", "22", name="微積分(一) v\nCalculus"),
+        course("3", "32", name="微積分(二)\nCalculus"),
+    ])
+    assert table.sections("微積分(一)") == ["1", "2"]
+    assert table.sections("微積分(一) v") == ["2"]
+
+
+def test_schedules_enumerates_conflict_free_combinations():
+    table = Timetable([
+        course("A1", "12"), course("A2", "22"),
+        course("B1", "12"), course("B2", "32"),
+        course("C1", "22"),
+    ])
+    results = table.schedules([["A1", "A2"], ["B1", "B2"], ["C1"]])
+    assert results == [("A1", "B2", "C1")]
+
+    results = table.schedules([["A1", "A2"], ["B1", "B2"]])
+    assert sorted(results) == [("A1", "B2"), ("A2", "B1"), ("A2", "B2")]
+    assert len(table.schedules([["A1", "A2"], ["B1", "B2"]], limit=1)) == 1
+    assert table.schedules([["A1"], ["B1"]]) == []
+
+
+def test_from_all_courses(tmp_path):
+    path = tmp_path / "all_courses.json"
+    path.write_text(json.dumps({"U56": [course("1", "12")], "U57": [course("2", "13")]}), encoding="utf-8")
+    table = Timetable.from_all_courses(str(path))
+    assert table.course("2")['系所代碼'] == "U57"
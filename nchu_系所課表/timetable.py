@@ -0,0 +1,284 @@
+import re
+import json
+import argparse
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# 上課時間的格式為「星期 + 節次」，例如 "234,35" 表示星期二第3、4節與星期三第5節；
+# 多個時段以逗號或換行分隔，"*" 或空字串表示沒有固定時段（只有星期沒有節次的片段也略過）
+PERIODS = "123456789ABCD"
+DAYS = 7
+SLOT_COUNT = DAYS * len(PERIODS)
+# 每門課的時段以 2 個 uint64 組成的固定寬度位元遮罩表示（91 個時段）
+WORDS = (SLOT_COUNT + 63) // 64
+
+# 計算衝堂時使用的時間欄位
+TIME_FIELDS = ('上課時間', '實習時間')
+
+ALL_COURSES_FILE = "課程資訊/all_courses.json"
+
+# 科目名稱後面的班別代號，例如「微積分(一) u」的 u
+_SECTION_SUFFIX = re.compile(r"\s+[A-Za-z*]$")
+
+
+def parse_slots(text: str) -> List[Tuple[int, int]]:
+    """把上課時間字串解析成 (星期索引, 節次索引) 列表，星期與節次皆從 0 開始
+
+    格式不正確時拋出 ValueError。
+    """
+    slots = []
+    for group in text.replace("\n", ",").split(","):
+        group = group.strip()
+        if not group or group == "*":
+            continue
+        day = group[0]
+        if not day.isdigit() or not 1 <= int(day) <= DAYS:
+            raise ValueError(f"無法解析的上課時間: {text!r}")
+        for period in group[1:]:
+            index = PERIODS.find(period.upper())
+            if index < 0:
+                raise ValueError(f"無法解析的上課時間: {text!r}")
+            slots.append((int(day) - 1, index))
+    return slots
+
+
+def encode_slots(text: str) -> np.ndarray:
+    """把上課時間字串編碼為長度 WORDS 的 uint64 位元遮罩"""
+    mask = np.zeros(WORDS, dtype=np.uint64)
+    for day, period in parse_slots(text):
+        bit = day * len(PERIODS) + period
+        mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+    return mask
+
+
+def format_slots(mask: np.ndarray) -> str:
+    """把位元遮罩轉回上課時間字串（每個星期一組，以逗號分隔）"""
+    bits = _unpack(mask.reshape(1, WORDS))[0]
+    groups = []
+    for day in range(DAYS):
+        periods = "".join(
+            PERIODS[p] for p in range(len(PERIODS)) if bits[day * len(PERIODS) + p]
+        )
+        if periods:
+            groups.append(f"{day + 1}{periods}")
+    return ",".join(groups)
+
+
+def _unpack(masks: np.ndarray) -> np.ndarray:
+    """把 (N, WORDS) 的 uint64 遮罩展開成 (N, SLOT_COUNT) 的 0/1 矩陣"""
+    raw = np.ascontiguousarray(masks, dtype="<u8").view(np.uint8)
+    bits = np.unpackbits(raw, axis=1, bitorder="little")
+    return bits[:, :SLOT_COUNT]
+
+
+def _seats(course: Dict[str, Any]) -> int:
+    value = course.get('可加選餘額', '')
+    return int(value) if value.strip().lstrip("-").isdigit() else 0
+
+
+class Timetable:
+    """所有課程的時段位元遮罩，提供批次的衝堂判斷與排課運算
+
+    同一門課（相同選課號碼）可能列在多個系所或年級的表格中，只保留第一次出現的資料。
+    """
+
+    def __init__(self, courses: Iterable[Dict[str, Any]]):
+        self.courses: List[Dict[str, Any]] = []
+        self._index: Dict[str, int] = {}
+        # 無法解析上課時間的課程（遮罩為 0，不參與衝堂判斷）
+        self.invalid: List[str] = []
+
+        masks = []
+        for course in courses:
+            number = course.get('選課號碼', '')
+            if not number or number in self._index:
+                continue
+            mask = np.zeros(WORDS, dtype=np.uint64)
+            try:
+                for field in TIME_FIELDS:
+                    mask |= encode_slots(course.get(field, ''))
+            except ValueError:
+                self.invalid.append(number)
+                mask[:] = 0
+            self._index[number] = len(self.courses)
+            self.courses.append(course)
+            masks.append(mask)
+
+        self.masks = np.array(masks, dtype=np.uint64).reshape(len(masks), WORDS)
+        self.numbers = np.array([course['選課號碼'] for course in self.courses])
+        self.seats = np.array([_seats(course) for course in self.courses], dtype=np.int64)
+        self._bits: Optional[np.ndarray] = None
+
+    @classmethod
+    def from_all_courses(cls, path: str = ALL_COURSES_FILE) -> "Timetable":
+        """從爬蟲輸出的 all_courses.json 建立"""
+        with open(path, "r", encoding="utf-8") as f:
+            all_courses = json.load(f)
+        return cls(
+            {**course, '系所代碼': dept_code}
+            for dept_code, courses in all_courses.items()
+            for course in courses
+        )
+
+    @property
+    def bits(self) -> np.ndarray:
+        """(N, SLOT_COUNT) 的 float32 時段矩陣，用於以矩陣乘法計算衝堂"""
+        if self._bits is None:
+            self._bits = _unpack(self.masks).astype(np.float32)
+        return self._bits
+
+    def indices(self, numbers: Iterable[str]) -> np.ndarray:
+        """把選課號碼轉成索引，找不到時拋出 KeyError"""
+        try:
+            return np.array([self._index[number] for number in numbers], dtype=np.int64)
+        except KeyError as e:
+            raise KeyError(f"找不到選課號碼 {e.args[0]}") from None
+
+    def course(self, number: str) -> Dict[str, Any]:
+        return self.courses[self._index[number]]
+
+    def conflict_matrix(self, numbers: Optional[Sequence[str]] = None) -> np.ndarray:
+        """兩兩衝堂矩陣（布林），numbers 為 None 時計算所有課程，對角線為 False"""
+        bits = self.bits if numbers is None else self.bits[self.indices(numbers)]
+        overlap = bits @ bits.T > 0
+        np.fill_diagonal(overlap, False)
+        return overlap
+
+    def conflict_pairs(self, numbers: Optional[Sequence[str]] = None) -> List[Tuple[str, str]]:
+        """列出所有衝堂的課程組合"""
+        selected = self.numbers if numbers is None else np.asarray(numbers)
+        rows, cols = np.nonzero(np.triu(self.conflict_matrix(numbers)))
+        return [(str(selected[i]), str(selected[j])) for i, j in zip(rows, cols)]
+
+    def conflicts_with(self, number: str) -> List[str]:
+        """與指定課程衝堂的所有課程"""
+        target = self.masks[self._index[number]]
+        hits = np.nonzero((self.masks & target).any(axis=1))[0]
+        return [str(self.numbers[i]) for i in hits if self.numbers[i] != number]
+
+    def fitting(self, free: np.ndarray, open_only: bool = True,
+                include_unscheduled: bool = False) -> List[str]:
+        """找出時段完全落在 free 遮罩內的課程
+
+        參數:
+            free: 空堂時段的位元遮罩（可由 encode_slots 或 busy_mask 取反得到）
+            open_only: 只列出可加選餘額大於 0 的課程
+            include_unscheduled: 是否包含沒有固定上課時段的課程
+        """
+        fits = ~(self.masks & ~free).any(axis=1)
+        if not include_unscheduled:
+            fits &= self.masks.any(axis=1)
+        if open_only:
+            fits &= self.seats > 0
+        return [str(number) for number in self.numbers[fits]]
+
+    def busy_mask(self, numbers: Iterable[str]) -> np.ndarray:
+        """多門課程時段的聯集"""
+        index = self.indices(numbers)
+        if not len(index):
+            return np.zeros(WORDS, dtype=np.uint64)
+        return np.bitwise_or.reduce(self.masks[index], axis=0)
+
+    def sections(self, name: str) -> List[str]:
+        """以科目名稱（中文名稱那一行，可省略班別代號）找出所有開課班別的選課號碼"""
+        numbers = []
+        for course in self.courses:
+            title = course.get('科目名稱', '').split("\n")[0].strip()
+            if title == name or _SECTION_SUFFIX.sub("", title) == name:
+                numbers.append(course['選課號碼'])
+        return numbers
+
+    def schedules(self, requirements: Sequence[Sequence[str]], limit: Optional[int] = None) -> List[Tuple[str, ...]]:
+        """列舉不衝堂的排課組合
+
+        參數:
+            requirements: 每個元素是一門必修課可選的班別（選課號碼列表），每門課需選一個班別
+            limit: 最多回傳幾組，None 表示全部
+
+        每一層以整個候選陣列和目前已排時段做一次向量化比對，只展開不衝堂的班別。
+        """
+        candidates = [self.indices(options) for options in requirements]
+        # 選擇少的課先排，可以更早剪枝
+        order = sorted(range(len(candidates)), key=lambda i: len(candidates[i]))
+        results: List[Tuple[str, ...]] = []
+        chosen = [0] * len(candidates)
+
+        def search(depth: int, busy: np.ndarray) -> bool:
+            if depth == len(order):
+                results.append(tuple(str(self.numbers[i]) for i in chosen))
+                return limit is not None and len(results) >= limit
+            slot = order[depth]
+            options = candidates[slot]
+            free = ~(self.masks[options] & busy).any(axis=1)
+            for index in options[free]:
+                chosen[slot] = index
+                if search(depth + 1, busy | self.masks[index]):
+                    return True
+            return False
+
+        search(0, np.zeros(WORDS, dtype=np.uint64))
+        return results
+
+
+def _describe(timetable: Timetable, number: str) -> str:
+    course = timetable.course(number)
+    title = course.get('科目名稱', '').split("\n")[0]
+    times = format_slots(timetable.masks[timetable._index[number]]) or "無固定時段"
+    return f"{number}  {title}  {course.get('上課教師', '')}  {times}  餘額:{course.get('可加選餘額', '')}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="以上課時段位元遮罩進行衝堂檢查與排課")
+    parser.add_argument("--data", default=ALL_COURSES_FILE, help=f"課程資料（預設 {ALL_COURSES_FILE}）")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    conflicts_parser = subparsers.add_parser("conflicts", help="檢查多門課程之間是否衝堂")
+    conflicts_parser.add_argument("numbers", nargs="+", help="選課號碼")
+
+    fit_parser = subparsers.add_parser("fit", help="列出可排進空堂的課程")
+    fit_parser.add_argument("--free", help="空堂時段，格式同上課時間，例如 1234,2567；未指定則視為整週皆空")
+    fit_parser.add_argument("--taken", nargs="*", default=[], help="已選課程的選課號碼，其時段視為不可用")
+    fit_parser.add_argument("--all", action="store_true", help="包含已無餘額的課程")
+
+    schedule_parser = subparsers.add_parser("schedule", help="列舉必修課不衝堂的班別組合")
+    schedule_parser.add_argument("courses", nargs="+", help="科目名稱或選課號碼（選課號碼表示指定班別）")
+    schedule_parser.add_argument("--limit", type=int, default=20, help="最多列出幾組（預設 20）")
+    args = parser.parse_args()
+
+    timetable = Timetable.from_all_courses(args.data)
+
+    if args.command == "conflicts":
+        pairs = timetable.conflict_pairs(args.numbers)
+        for a, b in pairs:
+            print(f"衝堂: {_describe(timetable, a)}")
+            print(f"      {_describe(timetable, b)}")
+        if not pairs:
+            print("沒有衝堂")
+
+    elif args.command == "fit":
+        free = encode_slots(args.free) if args.free else ~np.zeros(WORDS, dtype=np.uint64)
+        free &= ~timetable.busy_mask(args.taken)
+        numbers = timetable.fitting(free, open_only=not args.all)
+        for number in numbers:
+            print(_describe(timetable, number))
+        print(f"共 {len(numbers)} 門課程")
+
+    elif args.command == "schedule":
+        requirements = []
+        for item in args.courses:
+            options = [item] if item in timetable._index else timetable.sections(item)
+            if not options:
+                parser.error(f"找不到課程: {item}")
+            requirements.append(options)
+        results = timetable.schedules(requirements, args.limit)
+        for i, combination in enumerate(results, 1):
+            print(f"方案 {i}:")
+            for number in combination:
+                print(f"  {_describe(timetable, number)}")
+        if not results:
+            print("找不到不衝堂的組合")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,53 @@
-import time
 import os
+import sys
 import json
-from DrissionPage import ChromiumPage
-from dotenv import load_dotenv
+import queue
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-# 初始化 ChromiumPage
-page = ChromiumPage()
+# 讓腳本可以直接執行時也能匯入專案根目錄的共用模組
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler_common.throttle import RateLimiter
+from crawler_common.waits import wait_until, wait_stable
+from crawler_common.http_client import session_from_browser_cookies
+from crawler_common.session_store import SessionStore
+from course_parser import parse_course_tables, expand_row_tables, COURSE_FIELDS, ROW_SCHEMA
+from incremental import ChangeTracker
+from course_output import CourseSink
+from course_db import CourseDB, has_crawl_data
+from seat_watcher import SeatWatcher, plan_departments
+from department_list import get_departments
+from checkpoint import CheckpointJournal, SessionExpired, DepartmentFailed, CrawlIncomplete, MAX_CONSECUTIVE_FAILURES
+
+# 保存 CAS 登入狀態，下次啟動時若仍有效就不必重新登入
+session_store = SessionStore("nchu_cas")
+
+# ChromiumPage 在執行時才由 launch_browser() 建立，匯入本模組時不會啟動瀏覽器
+page = None
+
+# 初始化 ChromiumPage（使用固定的使用者資料目錄，保留 Cloudflare 驗證等瀏覽器狀態）
+def launch_browser():
+    global page
+    # 只有真的要開瀏覽器時才匯入 DrissionPage
+    from DrissionPage import ChromiumPage, ChromiumOptions
+
+    page = ChromiumPage(ChromiumOptions().set_user_data_path(session_store.profile_dir))
+    return page
 
 # 訪問登入頁面
 login_url = "https://ccidp.nchu.edu.tw/login?service=https://cportal.nchu.edu.tw/cas_login/&locale=zh-TW"
 course_url = "https://cportal.nchu.edu.tw/cofsys/plsql/crseqry_home"
 
+# 等待頁面就緒的最長秒數，超過則視為失敗並回報原因
+WAIT_TIMEOUT = 30
+
 # 創建一個目錄來保存所有系所的課程資訊
 if not os.path.exists("課程資訊"):
     os.makedirs("課程資訊")
 
 # 系所代碼和名稱列表（直接從選單中複製）
+# 執行時會從查詢頁面的選單自動取得並快取於 課程資訊/departments.json，此列表只在無法取得時使用
 departments = [
     {"code": "C10", "name": "文學院"},
     {"code": "C20", "name": "管理學院"},
@@ -70,107 +102,205 @@ departments = [
     {"code": "U86", "name": "學士後醫學系學士班"}
 ]
 
-# 爬取指定系所的課程資訊
-def scrape_department_courses(dept_code, dept_name):
-    try:
-        # 構建查詢URL
-        query_url = f"{course_url}_now?v_dept={dept_code}"
-        page.get(query_url)
-        time.sleep(5)
-        
-        print(f"正在爬取 {dept_code} {dept_name} 的課程資訊...")
+# 在頁面中擷取所有課程表格的JavaScript（逐格讀取 innerText，保留供 benchmarks/bench.py 比較效能）
+EXTRACT_TABLES_JS = """
+    function extractTableData() {
+        var tables = document.querySelectorAll('table[name="mytable"]');
+        if (!tables || tables.length === 0) return { tables: [] };
         
-        # 提取課程表格數據
-        courses = []
+        var result = { tables: [] };
         
-        # 使用JavaScript獲取表格數據
-        js_code = """
-        function extractTableData() {
-            var tables = document.querySelectorAll('table[name="mytable"]');
-            if (!tables || tables.length === 0) return { tables: [] };
-            
-            var result = { tables: [] };
+        // 遍歷每個表格
+        for (var t = 0; t < tables.length; t++) {
+            var table = tables[t];
+            var rows = table.querySelectorAll('tr');
+            var tableData = { header: '', courses: [] };
+            var hasCourses = false;
             
-            // 遍歷每個表格
-            for (var t = 0; t < tables.length; t++) {
-                var table = tables[t];
-                var rows = table.querySelectorAll('tr');
-                var tableData = { header: '', courses: [] };
-                var hasCourses = false;
-                
-                // 獲取表格標題信息（第一行）
-                if (rows.length > 0) {
-                    var headerRow = rows[0];
-                    var headerCell = headerRow.querySelector('td');
-                    if (headerCell) {
-                        var headerText = headerCell.innerText.trim();
-                        var headerDiv = headerCell.querySelector('div.tablesorter-header-inner');
-                        if (headerDiv) {
-                            var strongElem = headerDiv.querySelector('strong');
-                            if (strongElem) {
-                                headerText = strongElem.innerText.trim();
-                            }
+            // 獲取表格標題信息（第一行）
+            if (rows.length > 0) {
+                var headerRow = rows[0];
+                var headerCell = headerRow.querySelector('td');
+                if (headerCell) {
+                    var headerText = headerCell.innerText.trim();
+                    var headerDiv = headerCell.querySelector('div.tablesorter-header-inner');
+                    if (headerDiv) {
+                        var strongElem = headerDiv.querySelector('strong');
+                        if (strongElem) {
+                            headerText = strongElem.innerText.trim();
                         }
-                        tableData.header = headerText;
                     }
+                    tableData.header = headerText;
                 }
+            }
+            
+            // 從第3行開始（跳過表頭）
+            for (var i = 2; i < rows.length; i++) {
+                var row = rows[i];
+                var cells = row.querySelectorAll('td');
                 
-                // 從第3行開始（跳過表頭）
-                for (var i = 2; i < rows.length; i++) {
-                    var row = rows[i];
-                    var cells = row.querySelectorAll('td');
+                if (cells.length >= 19) {
+                    var course = {
+                        '必選別': cells[0].innerText.trim(),
+                        '選課號碼': cells[1].innerText.trim(),
+                        '科目名稱': cells[2].innerText.trim(),
+                        '先修科目': cells[3].innerText.trim(),
+                        '全半年': cells[4].innerText.trim(),
+                        '學分數': cells[5].innerText.trim(),
+                        '上課時數': cells[6].innerText.trim(),
+                        '實習時數': cells[7].innerText.trim(),
+                        '上課時間': cells[8].innerText.trim(),
+                        '實習時間': cells[9].innerText.trim(),
+                        '上課教室': cells[10].innerText.trim(),
+                        '實習教室': cells[11].innerText.trim(),
+                        '上課教師': cells[12].innerText.trim(),
+                        '實習教師': cells[13].innerText.trim(),
+                        '開課單位': cells[14].innerText.trim(),
+                        '開課人數': cells[15].innerText.trim(),
+                        '外系人數': cells[16].innerText.trim(),
+                        '可加選餘額': cells[17].innerText.trim(),
+                        '授課語言': cells[18].innerText.trim()
+                    };
                     
-                    if (cells.length >= 19) {
-                        var course = {
-                            '必選別': cells[0].innerText.trim(),
-                            '選課號碼': cells[1].innerText.trim(),
-                            '科目名稱': cells[2].innerText.trim(),
-                            '先修科目': cells[3].innerText.trim(),
-                            '全半年': cells[4].innerText.trim(),
-                            '學分數': cells[5].innerText.trim(),
-                            '上課時數': cells[6].innerText.trim(),
-                            '實習時數': cells[7].innerText.trim(),
-                            '上課時間': cells[8].innerText.trim(),
-                            '實習時間': cells[9].innerText.trim(),
-                            '上課教室': cells[10].innerText.trim(),
-                            '實習教室': cells[11].innerText.trim(),
-                            '上課教師': cells[12].innerText.trim(),
-                            '實習教師': cells[13].innerText.trim(),
-                            '開課單位': cells[14].innerText.trim(),
-                            '開課人數': cells[15].innerText.trim(),
-                            '外系人數': cells[16].innerText.trim(),
-                            '可加選餘額': cells[17].innerText.trim(),
-                            '授課語言': cells[18].innerText.trim()
-                        };
-                        
-                        if (cells.length >= 20) {
-                            course['備註'] = cells[19].innerText.trim();
-                        }
-                        
-                        tableData.courses.push(course);
-                        hasCourses = true;
+                    if (cells.length >= 20) {
+                        course['備註'] = cells[19].innerText.trim();
                     }
-                }
-                
-                // 只添加有課程的表格
-                if (hasCourses) {
-                    result.tables.push(tableData);
+                    
+                    tableData.courses.push(course);
+                    hasCourses = true;
                 }
             }
             
-            return result;
+            // 只添加有課程的表格
+            if (hasCourses) {
+                result.tables.push(tableData);
+            }
+        }
+        
+        return result;
+    }
+    
+    return JSON.stringify(extractTableData());
+    """
+
+# 批次擷取：不讀 innerText（會觸發樣式與版面計算），改走訪文字節點、<br> 轉換行，
+# 結果與 innerText 相同（頁面表格中沒有隱藏元素或區塊元素）。
+# 每列只回傳依欄位順序排列的陣列，欄位名稱只在 schema 中出現一次，由 Python 端還原成課程字典。
+EXTRACT_TABLES_BULK_JS = """
+    var SKIP = { SCRIPT: true, STYLE: true };
+    var SPACES = /[ \\t\\n\\r\\f]+/g;
+    
+    // 等同 innerText.trim()：連續空白合併、<br> 轉換行、去除每行頭尾空白
+    function cellText(cell) {
+        var parts = [];
+        var walker = document.createTreeWalker(cell, NodeFilter.SHOW_ELEMENT | NodeFilter.SHOW_TEXT);
+        var node;
+        while ((node = walker.nextNode())) {
+            if (node.nodeType === 3) {
+                if (!SKIP[node.parentNode.nodeName]) parts.push(node.data.replace(SPACES, ' '));
+            } else if (node.nodeName === 'BR') {
+                parts.push('\\n');
+            }
         }
+        var lines = parts.join('').split('\\n');
+        for (var i = 0; i < lines.length; i++) lines[i] = lines[i].trim();
+        return lines.join('\\n').trim();
+    }
+    
+    var schema = %(schema)s;
+    var required = %(required)d;
+    var tables = document.querySelectorAll('table[name="mytable"]');
+    var result = { schema: schema, tables: [] };
+    
+    for (var t = 0; t < tables.length; t++) {
+        var rows = tables[t].querySelectorAll('tr');
+        var header = '';
         
-        return JSON.stringify(extractTableData());
-        """
+        // 表格標題（第一行），有 strong 標題時以其為準
+        if (rows.length > 0) {
+            var headerCell = rows[0].querySelector('td');
+            if (headerCell) {
+                var headerDiv = headerCell.querySelector('div.tablesorter-header-inner');
+                var strongElem = headerDiv ? headerDiv.querySelector('strong') : null;
+                header = cellText(strongElem || headerCell);
+            }
+        }
         
-        # 執行JavaScript獲取表格數據
-        table_data_json = page.run_js(js_code)
+        // 從第3行開始（跳過表頭），至少要有必要欄位，最多取到備註欄
+        var data = [];
+        for (var i = 2; i < rows.length; i++) {
+            var cells = rows[i].querySelectorAll('td');
+            if (cells.length < required) continue;
+            var n = Math.min(cells.length, schema.length);
+            var values = new Array(n);
+            for (var c = 0; c < n; c++) values[c] = cellText(cells[c]);
+            data.push(values);
+        }
         
-        if table_data_json and table_data_json != "{\"tables\":[]}":
-            data = json.loads(table_data_json)
-            tables = data.get('tables', [])
-            
+        // 只添加有課程的表格
+        if (data.length) result.tables.push({ header: header, rows: data });
+    }
+    
+    return JSON.stringify(result);
+    """ % {"schema": json.dumps(ROW_SCHEMA, ensure_ascii=False), "required": len(COURSE_FIELDS)}
+
+# 等待課程表格載入完成：頁面載入完畢且表格列數不再變化
+def wait_for_course_tables(tab, dept_code):
+    row_count_js = """
+    if (document.readyState !== 'complete') return null;
+    return document.querySelectorAll('table[name="mytable"] tr').length;
+    """
+    return wait_stable(lambda: tab.run_js(row_count_js), timeout=WAIT_TIMEOUT,
+                       description=f"{dept_code} 課程表格載入完成")
+
+# 取得課程查詢首頁（含系所選單）的HTML
+def fetch_query_page(session=None):
+    if session is not None:
+        response = session.get(course_url, timeout=WAIT_TIMEOUT)
+        response.raise_for_status()
+        return response.content
+    page.get(course_url)
+    return page.html
+
+# 以瀏覽器分頁載入系所頁面，並用JavaScript擷取表格
+def fetch_tables_browser(tab, dept_code):
+    tab.get(f"{course_url}_now?v_dept={dept_code}")
+    # 被導回 CAS 登入頁代表登入狀態已失效
+    if "ccidp.nchu.edu.tw" in tab.url:
+        raise SessionExpired("登入狀態已失效，請重新執行登入")
+    wait_for_course_tables(tab, dept_code)
+    
+    # 執行JavaScript獲取表格數據（所有表格一次取回）
+    table_data_json = tab.run_js(EXTRACT_TABLES_BULK_JS)
+    if not table_data_json:
+        return []
+    return expand_row_tables(json.loads(table_data_json))
+
+# 不經過瀏覽器，直接以已登入的 HTTP session 取得系所頁面並在 Python 中解析表格
+def fetch_tables_http(session, dept_code):
+    response = session.get(f"{course_url}_now", params={"v_dept": dept_code}, timeout=WAIT_TIMEOUT)
+    response.raise_for_status()
+    # 被導回 CAS 登入頁代表 session cookie 已失效
+    if "ccidp.nchu.edu.tw" in response.url:
+        raise SessionExpired("登入狀態已失效，請重新執行登入")
+    return parse_course_tables(response.content)
+
+# 爬取指定系所的課程資訊
+def scrape_department_courses(dept_code, dept_name, tab=None, session=None, tracker=None, sink=None, journal=None):
+    output_path = f"課程資訊/{dept_code}_{dept_name}.json"
+    try:
+        if session is not None:
+            tables = fetch_tables_http(session, dept_code)
+        else:
+            # 未指定分頁時使用主頁面（逐一爬取模式）
+            tables = fetch_tables_browser(tab or page, dept_code)
+        
+        print(f"正在爬取 {dept_code} {dept_name} 的課程資訊...")
+        
+        # 提取課程表格數據
+        courses = []
+        
+        if tables:
             # 合併所有表格的課程
             courses = []
             total_courses = 0
@@ -180,16 +310,7 @@ def scrape_department_courses(dept_code, dept_name):
                 table_courses = table_data.get('courses', [])
                 
                 # 為每個課程添加標題信息並放在第一個位置
-                for course in table_courses:
-                    # 創建新的字典，將標題放在第一位
-                    new_course = {'標題': header}
-                    # 將原有的課程信息添加到新字典中
-                    for key, value in course.items():
-                        new_course[key] = value
-                    # 替換原有的課程字典
-                    table_courses[table_courses.index(course)] = new_course
-                
-                courses.extend(table_courses)
+                courses.extend({'標題': header, **course} for course in table_courses)
                 total_courses += len(table_courses)
                 
                 print(f"表格 {i+1}: {header} - {len(table_courses)} 門課程")
@@ -198,74 +319,334 @@ def scrape_department_courses(dept_code, dept_name):
         else:
             print(f"找不到課程表格或表格為空，系所: {dept_code}")
             courses = []
+    except SessionExpired:
+        # 登入失效時其餘系所也會失敗，直接中止讓已完成的進度留在紀錄中
+        raise
     except Exception as e:
         print(f"提取 {dept_code} 課程表格時出錯: {e}")
-        courses = []
+        # 不以空列表覆蓋上次的結果，也不記錄為完成，下次執行時重新抓取
+        raise DepartmentFailed(f"{dept_code}: {e}") from e
+    
+    # 串流模式：每門課程只序列化一次，寫入 JSONL（整個系所頁面已解析在記憶體中，以系所為單位寫入）
+    if sink is not None:
+        sink.write_department(dept_code, dept_name, courses)
+    
+    # 增量模式下內容沒有變動就不重寫檔案
+    if tracker is None or tracker.update(dept_code, output_path, courses):
+        # 保存課程數據為JSON（串流模式由 JSONL 拼接，為每行一門課程的精簡格式）
+        if sink is not None:
+            sink.export_department(dept_code, output_path)
+        else:
+            with open(output_path, "w", encoding="utf-8") as f:
+                json.dump(courses, f, ensure_ascii=False, indent=2)
     
-    # 保存課程數據為JSON
-    with open(f"課程資訊/{dept_code}_{dept_name}.json", "w", encoding="utf-8") as f:
-        json.dump(courses, f, ensure_ascii=False, indent=2)
+    # 檔案已是最新內容才記錄完成
+    if journal is not None:
+        journal.record(dept_code, dept_name, output_path, len(courses))
     
     return courses
 
+# 以分頁池並行爬取多個系所
+def crawl_departments(depts, workers=1, interval=2.0, session=None, tracker=None, sink=None, journal=None):
+    """使用同一個已登入的瀏覽器開啟多個分頁，同時爬取多個系所
+
+    參數:
+        depts: 系所列表，每個元素為 {"code": ..., "name": ...}
+        workers: 同時使用的分頁數量，1 表示只用主頁面逐一爬取
+        interval: 任兩次頁面請求之間的最短間隔秒數（所有分頁共用）
+        session: 已登入的 HTTP session；提供時改用 HTTP 直接抓取，不開分頁
+        tracker: ChangeTracker，提供時只重寫內容有變動的系所檔案
+        sink: CourseSink，提供時課程以串流方式寫入 JSONL
+        journal: CheckpointJournal，提供時略過已完成的系所（改讀取已保存的檔案），並記錄新完成的系所
+
+    返回:
+        {系所代碼: 課程列表}，順序與 depts 相同；
+        串流模式下課程已寫入 sink，只回傳 {系所代碼: 課程數}，不在記憶體中保留已完成系所的課程
+        （每個系所仍會整個解析或讀入後才寫入，記憶體上限是最大的單一系所）
+
+    有系所抓取失敗時仍會繼續其他系所（連續失敗 MAX_CONSECUTIVE_FAILURES 次則不再開始新的系所），
+    最後拋出 CrawlIncomplete；失敗的系所不覆蓋輸出檔、不記錄為完成。
+    """
+    workers = max(1, min(workers, len(depts)))
+    limiter = RateLimiter(interval)
+
+    # 建立分頁池，主頁面也算一個分頁（HTTP 模式不需要分頁）
+    extra_tabs = [] if session is not None else [page.new_tab() for _ in range(workers - 1)]
+    tab_pool = queue.Queue()
+    for tab in [page] + extra_tabs:
+        tab_pool.put(tab)
+
+    # 登入失效後不再開始新的系所
+    aborted = threading.Event()
+    # 沒有完成的系所；連續失敗太多次（瀏覽器當掉或斷線）時放棄其餘系所
+    failed = []
+    consecutive_failures = [0]
+    gave_up = threading.Event()
+    failure_lock = threading.Lock()
+
+    def crawl_one(dept):
+        completed = journal.completed(dept['code']) if journal is not None else None
+        if completed is not None:
+            # 上次中斷前已完成：讀取保存的檔案，不再發出請求
+            courses = journal.load(dept['code'])
+            if sink is not None:
+                sink.write_department(dept['code'], dept['name'], courses)
+            if tracker is not None:
+                tracker.update(dept['code'], completed['path'], courses)
+            return courses if sink is None else len(courses)
+        if aborted.is_set():
+            raise SessionExpired("登入狀態已失效，請重新執行登入")
+        if gave_up.is_set():
+            with failure_lock:
+                failed.append(dept['code'])
+            return None
+        try:
+            result = crawl_page(dept)
+        except SessionExpired:
+            aborted.set()
+            raise
+        except DepartmentFailed:
+            with failure_lock:
+                failed.append(dept['code'])
+                consecutive_failures[0] += 1
+                if consecutive_failures[0] >= MAX_CONSECUTIVE_FAILURES:
+                    gave_up.set()
+            return None
+        with failure_lock:
+            consecutive_failures[0] = 0
+        return result
+
+    def crawl_page(dept):
+        if session is not None:
+            limiter.wait()
+            courses = scrape_department_courses(dept['code'], dept['name'], session=session,
+                                                tracker=tracker, sink=sink, journal=journal)
+        else:
+            tab = tab_pool.get()
+            try:
+                # 每次請求前先經過全域節流，避免請求過於頻繁
+                limiter.wait()
+                courses = scrape_department_courses(dept['code'], dept['name'], tab,
+                                                    tracker=tracker, sink=sink, journal=journal)
+            finally:
+                tab_pool.put(tab)
+        return courses if sink is None else len(courses)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # executor.map 會依輸入順序回傳結果，確保輸出順序固定
+            results = list(executor.map(crawl_one, depts))
+    finally:
+        for tab in extra_tabs:
+            tab.close()
+
+    if failed:
+        # 依 depts 的順序列出
+        failed_codes = set(failed)
+        raise CrawlIncomplete([dept['code'] for dept in depts if dept['code'] in failed_codes])
+    return {dept['code']: courses for dept, courses in zip(depts, results)}
+
+# 觀察指定課程的可加選餘額
+def watch_seats(args, session=None):
+    # 依上次爬取的資料找出各課程所在的系所，只抓這些頁面
+    if not has_crawl_data():
+        print("觀察模式需要上次爬取的課程資料，請先執行一次完整爬取（不加 --watch）")
+        return
+    db = CourseDB()
+    try:
+        db.reload()
+        plan = plan_departments(args.watch, db)
+    finally:
+        db.close()
+    if not plan:
+        print("觀察清單中沒有可追蹤的課程")
+        return
+    
+    limiter = RateLimiter(args.interval)
+    
+    def fetch_tables(dept_code):
+        limiter.wait()
+        if session is not None:
+            return fetch_tables_http(session, dept_code)
+        return fetch_tables_browser(page, dept_code)
+    
+    SeatWatcher(plan, fetch_tables, args.watch_min, args.watch_max).run()
+
+# 命令列參數
+def parse_args():
+    parser = argparse.ArgumentParser(description="中興大學各系所課程資訊爬蟲")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="同時爬取的分頁數量（預設 1，逐一爬取）")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="任兩次頁面請求之間的最短間隔秒數，所有分頁共用（預設 2）")
+    parser.add_argument("--http", action="store_true",
+                        help="登入後改用 HTTP 連線池直接抓取系所頁面，不再以瀏覽器渲染")
+    parser.add_argument("--incremental", action="store_true",
+                        help="只重寫內容有變動的系所，並把異動課程寫入 課程資訊/changes.jsonl")
+    parser.add_argument("--stream", action="store_true",
+                        help="串流輸出：課程逐筆寫入 課程資訊/courses.jsonl，各系所檔與合併檔由其直接拼接")
+    parser.add_argument("--watch", nargs="+", metavar="選課號碼",
+                        help="觀察模式：只重抓這些課程所在的系所頁面，可加選餘額變動時輸出事件")
+    parser.add_argument("--watch-min", type=float, default=5.0,
+                        help="觀察模式的最短輪詢間隔秒數（有變動時使用，預設 5）")
+    parser.add_argument("--watch-max", type=float, default=60.0,
+                        help="觀察模式的最長輪詢間隔秒數（長時間沒有變動時放寬到此值，預設 60）")
+    parser.add_argument("--refresh-departments", action="store_true",
+                        help="忽略快取，重新從查詢頁面取得系所列表")
+    parser.add_argument("--relogin", action="store_true",
+                        help="忽略保存的登入狀態，強制重新登入")
+    parser.add_argument("--restart", action="store_true",
+                        help="忽略上次中斷時的進度紀錄，從第一個系所重新爬取")
+    parser.add_argument("--checkpoint-max-age", type=float, default=6.0,
+                        help="上次中斷時已完成的系所在幾小時內不重新爬取（預設 6）")
+    return parser.parse_args()
+
+# 判斷回應是否仍在登入狀態（未被導向 CAS 登入頁）
+def is_logged_in(response):
+    location = response.headers.get("Location", "")
+    return response.status_code == 200 and "ccidp.nchu.edu.tw" not in response.url + location
+
+# 嘗試沿用上次保存的登入狀態，成功時把 cookie 放回瀏覽器
+def restore_login():
+    data = session_store.restore(course_url, is_logged_in)
+    if data is None:
+        return False
+    page.set.cookies(data["cookies"])
+    print("沿用已保存的登入狀態")
+    return True
+
+# 登入 CAS
+def login():
+    # 登入系統
+    page.get(login_url)
+    
+    # 填寫帳號（只有需要登入時才匯入 dotenv）
+    from dotenv import load_dotenv
+    load_dotenv()
+    username = os.getenv("usernames")
+    password = os.getenv("password")
+    
+    # 等待帳號欄位出現後輸入帳號密碼
+    username_input = wait_until(lambda: page.ele('xpath://*[@id="username"]', timeout=0),
+                                timeout=WAIT_TIMEOUT, description="登入表單載入")
+    username_input.input(username)
+    page.ele('xpath://*[@id="password"]').input(password)
+    
+    # 等待CF-turnstile機制完成（驗證通過後會填入 token）
+    turnstile_js = """
+    var field = document.querySelector('input[name="cf-turnstile-response"]');
+    return field ? field.value : '';
+    """
+    wait_until(lambda: page.run_js(turnstile_js), timeout=WAIT_TIMEOUT,
+               description="Cloudflare Turnstile 驗證完成")
+    
+    # 點擊登入按鈕
+    login_button = page.ele('xpath://*[@id="login-form-controls"]/span/span/button/span').click()
+    
+    # 等待登入完成，跳離 CAS 登入頁面
+    wait_until(lambda: "ccidp.nchu.edu.tw" not in page.url, timeout=WAIT_TIMEOUT,
+               description="CAS 登入完成並跳轉")
+    print("當前頁面標題:", page.title)
+    
+    # 保存登入狀態供下次使用
+    session_store.save(page.cookies(all_domains=True, all_info=True), page.user_agent)
+
 # 主函數
-def main():
+def main(args):
     try:
-        # 登入系統
-        page.get(login_url)
-        time.sleep(3)
-        
-        # 填寫帳號
-        load_dotenv()
-        username = os.getenv("usernames")
-        password = os.getenv("password")
+        # 先嘗試沿用保存的登入狀態，失效時才重新登入
+        if args.relogin or not restore_login():
+            login()
         
-        # 輸入帳號密碼
-        time.sleep(2)
-        page.ele('xpath://*[@id="username"]').input(username)
-        page.ele('xpath://*[@id="password"]').input(password)
+        # HTTP 模式：把瀏覽器登入後的 cookie 交給 keep-alive 連線池
+        session = None
+        if args.http:
+            session = session_from_browser_cookies(page.cookies(all_domains=True, all_info=True),
+                                                   pool_size=max(args.workers, 1),
+                                                   user_agent=page.user_agent)
         
-        # 點擊登入按鈕
-        time.sleep(3) # 等待CF-turnstile機制加載完成
+        if args.watch:
+            try:
+                watch_seats(args, session)
+            except SessionExpired:
+                # 與完整爬取相同：下次執行時不再沿用失效的 cookie，重新登入
+                session_store.clear()
+                raise
+            return
         
-        login_button = page.ele('xpath://*[@id="login-form-controls"]/span/span/button/span').click()
+        # 取得系所列表：優先使用快取，過期或換學期時才從查詢頁面的選單重新解析
+        depts = get_departments(lambda: fetch_query_page(session), refresh=args.refresh_departments,
+                                fallback=departments)
+        print(f"總共有 {len(depts)} 個系所")
         
-        # 等待登入完成
-        time.sleep(5)
-        print("當前頁面標題:", page.title)
+        tracker = ChangeTracker() if args.incremental else None
+        sink = CourseSink() if args.stream else None
         
-        # 保存系所列表
-        with open("課程資訊/departments.json", "w", encoding="utf-8") as f:
-            json.dump(departments, f, ensure_ascii=False, indent=2)
-        
-        print(f"總共有 {len(departments)} 個系所")
+        # 進度紀錄：上次中斷時已完成的系所不再重抓
+        journal = CheckpointJournal(max_age=args.checkpoint_max_age * 3600)
+        if args.restart:
+            journal.reset()
         
         # 爬取每個系所的課程
-        all_courses = {}
-        for dept in departments:
-            dept_code = dept['code']
-            dept_name = dept['name']
-            
-            courses = scrape_department_courses(dept_code, dept_name)
-            all_courses[dept_code] = courses
-            
-            # 每爬取一個系所後暫停一下，避免請求過於頻繁
-            time.sleep(2)
+        try:
+            all_courses = crawl_departments(depts, args.workers, args.interval, session, tracker, sink, journal)
+        except SessionExpired:
+            # 下次執行時不再沿用失效的 cookie，重新登入後從中斷處接續
+            session_store.clear()
+            journal.close()
+            if tracker is not None:
+                tracker.save()
+            raise
+        except CrawlIncomplete:
+            # 保留進度紀錄、不重建 all_courses.json，重新執行時只抓取沒有完成的系所
+            journal.close()
+            if tracker is not None:
+                tracker.save()
+            raise
+        finally:
+            if sink is not None:
+                sink.close()
+        if journal.skipped:
+            print(f"沿用上次中斷前已完成的 {len(journal.skipped)} 個系所")
         
-        # 保存所有課程數據
-        with open("課程資訊/all_courses.json", "w", encoding="utf-8") as f:
-            json.dump(all_courses, f, ensure_ascii=False, indent=2)
+        # 保存所有課程數據（增量模式下沒有任何系所變動則略過；接續上次進度時一律重建）
+        if (tracker is None or tracker.changed_departments or journal.skipped
+                or not os.path.exists("課程資訊/all_courses.json")):
+            if sink is not None:
+                sink.export_combined("課程資訊/all_courses.json", [dept['code'] for dept in depts])
+            else:
+                with open("課程資訊/all_courses.json", "w", encoding="utf-8") as f:
+                    json.dump(all_courses, f, ensure_ascii=False, indent=2)
+        else:
+            print("所有系所內容皆未變動，略過 all_courses.json")
+        if tracker is not None:
+            tracker.save()
+        # 整輪完成，下次執行重新抓取全部系所
+        journal.finish()
+        
+        # 更新本地課程資料庫（只重新載入有變動的系所）
+        db = CourseDB()
+        try:
+            updated = db.reload()
+            print(f"課程資料庫已更新 {len(updated)} 個系所")
+        finally:
+            db.close()
         
         print("所有系所課程資訊爬取完成！")
     except Exception as e:
         print(f"執行過程中出錯: {e}")
 
-if __name__ == "__main__":
+def run():
+    args = parse_args()
+    launch_browser()
     try:
-        main()
+        main(args)
     finally:
         # 完成後等待用戶按下 Enter 鍵再關閉瀏覽器
         input("按 Enter 鍵關閉瀏覽器...")
         page.quit()
 
+if __name__ == "__main__":
+    run()
+
 
@@ -0,0 +1,20 @@
+import os
+
+import crawler
+
+
+def test_backend_runs_in_its_own_directory(tmp_path, monkeypatch):
+    script_dir = tmp_path / "backend"
+    script_dir.mkdir()
+    # 模擬在匯入時就以相對路徑建立輸出目錄的腳本
+    (script_dir / "script.py").write_text(
+        "import os\nos.makedirs('輸出', exist_ok=True)\n\ndef main():\n    return os.getcwd()\n", encoding="utf-8")
+    monkeypatch.setattr(crawler, "ROOT_DIR", str(tmp_path))
+    monkeypatch.setitem(crawler.COMMANDS, "fake", (os.path.join("backend", "script.py"), "main", "測試"))
+    monkeypatch.setattr(crawler.sys, "path", list(crawler.sys.path))
+    monkeypatch.chdir(tmp_path)
+
+    module = crawler.load_backend("fake")
+    assert module.main() == str(script_dir)
+    assert (script_dir / "輸出").is_dir()
+    assert not (tmp_path / "輸出").exists()
@@ -1,46 +1,83 @@
 import os
 import re
+import sys
 import json
-import requests
-from typing import Dict, List, Optional, Any
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, Optional, Any
 from datetime import datetime
 
-# 導入 yt-dlp
-try:
-    import yt_dlp
-    YTDLP_AVAILABLE = True
-except ImportError:
+# 讓腳本可以直接執行時也能匯入專案根目錄的共用模組
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler_common.probes import module_available, probe_command
+from crawler_common.throttle import BandwidthLimiter
+from download_queue import DownloadQueue, BatchDownloader, read_url_file, QUEUE_FILE, DONE, FAILED
+from download_engine import (DownloadConfig, TransferMonitor, parse_rate,
+                             DEFAULT_CONCURRENT_FRAGMENTS, DEFAULT_RETRIES)
+from download_manifest import DownloadManifest, OutputCollector, MANIFEST_FILE, download_format_key
+from metadata_cache import MetadataCache, DOWNLOAD_MAX_AGE, SEARCH_TTL, info_key, oembed_key, search_key
+
+if TYPE_CHECKING:
+    import requests
+
+# 只檢查 yt-dlp 是否已安裝，真正用到時才匯入（匯入 yt-dlp 需要數百毫秒）
+YTDLP_AVAILABLE = module_available("yt_dlp")
+if not YTDLP_AVAILABLE:
     print("警告: yt-dlp 套件未安裝，部分功能將不可用。請執行 'pip install yt-dlp' 安裝。")
-    YTDLP_AVAILABLE = False
-except Exception as e:
-    print(f"警告: yt-dlp 導入時出錯: {e}，部分功能將不可用。")
-    YTDLP_AVAILABLE = False
 
 class YouTubeScraper:
-    def __init__(self, output_dir="downloads"):
-        """初始化 YouTube 爬蟲"""
+    # 備用方法使用的公開端點（可改指向本機伺服器做離線測試）
+    OEMBED_URL = "https://www.youtube.com/oembed"
+    SEARCH_URL = "https://www.youtube.com/results"
+    # 備用方法同時發出的 oEmbed 請求數（也是 session 連線池的大小）
+    OEMBED_WORKERS = 8
+    # 備用方法每個請求的逾時秒數
+    REQUEST_TIMEOUT = 10
+
+    def __init__(self, output_dir="downloads", cache: Optional[MetadataCache] = None, use_cache: bool = True,
+                 download_config: Optional[DownloadConfig] = None):
+        """初始化 YouTube 爬蟲
+        
+        參數:
+            output_dir: 下載目錄
+            cache: 影片資訊快取，預設使用專案根目錄下的 .cache/youtube
+            use_cache: 為 False 時每次都重新取得影片資訊
+            download_config: 片段並行、續傳、重試與頻寬上限的設定，預設使用 DownloadConfig()
+        """
         self.output_dir = output_dir
+        self.cache = (cache or MetadataCache()) if use_cache else None
+        self.download_config = download_config or DownloadConfig()
+        # 同一個爬蟲的所有下載（包含批次下載的各執行緒）共用頻寬上限
+        self.bandwidth = BandwidthLimiter(self.download_config.max_bandwidth)
         # 確保下載目錄存在
         if not os.path.exists(output_dir):
             os.makedirs(output_dir)
+        # 已下載的影片（影片 ID 與格式 → 檔案）
+        self.manifest = DownloadManifest(os.path.join(output_dir, MANIFEST_FILE))
+        # 備用方法共用的 keep-alive session，第一次用到時才建立（見 _get_session）
+        self._session: Optional["requests.Session"] = None
+        self._session_lock = threading.Lock()
         
         # 檢查 yt-dlp 是否可用
         if not YTDLP_AVAILABLE:
             print("警告: 由於 yt-dlp 不可用，某些功能將受限。")
             
-        # 檢查是否有 FFmpeg
-        self.has_ffmpeg = self._check_ffmpeg()
-        if not self.has_ffmpeg:
-            print("警告: 未找到 FFmpeg，音訊轉換功能將受限。")
+        # FFmpeg 在第一次用到時才檢查（見 has_ffmpeg）
+        self._has_ffmpeg = None
+    
+    @property
+    def has_ffmpeg(self) -> bool:
+        """系統是否安裝了 FFmpeg（第一次存取時檢查，結果快取在磁碟，不必每次都執行 ffmpeg -version）"""
+        if self._has_ffmpeg is None:
+            self._has_ffmpeg = self._check_ffmpeg()
+            if not self._has_ffmpeg:
+                print("警告: 未找到 FFmpeg，音訊轉換功能將受限。")
+        return self._has_ffmpeg
     
     def _check_ffmpeg(self) -> bool:
         """檢查系統是否安裝了 FFmpeg"""
-        try:
-            import subprocess
-            result = subprocess.run(['ffmpeg', '-version'], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            return result.returncode == 0
-        except Exception:
-            return False
+        return probe_command("ffmpeg") is not None
     
     def get_video_info(self, url: str) -> Optional[Dict[str, Any]]:
         """獲取 YouTube 影片的資訊"""
@@ -54,43 +91,21 @@ class YouTubeScraper:
             # 使用 yt-dlp 獲取影片資訊
             if YTDLP_AVAILABLE:
                 try:
-                    ydl_opts = {
-                        'quiet': True,
-                        'no_warnings': True,
-                        'skip_download': True,
-                        'format': 'best',
-                    }
+                    info = self._get_info(url, video_id)
                     
-                    with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                        info = ydl.extract_info(url, download=False)
-                        
-                        # 確保 info 不是 None
-                        if info is not None:
-                            # 格式化資訊
-                            video_info = {
-                                "標題": info.get('title', '未知'),
-                                "影片長度": self._format_duration(info.get('duration', 0)),
-                                "觀看次數": info.get('view_count', 0),
-                                "評分": info.get('average_rating', 0),
-                                "發布日期": info.get('upload_date', '未知'),
-                                "作者": info.get('uploader', '未知'),
-                                "影片ID": video_id,
-                                "縮圖網址": info.get('thumbnail', f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"),
-                                "描述": info.get('description', '無描述')
-                            }
-                            return video_info
-                        else:
-                            print("yt-dlp 返回空資訊")
+                    # 確保 info 不是 None
+                    if info is not None:
+                        return self._format_video_info(info, video_id)
+                    else:
+                        print("yt-dlp 返回空資訊")
                 except Exception as ydl_error:
                     print(f"yt-dlp 獲取影片資訊失敗: {ydl_error}")
             
             # 如果 yt-dlp 不可用或失敗，使用備用方法
             try:
                 # 使用公開的 oEmbed API 獲取基本資訊
-                oembed_url = f"https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
-                response = requests.get(oembed_url)
-                if response.status_code == 200:
-                    data = response.json()
+                data = self._fetch_oembed(video_id)
+                if data is not None:
                     info = {
                         "標題": data.get("title", "未知"),
                         "作者": data.get("author_name", "未知"),
@@ -106,13 +121,102 @@ class YouTubeScraper:
             print(f"獲取影片資訊時出錯: {e}")
             return None
     
-    def download_video(self, url: str, resolution: str = "best", output_filename: Optional[str] = None) -> Optional[str]:
+    def _get_info(self, url: str, video_id: Optional[str], max_age: Optional[float] = None,
+                  refresh: bool = False) -> Optional[Dict[str, Any]]:
+        """取得原始的影片資訊字典，優先使用快取（以影片 ID 為鍵），取得後寫入快取
+        
+        參數:
+            max_age: 快取的最長可用秒數，預設為快取的 ttl
+            refresh: 為 True 時忽略快取，重新取得
+        """
+        key = info_key(video_id) if video_id and self.cache else None
+        if key and not refresh:
+            info = self.cache.get(key, max_age)
+            if info is not None:
+                return info
+        info = self._extract_info(url)
+        if key and info is not None:
+            self.cache.put(key, info)
+        return info
+    
+    def _extract_info(self, url: str) -> Optional[Dict[str, Any]]:
+        """以 yt-dlp 取得原始的影片資訊字典（不下載），已整理成可寫成 JSON 的形式"""
+        import yt_dlp
+
+        # 不指定格式：同一份資訊也供下載使用，由下載時的選項挑選格式
+        ydl_opts = {
+            'quiet': True,
+            'no_warnings': True,
+            'skip_download': True,
+        }
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            info = ydl.extract_info(url, download=False)
+            return ydl.sanitize_info(info) if info is not None else None
+    
+    def _format_video_info(self, info: Dict[str, Any], video_id: str) -> Dict[str, Any]:
+        """把 yt-dlp 的資訊字典整理成顯示用的欄位"""
+        return {
+            "標題": info.get('title', '未知'),
+            "影片長度": self._format_duration(info.get('duration', 0)),
+            "觀看次數": info.get('view_count', 0),
+            "評分": info.get('average_rating', 0),
+            "發布日期": info.get('upload_date', '未知'),
+            "作者": info.get('uploader', '未知'),
+            "影片ID": video_id,
+            "縮圖網址": info.get('thumbnail', f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"),
+            "描述": info.get('description', '無描述')
+        }
+    
+    def _get_session(self) -> "requests.Session":
+        """備用方法共用的 HTTP session（連線池、keep-alive、自動重試）"""
+        with self._session_lock:
+            if self._session is None:
+                from crawler_common.http_client import create_session
+                self._session = create_session(pool_size=self.OEMBED_WORKERS, retries=2)
+            return self._session
+    
+    def _fetch_oembed(self, video_id: str) -> Optional[Dict[str, Any]]:
+        """呼叫 oEmbed API 取得影片的基本資訊（有快取時不發出請求），影片不存在時返回 None"""
+        key = oembed_key(video_id)
+        if self.cache:
+            data = self.cache.get(key)
+            if data is not None:
+                return data
+        params = {"url": f"https://www.youtube.com/watch?v={video_id}", "format": "json"}
+        response = self._get_session().get(self.OEMBED_URL, params=params, timeout=self.REQUEST_TIMEOUT)
+        if response.status_code != 200:
+            return None
+        data = response.json()
+        if self.cache:
+            self.cache.put(key, data)
+        return data
+    
+    def _fetch_oembeds(self, video_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """並行取得多部影片的 oEmbed 資訊，順序與 video_ids 相同，失敗的項目為 None"""
+        def fetch(video_id: str) -> Optional[Dict[str, Any]]:
+            try:
+                return self._fetch_oembed(video_id)
+            except Exception as item_error:
+                print(f"處理替代搜尋結果項目時出錯: {item_error}")
+                return None
+
+        if not video_ids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.OEMBED_WORKERS, len(video_ids))) as executor:
+            return list(executor.map(fetch, video_ids))
+    
+    def download_video(self, url: str, resolution: str = "best", output_filename: Optional[str] = None,
+                       interactive: bool = True, extra_opts: Optional[Dict[str, Any]] = None,
+                       force: bool = False) -> Optional[str]:
         """下載 YouTube 影片
         
         參數:
             url: YouTube 影片網址
             resolution: 解析度選項 ("best", "worst", "audio", "720p", "480p", "360p" 等)
             output_filename: 輸出檔案名稱 (不含副檔名)，如果為 None 則使用影片標題
+            interactive: 為 False 時不詢問使用者（例如沒有 FFmpeg 時直接繼續下載），供批次下載使用
+            extra_opts: 額外的 yt-dlp 選項（例如 progress_hooks），會覆蓋預設值
+            force: 為 True 時即使下載紀錄中已有相同影片與格式也重新下載
             
         返回:
             下載的檔案路徑或 None (如果下載失敗)
@@ -120,19 +224,30 @@ class YouTubeScraper:
         if not YTDLP_AVAILABLE:
             print("錯誤: 此功能需要 yt-dlp 套件。")
             return None
+        import yt_dlp
             
         try:
+            # 下載紀錄中已有相同影片與格式、且檔案還在時直接返回
+            video_id = self._extract_video_id(url)
+            manifest_key = download_format_key(resolution, output_filename)
+            if video_id and not force:
+                entry = self.manifest.lookup(video_id, manifest_key)
+                if entry is not None:
+                    print(f"已下載過: {entry['path']}")
+                    return entry['path']
+            
             # 檢查是否有 FFmpeg，如果沒有且不是只下載音訊，提示用戶
             if not self.has_ffmpeg and resolution != "audio":
                 print("警告: 未安裝 FFmpeg，無法合併影片和音訊。")
                 print("建議安裝 FFmpeg: https://www.geeksforgeeks.org/how-to-install-ffmpeg-on-windows/")
                 print("或選擇僅下載音訊選項。")
                 
-                # 詢問用戶是否繼續
-                choice = input("是否繼續下載? (y/n): ")
-                if choice.lower() != 'y':
-                    print("下載已取消")
-                    return None
+                # 詢問用戶是否繼續（批次下載時不等待輸入）
+                if interactive:
+                    choice = input("是否繼續下載? (y/n): ")
+                    if choice.lower() != 'y':
+                        print("下載已取消")
+                        return None
                     
                 print("將繼續下載，但影片和音訊將分開存儲。")
             
@@ -141,7 +256,7 @@ class YouTubeScraper:
                 'quiet': False,
                 'no_warnings': True,
                 'outtmpl': os.path.join(self.output_dir, '%(title)s.%(ext)s'),
-                'ignoreerrors': True,
+                **self.download_config.ydl_opts(),
             }
             
             # 如果有 FFmpeg，設置合併格式
@@ -178,110 +293,107 @@ class YouTubeScraper:
                 else:
                     ydl_opts['format'] = resolution
             
-            # 獲取影片資訊以確定檔案名稱
-            with yt_dlp.YoutubeDL({'quiet': True, 'no_warnings': True}) as ydl:
-                info = ydl.extract_info(url, download=False)
-                # 確保 info 不是 None
-                if info is None:
-                    print("無法獲取影片資訊")
-                    return None
-                title = info.get('title', 'video')
+            if extra_opts:
+                ydl_opts.update(extra_opts)
+            # 收集下載與後處理完成的檔案路徑（保留 extra_opts 中的 hook）
+            collector = OutputCollector()
+            # 統計這次下載的速度，並計入共用的頻寬上限
+            monitor = TransferMonitor(self.bandwidth)
+            ydl_opts['progress_hooks'] = [*ydl_opts.get('progress_hooks', []), collector.progress_hook, monitor.hook]
+            ydl_opts['postprocessor_hooks'] = [*ydl_opts.get('postprocessor_hooks', []), collector.postprocessor_hook]
+            
+            # 獲取影片資訊（使用快取時不必再向 YouTube 取得）
+            info = self._get_info(url, video_id, max_age=DOWNLOAD_MAX_AGE)
+            # 確保 info 不是 None
+            if info is None:
+                print("無法獲取影片資訊")
+                return None
+            title = info.get('title', 'video')
                 
-            # 下載影片
+            # 下載影片：直接以取得的資訊下載，yt-dlp 不會再解析一次影片頁面
             print(f"正在下載: {title}")
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                result = ydl.download([url])
-                
-                # 檢查下載結果
-                if result != 0:
-                    print(f"下載過程中出現錯誤，返回碼: {result}")
-            
-            # 確定下載後的檔案路徑
-            if output_filename:
-                base_filename = output_filename
-            else:
-                # 處理檔案名稱中的非法字元和特殊字符
-                base_filename = title
-                
-            # 處理檔案名稱中的非法字元和特殊字符
-            base_filename = re.sub(r'[\\/*?:"<>|]', '_', base_filename)
-            # 處理其他特殊字符，例如斜線變體
-            base_filename = base_filename.replace('⧸', '_')
-            base_filename = base_filename.replace('／', '_')
-            base_filename = base_filename.replace('∕', '_')
-            
-            # 如果沒有 FFmpeg 且不是僅下載音訊，則需要找出下載的檔案
-            if not self.has_ffmpeg and resolution != "audio":
-                # 查找下載的檔案
-                video_file = None
-                audio_file = None
-                
-                for file in os.listdir(self.output_dir):
-                    if base_filename in file:
-                        if file.endswith('.mp4'):
-                            video_file = os.path.join(self.output_dir, file)
-                        elif file.endswith('.webm') or file.endswith('.m4a'):
-                            audio_file = os.path.join(self.output_dir, file)
-                
-                if video_file and audio_file:
-                    print(f"由於未安裝 FFmpeg，影片和音訊檔案分開存儲:")
-                    print(f"影片檔案: {video_file}")
-                    print(f"音訊檔案: {audio_file}")
-                    return video_file  # 返回影片檔案路徑
-                elif audio_file:
-                    print(f"只找到音訊檔案: {audio_file}")
-                    return audio_file
-                elif video_file:
-                    print(f"只找到影片檔案: {video_file}")
-                    return video_file
-            
-            # 確定副檔名
-            if resolution == "audio" and self.has_ffmpeg:
-                file_ext = "mp3"
-            else:
-                file_ext = "mp4"  # 默認使用 mp4 作為合併後的格式
-            
-            # 完整檔案路徑
-            file_path = os.path.join(self.output_dir, f"{base_filename}.{file_ext}")
+                try:
+                    collector.add_result(ydl.process_ie_result(info, download=True))
+                except yt_dlp.utils.DownloadError as e:
+                    if not video_id or not self.cache:
+                        raise
+                    # 快取的串流網址可能已失效，重新取得資訊再試一次
+                    print(f"以快取的影片資訊下載失敗（{e}），重新取得影片資訊")
+                    info = self._get_info(url, video_id, refresh=True)
+                    if info is None:
+                        print("無法獲取影片資訊")
+                        return None
+                    collector.add_result(ydl.process_ie_result(info, download=True))
             
-            # 檢查檔案是否存在
-            if os.path.exists(file_path):
-                print(f"下載完成: {file_path}")
-                return file_path
-            else:
-                # 嘗試查找任何可能的下載檔案
-                found_files = []
-                for file in os.listdir(self.output_dir):
-                    # 使用更寬鬆的匹配條件
-                    # 檢查標題的前幾個字符是否存在於檔案名中
-                    if len(base_filename) > 5 and base_filename[:5] in file:
-                        found_files.append(file)
-                    # 或者檢查檔案名是否包含標題的一部分
-                    elif len(base_filename) > 10 and any(part in file for part in base_filename.split()):
-                        found_files.append(file)
-                
-                # 如果找到了檔案，使用最新的一個
-                if found_files:
-                    # 按修改時間排序，最新的在前面
-                    found_files.sort(key=lambda x: os.path.getmtime(os.path.join(self.output_dir, x)), reverse=True)
-                    newest_file = os.path.join(self.output_dir, found_files[0])
-                    print(f"下載完成: {newest_file}")
-                    return newest_file
-                        
+            # 下載後的檔案路徑由 yt-dlp 的 hook 回報，不必掃描下載目錄
+            files = collector.files()
+            if not files:
                 print("找不到下載的檔案")
                 return None
+            if video_id:
+                self.manifest.record(video_id, manifest_key, files, title)
+            
+            # 沒有 FFmpeg 時影片和音訊分開存儲，依各檔案的格式資訊區分
+            if len(files) > 1:
+                print(f"由於未安裝 FFmpeg，影片和音訊檔案分開存儲:")
+                for path in files:
+                    print(f"{'音訊' if collector.is_audio_only(path) else '影片'}檔案: {path}")
+            print(f"下載完成: {files[0]}（{monitor.summary()}）")
+            return files[0]
                 
         except Exception as e:
             print(f"下載影片時出錯: {e}")
             return None
     
+    def expand_urls(self, url: str) -> List[str]:
+        """把播放清單或頻道網址展開成各影片的網址，單一影片直接返回"""
+        playlist_markers = ("list=", "/playlist", "/channel/", "/@", "/c/", "/user/")
+        if not any(marker in url for marker in playlist_markers):
+            return [url]
+        if not YTDLP_AVAILABLE:
+            print("錯誤: 展開播放清單需要 yt-dlp 套件。")
+            return []
+        import yt_dlp
+
+        ydl_opts = {'quiet': True, 'no_warnings': True, 'extract_flat': 'in_playlist', 'ignoreerrors': True}
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            result = ydl.extract_info(url, download=False)
+
+        urls = []
+        # 頻道會先分成「影片」「Shorts」等分頁，逐層展開
+        stack = [result] if result else []
+        while stack:
+            entry = stack.pop(0)
+            if entry.get('entries') is not None:
+                stack[0:0] = [child for child in entry['entries'] if child]
+            elif entry.get('ie_key', 'Youtube') == 'Youtube' and entry.get('id'):
+                urls.append(f"https://www.youtube.com/watch?v={entry['id']}")
+            elif entry.get('url'):
+                urls.extend(self.expand_urls(entry['url']) if entry['url'] != url else [])
+        return list(dict.fromkeys(urls))
+    
     def search_videos(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
         """搜尋 YouTube 影片"""
+        key = search_key(query, limit)
+        if self.cache:
+            cached = self.cache.get(key, SEARCH_TTL)
+            if cached is not None:
+                return cached
+        
+        videos = self._search(query, limit)
+        if videos and self.cache:
+            self.cache.put(key, videos)
+        return videos
+    
+    def _search(self, query: str, limit: int) -> List[Dict[str, Any]]:
         videos = []
         
         # 方法 1: 使用 yt-dlp (如果可用)
         if YTDLP_AVAILABLE:
             try:
+                import yt_dlp
+
                 ydl_opts = {
                     'quiet': True,
                     'no_warnings': True,
@@ -322,44 +434,37 @@ class YouTubeScraper:
                 print(f"yt-dlp 搜尋出錯: {e}，嘗試替代方法")
         
         # 方法 2: 使用替代方法 (簡單的 HTML 解析)
+        return self._search_fallback(query, limit)
+    
+    def _search_fallback(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """不依賴 yt-dlp 的搜尋：解析搜尋結果頁面的影片 ID，再並行以 oEmbed 取得資訊"""
+        videos = []
         try:
             # 使用簡單的請求模擬搜索
-            search_url = f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}"
-           
-            response = requests.get(search_url)
+            response = self._get_session().get(self.SEARCH_URL, params={"search_query": query},
+                                               timeout=self.REQUEST_TIMEOUT)
             
             if response.status_code == 200:
-                # 使用正則表達式提取影片 ID
-                video_ids = re.findall(r"watch\?v=(\S{11})", response.text)
+                # 使用正則表達式提取影片 ID，依出現順序去重
                 unique_ids = []
-                
-                # 去重
-                for video_id in video_ids:
-                    if video_id not in unique_ids:
+                seen = set()
+                for video_id in re.findall(r"watch\?v=(\S{11})", response.text):
+                    if video_id not in seen:
+                        seen.add(video_id)
                         unique_ids.append(video_id)
-                        
                         if len(unique_ids) >= limit:
                             break
                 
-                # 獲取每個影片的基本資訊
-                for video_id in unique_ids[:limit]:
-                    try:
-                        # 使用 oEmbed API 獲取基本資訊
-                        oembed_url = f"https://www.youtube.com/oembed?url=https://www.youtube.com/watch?v={video_id}&format=json"
-                        vid_response = requests.get(oembed_url)
-                        
-                        if vid_response.status_code == 200:
-                            data = vid_response.json()
-                            video_info = {
-                                "標題": data.get("title", "未知"),
-                                "網址": f"https://www.youtube.com/watch?v={video_id}",
-                                "縮圖": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
-                                "作者": data.get("author_name", "未知")
-                            }
-                            videos.append(video_info)
-                    except Exception as item_error:
-                        print(f"處理替代搜尋結果項目時出錯: {item_error}")
-                        continue
+                # 同時取得每個影片的基本資訊
+                for video_id, data in zip(unique_ids, self._fetch_oembeds(unique_ids)):
+                    if data is not None:
+                        video_info = {
+                            "標題": data.get("title", "未知"),
+                            "網址": f"https://www.youtube.com/watch?v={video_id}",
+                            "縮圖": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+                            "作者": data.get("author_name", "未知")
+                        }
+                        videos.append(video_info)
         except Exception as alt_error:
             print(f"替代搜尋方法出錯: {alt_error}")
             
@@ -395,9 +500,9 @@ class YouTubeScraper:
         return None
 
 
-# 使用範例
-if __name__ == "__main__":
-    scraper = YouTubeScraper()
+# 互動模式：輸入連結、顯示資訊後選擇下載選項
+def interactive(output_dir: str = "downloads", download_config: Optional[DownloadConfig] = None):
+    scraper = YouTubeScraper(output_dir, download_config=download_config)
     
     # 檢查是否有 FFmpeg
     if not scraper.has_ffmpeg:
@@ -453,3 +558,104 @@ if __name__ == "__main__":
             print("下載完成! 請注意查看上方顯示的檔案路徑。")
     else:
         print("下載失敗，請檢查連結是否正確或嘗試其他解析度。")
+
+
+def print_video_info(info: Optional[Dict[str, Any]]) -> None:
+    if info:
+        for key, value in info.items():
+            if key != "描述":  # 描述通常很長，所以不顯示
+                print(f"{key}: {value}")
+    else:
+        print("無法獲取影片資訊")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="YouTube 影片資訊、搜尋與下載（不加子命令時為互動模式）")
+    parser.add_argument("--output-dir", default="downloads", help="下載目錄（預設 downloads）")
+    parser.add_argument("--no-cache", action="store_true", help="不使用影片資訊與搜尋結果的快取")
+    parser.add_argument("--fragments", type=int, default=DEFAULT_CONCURRENT_FRAGMENTS,
+                        help="每個下載同時取得的片段數（預設 %(default)s）")
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES,
+                        help="檔案與片段失敗時的重試次數，間隔以指數退避（預設 %(default)s）")
+    parser.add_argument("--limit-rate", type=parse_rate, metavar="RATE",
+                        help="所有下載合計的頻寬上限，例如 500K、2M（每秒位元組數）")
+    parser.add_argument("--no-resume", action="store_true", help="不從未完成的 .part 檔續傳，重新下載")
+    subparsers = parser.add_subparsers(dest="command")
+
+    info_parser = subparsers.add_parser("info", help="顯示影片資訊")
+    info_parser.add_argument("url")
+
+    search_parser = subparsers.add_parser("search", help="搜尋影片")
+    search_parser.add_argument("query")
+    search_parser.add_argument("--limit", type=int, default=5)
+
+    download_parser = subparsers.add_parser("download", help="下載影片")
+    download_parser.add_argument("url")
+    download_parser.add_argument("--resolution", default="best",
+                                 help='解析度："best"、"worst"、"audio"、"720p"、"480p"、"360p" 等（預設 best）')
+    download_parser.add_argument("--filename", help="輸出檔案名稱（不含副檔名），預設使用影片標題")
+    download_parser.add_argument("--force", action="store_true", help="即使已下載過相同影片與解析度也重新下載")
+
+    batch_parser = subparsers.add_parser("batch", help="批次下載影片、播放清單或頻道（佇列保存在下載目錄，中斷後重新執行會接續）")
+    batch_parser.add_argument("urls", nargs="*", help="影片、播放清單或頻道網址；不指定時只處理佇列中未完成的項目")
+    batch_parser.add_argument("-f", "--file", help="網址清單檔，每行為「網址 [解析度] [檔名]」")
+    batch_parser.add_argument("--resolution", default="best", help="未個別指定時的解析度（預設 best）")
+    batch_parser.add_argument("--workers", type=int, default=3, help="同時下載的影片數（預設 3）")
+    batch_parser.add_argument("--retry-failed", action="store_true", help="重新下載先前失敗的項目")
+    return parser.parse_args()
+
+
+def run_batch(scraper: "YouTubeScraper", args) -> bool:
+    """把網址加入佇列並下載所有未完成的項目，全部成功時返回 True"""
+    queue = DownloadQueue(os.path.join(scraper.output_dir, QUEUE_FILE))
+    entries = [{"url": url, "resolution": None, "filename": None} for url in args.urls]
+    if args.file:
+        entries.extend(read_url_file(args.file))
+
+    added = 0
+    for entry in entries:
+        urls = scraper.expand_urls(entry["url"])
+        # 播放清單中的影片不能共用同一個檔名
+        filename = entry["filename"] if len(urls) == 1 else None
+        for url in urls:
+            added += queue.add(url, entry["resolution"] or args.resolution, filename)
+    if args.retry_failed:
+        print(f"重新排入 {queue.retry_failed()} 個失敗的項目")
+    print(f"新加入 {added} 個項目，待下載 {len(queue.pending())} 個")
+
+    items = BatchDownloader(scraper, queue, workers=args.workers).run()
+    for item in items:
+        if item["status"] == DONE:
+            print(f"完成: {item['path']}")
+        else:
+            print(f"失敗: {item['url']}（{item['error']}）")
+    return all(item["status"] != FAILED for item in items)
+
+
+def main():
+    args = parse_args()
+    config = DownloadConfig(concurrent_fragments=args.fragments, retries=args.retries,
+                            max_bandwidth=args.limit_rate, resume=not args.no_resume)
+    if args.command is None:
+        interactive(args.output_dir, config)
+        return
+
+    scraper = YouTubeScraper(args.output_dir, use_cache=not args.no_cache, download_config=config)
+    if args.command == "info":
+        print_video_info(scraper.get_video_info(args.url))
+    elif args.command == "search":
+        for i, video in enumerate(scraper.search_videos(args.query, args.limit), 1):
+            print(f"{i}. {video['標題']}（{video['作者']}）")
+            print(f"   {video['網址']}")
+    elif args.command == "download":
+        downloaded_file = scraper.download_video(args.url, args.resolution, args.filename, force=args.force)
+        if downloaded_file is None:
+            sys.exit(1)
+    elif args.command == "batch":
+        if not run_batch(scraper, args):
+            sys.exit(1)
+
+
+# 使用範例
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import re
+import time
+import threading
+from typing import Any, Dict, Optional
+
+from crawler_common.throttle import BandwidthLimiter
+
+# 同時下載的片段數（DASH / HLS 影片分成許多片段）
+DEFAULT_CONCURRENT_FRAGMENTS = 4
+# 整個檔案與單一片段失敗時的重試次數
+DEFAULT_RETRIES = 10
+# 重試間隔的指數退避：第 n 次重試前等待 min(backoff * 2^n, max_backoff) 秒
+DEFAULT_BACKOFF = 1.0
+DEFAULT_MAX_BACKOFF = 30.0
+# 非片段式的影片分段請求的大小，YouTube 對一次請求整個檔案的連線會限速
+DEFAULT_CHUNK_SIZE = 10 * 1024 * 1024
+
+RATE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?)i?B?\s*$", re.IGNORECASE)
+
+
+def parse_rate(text: str) -> float:
+    """把「500K」「2M」「1.5MB」等頻寬寫法轉成每秒位元組數"""
+    match = RATE_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"無法解析頻寬: {text}")
+    number, unit = match.groups()
+    return float(number) * 1024 ** "_KMG".index(unit.upper() or "_")
+
+
+class DownloadConfig:
+    """YouTubeScraper 的下載設定：片段並行、續傳、重試退避與全域頻寬上限"""
+
+    def __init__(self, concurrent_fragments: int = DEFAULT_CONCURRENT_FRAGMENTS, resume: bool = True,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 max_backoff: float = DEFAULT_MAX_BACKOFF, max_bandwidth: Optional[float] = None,
+                 chunk_size: Optional[int] = DEFAULT_CHUNK_SIZE):
+        """
+        參數:
+            concurrent_fragments: 每個下載同時取得的片段數
+            resume: 保留未完成的 .part 檔，中斷後重新下載時從斷點繼續
+            retries: 檔案與片段的重試次數
+            backoff: 重試間隔的指數退避係數（秒）
+            max_backoff: 重試間隔上限（秒）
+            max_bandwidth: 所有同時進行的下載合計的頻寬上限（位元組／秒），None 表示不限制
+            chunk_size: 分段請求的大小（位元組），None 表示一次請求整個檔案
+        """
+        self.concurrent_fragments = concurrent_fragments
+        self.resume = resume
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.max_bandwidth = max_bandwidth
+        self.chunk_size = chunk_size
+
+    def retry_sleep(self, n: int) -> float:
+        """第 n 次重試（從 0 起算）前的等待秒數；yt-dlp 以關鍵字參數 n 呼叫"""
+        return min(self.backoff * 2 ** n, self.max_backoff)
+
+    def ydl_opts(self) -> Dict[str, Any]:
+        """轉成 yt-dlp 的選項
+
+        頻寬上限不使用 yt-dlp 的 ratelimit（它只限制單一下載，與共用上限疊加會限速兩次），
+        只由各下載的 TransferMonitor 共用同一個 BandwidthLimiter 控制合計頻寬。
+        """
+        opts = {
+            'concurrent_fragment_downloads': self.concurrent_fragments,
+            'continuedl': self.resume,
+            'nopart': False,
+            'retries': self.retries,
+            'fragment_retries': self.retries,
+            'retry_sleep_functions': {'http': self.retry_sleep, 'fragment': self.retry_sleep},
+            # 片段重試用盡時讓下載失敗（可續傳），不要產生缺片段的檔案
+            'skip_unavailable_fragments': False,
+        }
+        if self.chunk_size:
+            opts['http_chunk_size'] = self.chunk_size
+        return opts
+
+
+class TransferMonitor:
+    """單一下載的進度 hook：統計傳輸量與平均速度，並把傳輸量計入共用的頻寬上限"""
+
+    def __init__(self, limiter: Optional[BandwidthLimiter] = None):
+        self.limiter = limiter
+        self.bytes = 0
+        # 從第一次進度回報開始計時，不含解析影片資訊的時間
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        # 各檔案已回報的位元組數（yt-dlp 回報的是累計值，每次只計入與上次的差）。
+        # 起點為 0，第一次回報的位元組也會計入；yt-dlp 不回報續傳的起點，
+        # 因此續傳時先前已下載的部分會在第一次回報時一併計入
+        self._reported: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def hook(self, d: Dict[str, Any]) -> None:
+        """交給 yt-dlp 的 progress_hooks"""
+        if d.get("status") not in ("downloading", "finished"):
+            return
+        filename = d.get("filename") or ""
+        downloaded = d.get("downloaded_bytes")
+        if downloaded is None:
+            return
+        with self._lock:
+            if self.started is None:
+                self.started = time.monotonic()
+            delta = downloaded - self._reported.get(filename, 0)
+            self._reported[filename] = downloaded
+            if delta <= 0:
+                return
+            self.bytes += delta
+            self.finished = time.monotonic()
+        if self.limiter is not None:
+            self.limiter.consume(delta)
+
+    @property
+    def elapsed(self) -> float:
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def speed(self) -> float:
+        """平均速度（位元組／秒）"""
+        return self.bytes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def summary(self) -> str:
+        return f"{self.bytes / 1048576:.1f} MB，{self.elapsed:.1f} 秒，平均 {self.speed / 1048576:.2f} MB/s"
@@ -0,0 +1,115 @@
+import os
+import sys
+import json
+import time
+import threading
+from typing import Any, Dict, List, Optional
+
+# 下載紀錄放在下載目錄中：影片 ID 與格式 → 下載後的檔案
+MANIFEST_FILE = ".manifest.json"
+# yt-dlp 把檔案移到最終位置的後處理器，其完成時的 filepath 即最終路徑
+MOVE_FILES_PP = "MoveFilesAfterDownload"
+
+
+def download_format_key(resolution: str, output_filename: Optional[str] = None) -> str:
+    """下載紀錄的格式鍵：解析度，指定輸出檔名時再加上檔名（不同檔名視為不同的下載）"""
+    return f"{resolution}|{output_filename}" if output_filename else resolution
+
+
+def is_audio_only(info: Dict[str, Any]) -> bool:
+    return info.get("vcodec") == "none"
+
+
+class DownloadManifest:
+    """保存在磁碟的下載紀錄，以「影片 ID|格式」為鍵，查詢不需掃描下載目錄（可跨執行緒共用）
+
+    項目欄位：path（主要檔案）、files（所有檔案，沒有 FFmpeg 時影片與音訊分開）、title、downloaded_at。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"讀取下載紀錄時出錯: {e}，將重新建立", file=sys.stderr)
+
+    @staticmethod
+    def _key(video_id: str, format_key: str) -> str:
+        return f"{video_id}|{format_key}"
+
+    def lookup(self, video_id: str, format_key: str) -> Optional[Dict[str, Any]]:
+        """返回已下載的項目；檔案已被刪除或移走時移除紀錄並返回 None"""
+        key = self._key(video_id, format_key)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if not os.path.exists(entry["path"]):
+                del self.entries[key]
+                self._save()
+                return None
+            return entry
+
+    def record(self, video_id: str, format_key: str, files: List[str], title: str) -> Dict[str, Any]:
+        """記錄下載結果，files 的第一個為主要檔案"""
+        entry = {"path": files[0], "files": files, "title": title, "downloaded_at": time.time()}
+        with self._lock:
+            self.entries[self._key(video_id, format_key)] = entry
+            self._save()
+        return entry
+
+    def _save(self) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class OutputCollector:
+    """從 yt-dlp 的進度與後處理 hook 收集一次下載產生的檔案路徑"""
+
+    def __init__(self):
+        # 後處理（合併、轉檔、移動）完成後的最終路徑
+        self.final_paths: List[str] = []
+        # 各格式下載完成時的檔案；沒有後處理紀錄時使用
+        self.downloaded: List[str] = []
+        # 檔案 → 是否只有音訊，依 yt-dlp 回報該檔案的格式資訊（vcodec）判斷
+        self.audio_only: Dict[str, bool] = {}
+
+    def progress_hook(self, d: Dict[str, Any]) -> None:
+        if d.get("status") == "finished" and d.get("filename"):
+            path = d["filename"]
+            if path not in self.downloaded:
+                self.downloaded.append(path)
+            self.audio_only.setdefault(path, is_audio_only(d.get("info_dict") or {}))
+
+    def postprocessor_hook(self, d: Dict[str, Any]) -> None:
+        if d.get("status") == "finished" and d.get("postprocessor") == MOVE_FILES_PP:
+            info = d.get("info_dict") or {}
+            path = info.get("filepath")
+            if path and path not in self.final_paths:
+                self.final_paths.append(path)
+                self.audio_only[path] = is_audio_only(info)
+
+    def add_result(self, info: Optional[Dict[str, Any]]) -> None:
+        """加入 process_ie_result 返回的 requested_downloads（各格式的最終路徑與編碼）"""
+        for download in (info or {}).get("requested_downloads") or []:
+            path = download.get("filepath")
+            if not path:
+                continue
+            if path not in self.final_paths:
+                self.final_paths.append(path)
+            self.audio_only[path] = is_audio_only(download)
+
+    def files(self) -> List[str]:
+        """返回仍存在的輸出檔案，影片在前、音訊在後"""
+        paths = self.final_paths or self.downloaded
+        paths = sorted(paths, key=self.is_audio_only)
+        return [path for path in paths if os.path.exists(path)]
+
+    def is_audio_only(self, path: str) -> bool:
+        return self.audio_only.get(path, False)
@@ -0,0 +1,197 @@
+import os
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+# 佇列檔放在下載目錄中，中斷後重新執行會接續未完成的項目
+QUEUE_FILE = ".download_queue.json"
+# 彙整進度最多每隔此秒數輸出一次
+PROGRESS_INTERVAL = 1.0
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+class DownloadQueue:
+    """保存在磁碟的下載佇列，每次狀態變動都立即寫回（可跨執行緒共用）
+
+    項目欄位：url、resolution、filename、status（pending / running / done / failed）、
+    path（完成後的檔案）、error、attempts。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.items: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.items = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"讀取下載佇列時出錯: {e}，將重新建立", file=sys.stderr)
+        # 上次執行到一半被中斷的項目重新排入
+        for item in self.items:
+            if item["status"] == RUNNING:
+                item["status"] = PENDING
+
+    def add(self, url: str, resolution: str = "best", filename: Optional[str] = None) -> bool:
+        """加入一個項目，相同網址與解析度已在佇列中時不重複加入，返回是否有加入"""
+        with self._lock:
+            if any(item["url"] == url and item["resolution"] == resolution for item in self.items):
+                return False
+            self.items.append({
+                "url": url, "resolution": resolution, "filename": filename,
+                "status": PENDING, "path": None, "error": None, "attempts": 0, "added_at": time.time(),
+            })
+            self._save()
+            return True
+
+    def pending(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [item for item in self.items if item["status"] == PENDING]
+
+    def retry_failed(self) -> int:
+        """把失敗的項目重新排入，返回數量"""
+        with self._lock:
+            failed = [item for item in self.items if item["status"] == FAILED]
+            for item in failed:
+                item["status"] = PENDING
+                item["error"] = None
+            self._save()
+            return len(failed)
+
+    def update(self, item: Dict[str, Any], **fields) -> None:
+        with self._lock:
+            item.update(fields)
+            self._save()
+
+    def _save(self) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.items, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+class ProgressTracker:
+    """彙整所有下載中項目的 yt-dlp 進度，定期輸出一行總進度到 stderr"""
+
+    def __init__(self, total_items: int, interval: float = PROGRESS_INTERVAL,
+                 output: Callable[[str], None] = lambda line: print(line, file=sys.stderr, flush=True)):
+        self.total_items = total_items
+        self.interval = interval
+        self.output = output
+        self.finished_items = 0
+        self.failed_items = 0
+        # 每個下載中的檔案（影片與音訊分開）→ [已下載位元組, 總位元組, 速度]
+        self.files: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        # 輸出另用一把鎖，讓各行依序輸出
+        self._report_lock = threading.Lock()
+        self._last_report = 0.0
+
+    def hook(self, d: Dict[str, Any]) -> None:
+        """交給 yt-dlp 的 progress_hooks"""
+        filename = d.get("filename") or d.get("tmpfilename") or ""
+        with self._lock:
+            if d.get("status") == "downloading":
+                total = d.get("total_bytes") or d.get("total_bytes_estimate") or 0
+                self.files[filename] = [d.get("downloaded_bytes") or 0, total, d.get("speed") or 0]
+            elif d.get("status") == "finished":
+                entry = self.files.setdefault(filename, [0, 0, 0])
+                entry[0] = entry[1] = d.get("total_bytes") or d.get("downloaded_bytes") or entry[1]
+                entry[2] = 0
+        self.report()
+
+    def item_done(self, success: bool) -> None:
+        with self._lock:
+            if success:
+                self.finished_items += 1
+            else:
+                self.failed_items += 1
+        self.report(force=True)
+
+    def summary(self) -> str:
+        with self._lock:
+            downloaded = sum(entry[0] for entry in self.files.values())
+            total = sum(entry[1] for entry in self.files.values())
+            speed = sum(entry[2] for entry in self.files.values())
+            done = self.finished_items + self.failed_items
+            line = f"[{done}/{self.total_items}] {downloaded / 1048576:.1f}"
+            if total:
+                line += f" / {total / 1048576:.1f}"
+            line += f" MB，{speed / 1048576:.1f} MB/s"
+            if self.failed_items:
+                line += f"，失敗 {self.failed_items}"
+            return line
+
+    def report(self, force: bool = False) -> None:
+        with self._report_lock:
+            now = time.monotonic()
+            if not force and now - self._last_report < self.interval:
+                return
+            self._last_report = now
+            self.output(self.summary())
+
+
+class BatchDownloader:
+    """以固定數量的工作執行緒下載佇列中的項目，不會停下來等待使用者輸入"""
+
+    def __init__(self, scraper, queue: DownloadQueue, workers: int = 3):
+        """
+        參數:
+            scraper: YouTubeScraper
+            queue: 下載佇列
+            workers: 同時下載的影片數
+        """
+        self.scraper = scraper
+        self.queue = queue
+        self.workers = workers
+
+    def _download(self, item: Dict[str, Any], tracker: ProgressTracker) -> None:
+        self.queue.update(item, status=RUNNING, attempts=item["attempts"] + 1)
+        try:
+            # 佇列模式不顯示 yt-dlp 各自的進度列，改由 tracker 彙整
+            path = self.scraper.download_video(
+                item["url"], item["resolution"], item["filename"], interactive=False,
+                extra_opts={"quiet": True, "noprogress": True, "progress_hooks": [tracker.hook]},
+            )
+            error = None if path else "下載失敗"
+        except Exception as e:
+            path, error = None, str(e)
+        if path:
+            self.queue.update(item, status=DONE, path=path, error=None)
+        else:
+            self.queue.update(item, status=FAILED, error=error)
+        tracker.item_done(path is not None)
+
+    def run(self) -> List[Dict[str, Any]]:
+        """下載所有待處理的項目，返回這次處理的項目"""
+        items = self.queue.pending()
+        if not items:
+            return []
+        # has_ffmpeg 第一次讀取時才檢查 FFmpeg 並快取結果；先在主執行緒讀取一次，避免各執行緒同時檢查、重複印出警告
+        _ = self.scraper.has_ffmpeg
+        tracker = ProgressTracker(len(items))
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            # 取出每個結果，讓更新佇列或進度時發生的錯誤不會被吞掉
+            for _ in executor.map(lambda item: self._download(item, tracker), items):
+                pass
+        return items
+
+
+def read_url_file(path: str) -> List[Dict[str, Optional[str]]]:
+    """讀取網址清單：每行為「網址 [解析度] [檔名]」，空行與 # 開頭的行略過"""
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if not parts or parts[0].startswith("#"):
+                continue
+            entries.append({
+                "url": parts[0],
+                "resolution": parts[1] if len(parts) > 1 else None,
+                "filename": " ".join(parts[2:]) or None,
+            })
+    return entries
@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from crawler_common.probes import CACHE_DIR
+
+# 影片資訊快取的目錄（專案根目錄下的 .cache，已加入 .gitignore）
+METADATA_CACHE_DIR = os.path.join(CACHE_DIR, "youtube")
+# 影片資訊的預設有效秒數
+DEFAULT_TTL = 24 * 3600
+# 下載時只使用此秒數內取得的資訊：資訊中的串流網址帶有簽章，約六小時後失效
+DOWNLOAD_MAX_AGE = 3 * 3600
+# 搜尋結果的有效秒數
+SEARCH_TTL = 3600
+# 快取總大小上限（完整的影片資訊含所有格式，每部約數百 KB）
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+
+def info_key(video_id: str) -> str:
+    return f"info-{video_id}"
+
+
+def oembed_key(video_id: str) -> str:
+    return f"oembed-{video_id}"
+
+
+def search_key(query: str, limit: int) -> str:
+    digest = hashlib.sha1(f"{query}\n{limit}".encode("utf-8")).hexdigest()
+    return f"search-{digest}"
+
+
+class MetadataCache:
+    """以 JSON 檔保存在磁碟的影片資訊快取（可跨執行緒共用）
+
+    每個鍵一個檔案，檔案的修改時間即取得時間；超過有效時間的項目視為不存在，
+    總大小超過 max_bytes 時從最早取得的項目開始刪除。
+    """
+
+    def __init__(self, directory: str = METADATA_CACHE_DIR, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        參數:
+            directory: 快取目錄
+            ttl: 預設有效秒數
+            max_bytes: 快取總大小上限
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # 鍵 → (取得時間, 檔案大小)，第一次使用時掃描目錄建立
+        self._index: Optional[Dict[str, Tuple[float, int]]] = None
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_index(self) -> Dict[str, Tuple[float, int]]:
+        if self._index is None:
+            self._index = {}
+            try:
+                entries = list(os.scandir(self.directory))
+            except OSError:
+                entries = []
+            for entry in entries:
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    self._index[entry.name[:-len(".json")]] = (stat.st_mtime, stat.st_size)
+        return self._index
+
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Any]:
+        """返回快取的值，不存在或超過 max_age（預設為 ttl）秒時返回 None"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            entry = self._load_index().get(key)
+        if entry is None or time.time() - entry[0] > max_age:
+            return None
+        try:
+            with open(self._path(key), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            self.invalidate(key)
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        """寫入快取並在超過大小上限時淘汰舊項目；寫不進去時只印出警告"""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            # 各執行緒寫入各自的暫存檔，再原子地取代
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, ensure_ascii=False)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError, ValueError) as e:
+            print(f"寫入影片資訊快取時出錯: {e}")
+            return
+        with self._lock:
+            index = self._load_index()
+            index[key] = (time.time(), size)
+            self._evict(index)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._load_index().pop(key, None)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _evict(self, index: Dict[str, Tuple[float, int]]) -> None:
+        total = sum(size for _, size in index.values())
+        if total <= self.max_bytes:
+            return
+        for key, (_, size) in sorted(index.items(), key=lambda item: item[1][0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del index[key]
+            total -= size
@@ -0,0 +1,109 @@
+import pytest
+
+import download_engine
+from download_engine import DownloadConfig, TransferMonitor, parse_rate
+from crawler_common.throttle import BandwidthLimiter
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("500", 500),
+    ("500K", 500 * 1024),
+    ("2M", 2 * 1024 ** 2),
+    ("1.5MB", 1.5 * 1024 ** 2),
+    ("1GiB", 1024 ** 3),
+    (" 3 kb ", 3 * 1024),
+])
+def test_parse_rate(text, expected):
+    assert parse_rate(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "fast", "2T", "-1M"])
+def test_parse_rate_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        parse_rate(text)
+
+
+def test_retry_sleep_functions_accept_keyword_n():
+    # yt-dlp 以 sleep_func(n=重試次數 - 1) 呼叫
+    config = DownloadConfig(backoff=1.0, max_backoff=30.0)
+    functions = config.ydl_opts()["retry_sleep_functions"]
+    assert set(functions) == {"http", "fragment"}
+    for func in functions.values():
+        assert func(n=0) == 1.0
+        assert func(n=3) == 8.0
+        assert func(n=10) == 30.0
+
+
+def test_ydl_opts():
+    config = DownloadConfig(concurrent_fragments=8, resume=False, retries=20, max_bandwidth=2 * 1024 ** 2,
+                            chunk_size=None)
+    opts = config.ydl_opts()
+    assert opts["concurrent_fragment_downloads"] == 8
+    assert opts["continuedl"] is False
+    assert opts["nopart"] is False
+    assert opts["retries"] == opts["fragment_retries"] == 20
+    assert opts["skip_unavailable_fragments"] is False
+    assert "http_chunk_size" not in opts
+    # 頻寬上限只由共用的 BandwidthLimiter 控制
+    assert "ratelimit" not in opts
+    assert DownloadConfig().ydl_opts()["http_chunk_size"] == download_engine.DEFAULT_CHUNK_SIZE
+
+
+class RecordingLimiter:
+    def __init__(self):
+        self.consumed = []
+
+    def consume(self, amount):
+        self.consumed.append(amount)
+
+
+def progress(filename, downloaded, status="downloading"):
+    return {"status": status, "filename": filename, "downloaded_bytes": downloaded}
+
+
+def test_transfer_monitor_counts_all_reported_bytes():
+    limiter = RecordingLimiter()
+    monitor = TransferMonitor(limiter)
+    # 第一次回報的位元組也要計入，合計等於各檔案最後的累計值
+    monitor.hook(progress("v.mp4", 1000))
+    monitor.hook(progress("v.mp4", 1500))
+    monitor.hook(progress("a.m4a", 0))
+    monitor.hook(progress("a.m4a", 300))
+    monitor.hook(progress("v.mp4", 1500, status="finished"))
+    monitor.hook({"status": "error", "filename": "v.mp4", "downloaded_bytes": 9999})
+    monitor.hook({"status": "downloading", "filename": "v.mp4"})
+
+    assert monitor.bytes == 1500 + 300
+    assert limiter.consumed == [1000, 500, 300]
+    assert monitor.elapsed >= 0
+    assert "MB" in monitor.summary()
+
+
+def test_transfer_monitor_without_reports():
+    monitor = TransferMonitor()
+    assert monitor.elapsed == 0.0
+    assert monitor.speed == 0.0
+
+
+def test_bandwidth_limiter_sleeps_when_over_rate(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("crawler_common.throttle.time.sleep", sleeps.append)
+    clock = [100.0]
+    monkeypatch.setattr("crawler_common.throttle.time.monotonic", lambda: clock[0])
+
+    limiter = BandwidthLimiter(1000)
+    limiter.consume(1000)
+    assert sleeps == []
+    limiter.consume(500)
+    assert sleeps == [pytest.approx(0.5)]
+    clock[0] += 1.5
+    limiter.consume(1000)
+    assert len(sleeps) == 1
+
+
+def test_bandwidth_limiter_unlimited(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr("crawler_common.throttle.time.sleep", sleeps.append)
+    limiter = BandwidthLimiter(None)
+    limiter.consume(10 ** 9)
+    assert sleeps == []
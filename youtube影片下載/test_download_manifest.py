@@ -0,0 +1,89 @@
+import os
+
+from download_manifest import DownloadManifest, OutputCollector, MOVE_FILES_PP, download_format_key
+
+
+def touch(path):
+    with open(path, "w") as f:
+        f.write("x")
+    return path
+
+
+def test_format_key_includes_output_filename():
+    assert download_format_key("720p") == "720p"
+    assert download_format_key("720p", "lecture") == "720p|lecture"
+    assert download_format_key("720p", "a") != download_format_key("720p", "b")
+
+
+def test_manifest_lookup_record_and_reload(tmp_path):
+    path = str(tmp_path / ".manifest.json")
+    video = touch(str(tmp_path / "a.mp4"))
+    manifest = DownloadManifest(path)
+    manifest.record("abc", download_format_key("720p", "a"), [video], "標題")
+
+    reloaded = DownloadManifest(path)
+    assert reloaded.lookup("abc", download_format_key("720p", "a"))["path"] == video
+    # 不同的輸出檔名不共用紀錄
+    assert reloaded.lookup("abc", download_format_key("720p", "b")) is None
+    assert reloaded.lookup("abc", "720p") is None
+
+
+def test_manifest_drops_missing_files(tmp_path):
+    path = str(tmp_path / ".manifest.json")
+    video = touch(str(tmp_path / "a.mp4"))
+    manifest = DownloadManifest(path)
+    manifest.record("abc", "best", [video], "標題")
+    os.remove(video)
+
+    assert manifest.lookup("abc", "best") is None
+    assert DownloadManifest(path).entries == {}
+
+
+def test_manifest_tolerates_corrupt_file(tmp_path):
+    path = tmp_path / ".manifest.json"
+    path.write_text("{", encoding="utf-8")
+    assert DownloadManifest(str(path)).entries == {}
+
+
+def move_finished(path, vcodec):
+    return {"status": "finished", "postprocessor": MOVE_FILES_PP,
+            "info_dict": {"filepath": path, "vcodec": vcodec}}
+
+
+def test_collector_labels_files_by_codec_not_order(tmp_path):
+    audio = touch(str(tmp_path / "a.f140.m4a"))
+    video = touch(str(tmp_path / "z.f137.mp4"))
+    collector = OutputCollector()
+    # 音訊先完成，且檔名排序在前
+    collector.postprocessor_hook(move_finished(audio, "none"))
+    collector.postprocessor_hook(move_finished(video, "avc1"))
+
+    assert collector.files() == [video, audio]
+    assert collector.is_audio_only(audio)
+    assert not collector.is_audio_only(video)
+
+
+def test_collector_uses_requested_downloads(tmp_path):
+    audio = touch(str(tmp_path / "a.m4a"))
+    video = touch(str(tmp_path / "b.mp4"))
+    collector = OutputCollector()
+    collector.add_result({"requested_downloads": [
+        {"filepath": audio, "vcodec": "none"},
+        {"filepath": video, "vcodec": "vp9"},
+    ]})
+    collector.add_result(None)
+
+    assert collector.files() == [video, audio]
+    assert collector.is_audio_only(audio)
+
+
+def test_collector_falls_back_to_progress_hook(tmp_path):
+    audio = touch(str(tmp_path / "a.m4a"))
+    video = touch(str(tmp_path / "b.mp4"))
+    missing = str(tmp_path / "gone.mp4")
+    collector = OutputCollector()
+    for path, vcodec in ((audio, "none"), (video, "avc1"), (missing, "avc1")):
+        collector.progress_hook({"status": "finished", "filename": path, "info_dict": {"vcodec": vcodec}})
+    collector.progress_hook({"status": "downloading", "filename": str(tmp_path / "c.mp4")})
+
+    assert collector.files() == [video, audio]
@@ -0,0 +1,135 @@
+import json
+import threading
+
+import pytest
+
+from download_queue import (BatchDownloader, DONE, DownloadQueue, FAILED, PENDING, ProgressTracker, RUNNING,
+                            read_url_file)
+
+
+def queue_path(tmp_path):
+    return str(tmp_path / ".download_queue.json")
+
+
+def test_add_deduplicates_and_persists(tmp_path):
+    queue = DownloadQueue(queue_path(tmp_path))
+    assert queue.add("https://youtu.be/a", "720p", "講座")
+    assert not queue.add("https://youtu.be/a", "720p")
+    assert queue.add("https://youtu.be/a", "audio")
+
+    reloaded = DownloadQueue(queue_path(tmp_path))
+    assert [(item["url"], item["resolution"], item["filename"]) for item in reloaded.items] == [
+        ("https://youtu.be/a", "720p", "講座"),
+        ("https://youtu.be/a", "audio", None),
+    ]
+    assert all(item["status"] == PENDING for item in reloaded.items)
+
+
+def test_reload_requeues_interrupted_items(tmp_path):
+    queue = DownloadQueue(queue_path(tmp_path))
+    for url in ("a", "b", "c"):
+        queue.add(url)
+    queue.update(queue.items[0], status=RUNNING, attempts=1)
+    queue.update(queue.items[1], status=DONE, path="b.mp4")
+
+    reloaded = DownloadQueue(queue_path(tmp_path))
+    assert [item["url"] for item in reloaded.pending()] == ["a", "c"]
+    assert reloaded.items[0]["attempts"] == 1
+    assert reloaded.items[1]["path"] == "b.mp4"
+
+
+def test_retry_failed(tmp_path):
+    queue = DownloadQueue(queue_path(tmp_path))
+    queue.add("a")
+    queue.add("b")
+    queue.update(queue.items[0], status=FAILED, error="403")
+    assert queue.pending() == [queue.items[1]]
+
+    assert queue.retry_failed() == 1
+    reloaded = DownloadQueue(queue_path(tmp_path))
+    assert [item["url"] for item in reloaded.pending()] == ["a", "b"]
+    assert reloaded.items[0]["error"] is None
+
+
+def test_corrupt_queue_file_starts_empty(tmp_path):
+    with open(queue_path(tmp_path), "w", encoding="utf-8") as f:
+        f.write("[{")
+    queue = DownloadQueue(queue_path(tmp_path))
+    assert queue.items == []
+    queue.add("a")
+    with open(queue_path(tmp_path), encoding="utf-8") as f:
+        assert len(json.load(f)) == 1
+
+
+def test_read_url_file(tmp_path):
+    path = tmp_path / "urls.txt"
+    path.write_text("# 清單\n\nhttps://youtu.be/a\nhttps://youtu.be/b 720p\nhttps://youtu.be/c audio 我的 音樂\n",
+                    encoding="utf-8")
+    assert read_url_file(str(path)) == [
+        {"url": "https://youtu.be/a", "resolution": None, "filename": None},
+        {"url": "https://youtu.be/b", "resolution": "720p", "filename": None},
+        {"url": "https://youtu.be/c", "resolution": "audio", "filename": "我的 音樂"},
+    ]
+
+
+def test_progress_tracker_summary():
+    lines = []
+    tracker = ProgressTracker(2, interval=3600, output=lines.append)
+    tracker.hook({"status": "downloading", "filename": "v", "downloaded_bytes": 1048576,
+                  "total_bytes": 4 * 1048576, "speed": 1048576})
+    tracker.hook({"status": "finished", "filename": "a", "downloaded_bytes": 1048576})
+    tracker.item_done(False)
+    assert tracker.summary() == "[1/2] 2.0 / 5.0 MB，1.0 MB/s，失敗 1"
+    # item_done 不受輸出間隔限制
+    assert lines[-1] == tracker.summary()
+    count = len(lines)
+    tracker.hook({"status": "downloading", "filename": "v", "downloaded_bytes": 2 * 1048576})
+    assert len(lines) == count
+
+
+class FakeScraper:
+    has_ffmpeg = True
+
+    def __init__(self):
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def download_video(self, url, resolution, filename, interactive, extra_opts):
+        with self._lock:
+            self.calls.append(url)
+        if url == "bad":
+            raise RuntimeError("無法下載")
+        return None if url == "empty" else f"{url}.mp4"
+
+
+def test_batch_downloader_records_results(tmp_path):
+    queue = DownloadQueue(queue_path(tmp_path))
+    for url in ("ok", "bad", "empty"):
+        queue.add(url)
+    queue.update(queue.items[0], status=DONE, path="old.mp4")
+    queue.add("ok2")
+
+    scraper = FakeScraper()
+    processed = BatchDownloader(scraper, queue, workers=2).run()
+    assert sorted(item["url"] for item in processed) == ["bad", "empty", "ok2"]
+    assert sorted(scraper.calls) == ["bad", "empty", "ok2"]
+
+    reloaded = {item["url"]: item for item in DownloadQueue(queue_path(tmp_path)).items}
+    assert reloaded["ok"]["path"] == "old.mp4"
+    assert reloaded["ok2"]["status"] == DONE and reloaded["ok2"]["path"] == "ok2.mp4"
+    assert reloaded["bad"]["status"] == FAILED and reloaded["bad"]["error"] == "無法下載"
+    assert reloaded["empty"]["error"] == "下載失敗"
+    assert all(item["attempts"] == 1 for url, item in reloaded.items() if url != "ok")
+    assert BatchDownloader(scraper, DownloadQueue(queue_path(tmp_path))).run() == []
+
+
+def test_batch_downloader_propagates_worker_errors(tmp_path, monkeypatch):
+    queue = DownloadQueue(queue_path(tmp_path))
+    queue.add("ok")
+
+    def broken_item_done(self, ok):
+        raise OSError("無法輸出進度")
+
+    monkeypatch.setattr(ProgressTracker, "item_done", broken_item_done)
+    with pytest.raises(OSError):
+        BatchDownloader(FakeScraper(), queue).run()